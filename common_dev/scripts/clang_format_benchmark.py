@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""Compare throughput of per-file and batched clang-format dry runs."""
+import shutil
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Sequence
+
+import typer
+
+from pwrforge.commands.check_base import chunk_file_paths
+
+HEADER_TEMPLATE = """#pragma once
+
+namespace bench {{
+int  function_{index}( int a,int b ) {{ return a+b; }}
+}}  // namespace bench
+"""
+
+
+def generate_files(dir_path: Path, count: int) -> List[Path]:
+    (dir_path / ".clang-format").write_text("BasedOnStyle: Google\n")
+    file_paths = []
+    for index in range(count):
+        file_path = dir_path / f"header_{index}.h"
+        file_path.write_text(HEADER_TEMPLATE.format(index=index))
+        file_paths.append(file_path)
+    return file_paths
+
+
+def dry_run(clang_format: str, file_paths: Sequence[Path]) -> None:
+    cmd = [clang_format, "--style=file", "--dry-run", "-Werror", *map(str, file_paths)]
+    subprocess.run(cmd, capture_output=True, check=False)
+
+
+def measure(clang_format: str, file_paths: List[Path], chunk_size: int, jobs: int) -> float:
+    chunks = list(chunk_file_paths(file_paths, chunk_size))
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        list(executor.map(lambda chunk: dry_run(clang_format, chunk), chunks))
+    return time.perf_counter() - start
+
+
+def main(
+    files: int = typer.Option(2000, help="Number of generated headers."),
+    jobs: int = typer.Option(1, help="Number of parallel clang-format processes."),
+    batch_size: int = typer.Option(100, help="Files per clang-format process in batch mode."),
+    clang_format: str = typer.Option(shutil.which("clang-format") or "/usr/bin/clang-format"),
+) -> None:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file_paths = generate_files(Path(tmp_dir), files)
+        for label, chunk_size in (("per-file", 1), (f"batch of {batch_size}", batch_size)):
+            duration = measure(clang_format, file_paths, chunk_size, jobs)
+            print(f"{label:>16}: {duration:7.2f} s, {files / duration:9.1f} files/s")
+
+
+if __name__ == "__main__":
+    typer.run(main)
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""Compare throughput of libclang and regex based comment extraction used by the todo check."""
+import time
+from pathlib import Path
+from typing import Callable, Iterable, List, Tuple
+
+import typer
+
+from pwrforge.utils.clang_utils import get_comment_lines_libclang
+from pwrforge.utils.comment_utils import get_comment_lines
+
+SOURCE_SUFFIXES = (".c", ".cpp", ".h", ".hpp")
+
+
+def find_sources(dir_path: Path, limit: int) -> List[Path]:
+    file_paths = [path for path in sorted(dir_path.rglob("*")) if path.suffix in SOURCE_SUFFIXES and path.is_file()]
+    return file_paths[:limit]
+
+
+def measure(reader: Callable[[Path], Iterable[Tuple[int, str]]], file_paths: List[Path]) -> Tuple[float, int]:
+    comment_lines = 0
+    start = time.perf_counter()
+    for file_path in file_paths:
+        comment_lines += sum(1 for _ in reader(file_path))
+    return time.perf_counter() - start, comment_lines
+
+
+def main(
+    sources: Path = typer.Argument(Path("tests/test_data"), help="Directory searched for C/C++ sources."),
+    limit: int = typer.Option(1000, help="Maximum number of files."),
+    libclang: bool = typer.Option(True, help="Measure libclang as well, it may take a while."),
+) -> None:
+    file_paths = find_sources(sources, limit)
+    readers = [("lexer", get_comment_lines)]
+    if libclang:
+        readers.append(("libclang", get_comment_lines_libclang))
+    for label, reader in readers:
+        duration, comment_lines = measure(reader, file_paths)
+        print(
+            f"{label:>10}: {duration:7.2f} s, {len(file_paths) / duration:9.1f} files/s, {comment_lines} comment lines"
+        )
+
+
+if __name__ == "__main__":
+    typer.run(main)
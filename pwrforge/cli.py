@@ -7,7 +7,7 @@ from typing import List, Optional
 from typer import Argument, Option, Typer
 
 from pwrforge.commands.build import pwrforge_build
-from pwrforge.commands.check import pwrforge_check
+from pwrforge.commands.check import CheckOptions, pwrforge_check
 from pwrforge.commands.clean import pwrforge_clean
 from pwrforge.commands.debug import pwrforge_debug
 from pwrforge.commands.doc import pwrforge_doc
@@ -31,6 +31,7 @@ from pwrforge.config import pwrforgeTarget
 from pwrforge.global_values import DESCRIPTION, PWRFORGE_DEFAULT_CONFIG_FILE
 from pwrforge.logger import get_logger
 from pwrforge.utils.path_utils import get_config_file_path
+from pwrforge.utils.report_utils import ReportFormat
 
 logger = get_logger()
 
@@ -49,13 +50,46 @@ BASE_DIR_OPTION = Option(
     help="Base directory of the project",
 )
 
+JOBS_OPTION = Option(
+    None,
+    "--jobs",
+    "-j",
+    min=1,
+    help="Number of files processed in parallel. Defaults to CPU count.",
+)
+
+NO_CACHE_OPTION = Option(
+    False,
+    "--no-cache",
+    help="Do not reuse results stored in build/.pwrforge/check-cache for unchanged files.",
+)
+
+CHANGED_SINCE_OPTION = Option(
+    None,
+    "--changed-since",
+    metavar="REF",
+    help="Process only files changed in git since REF, including uncommitted and untracked files.",
+)
+
+STAGED_OPTION = Option(
+    False,
+    "--staged",
+    help="Process only files staged in git, e.g. in a pre-commit hook.",
+)
+
 
 ###############################################################################
 
 
 @cli.command()
 def build(
-    profile: str = Option("Debug", "-p", "--profile", metavar="PROFILE"),
+    profile: List[str] = Option(
+        ["Debug"],
+        "-p",
+        "--profile",
+        metavar="PROFILE",
+        help="Profile to build, repeat to build several profiles at the same time.",
+    ),
     target: Optional[pwrforgeTarget] = Option(
         None,
         "-t",
@@ -63,19 +97,30 @@ def build(
         help="Target device. Defaults to first one from toml if not specified.",
     ),
     all_targets: bool = Option(False, "-a", "--all", help="Build all targets."),
+    jobs: Optional[int] = Option(
+        None,
+        "--jobs",
+        "-j",
+        min=1,
+        help="Compile jobs shared by targets and profiles built at the same time. "
+        "Defaults to max-build-jobs or CPU count.",
+    ),
+    force_install: bool = Option(
+        False, "--force-install", help="Run conan install even if its inputs did not change since the last build."
+    ),
     base_dir: Optional[Path] = BASE_DIR_OPTION,
 ) -> None:
     """Compile sources."""
     if base_dir:
         os.chdir(base_dir)
-    pwrforge_build(profile, target, all_targets)
+    pwrforge_build(profile, target, all_targets, jobs, force_install)
 
 
 ###############################################################################
 
 
 @cli.command()
-def check(
+def check(  # pylint: disable=too-many-locals
     clang_format: bool = Option(False, "--clang-format", help="Run clang-format."),
     clang_tidy: bool = Option(False, "--clang-tidy", help="Run clang-tidy."),
     copy_right: bool = Option(False, "--copyright", help="Run copyright check."),
@@ -84,9 +129,67 @@ def check(
     pragma: bool = Option(False, "--pragma", help="Run pragma check."),
     todo: bool = Option(False, "--todo", help="Run TODO check."),
     silent: bool = Option(False, "--silent", "-s", help="Show less output."),
+    jobs: Optional[int] = JOBS_OPTION,
+    no_cache: bool = NO_CACHE_OPTION,
+    changed_since: Optional[str] = CHANGED_SINCE_OPTION,
+    staged: bool = STAGED_OPTION,
+    report_format: Optional[ReportFormat] = Option(
+        None,
+        "--format",
+        help="Additionally write findings in a machine-readable format while the checks are running.",
+    ),
+    output: Optional[Path] = Option(
+        None,
+        "--output",
+        "-o",
+        dir_okay=False,
+        help="File for the report selected with --format. Defaults to standard output.",
+    ),
+    watch: bool = Option(
+        False,
+        "--watch",
+        "-w",
+        help="After checking, keep running and check files again when they change.",
+    ),
+    plan: bool = Option(
+        False,
+        "--plan",
+        help="Show the order of checkers and their predicted duration from the previous run, without checking.",
+    ),
+    fail_fast: bool = Option(
+        False,
+        "--fail-fast",
+        help="Run checks tier by tier, as set in [check] tiers, and stop at the first tier which found problems.",
+    ),
+    timings: bool = Option(
+        False,
+        "--timings",
+        help="Show the time taken by every checker and the slowest files, write all timings as JSON.",
+    ),
+    timings_top: int = Option(10, "--timings-top", metavar="N", min=1, help="Number of the slowest files shown."),
+    timings_output: Optional[Path] = Option(
+        None,
+        "--timings-output",
+        dir_okay=False,
+        help="File for the timings written with --timings. Defaults to build/.pwrforge/check-timings-report.json.",
+    ),
     base_dir: Optional[Path] = BASE_DIR_OPTION,
 ) -> None:
     """Check source code in directory `src`."""
+    options = get_check_options(
+        jobs,
+        no_cache,
+        changed_since,
+        staged,
+        report_format,
+        output,
+        watch,
+        plan,
+        fail_fast,
+        timings,
+        timings_top,
+        timings_output,
+    )
     if base_dir:
         os.chdir(base_dir)
     pwrforge_check(
@@ -98,6 +201,41 @@ def check(
         pragma,
         todo,
         verbose=not silent,
+        options=options,
+    )
+
+
+def get_check_options(
+    jobs: Optional[int],
+    no_cache: bool,
+    changed_since: Optional[str],
+    staged: bool,
+    report_format: Optional[ReportFormat],
+    output: Optional[Path],
+    watch: bool,
+    plan: bool,
+    fail_fast: bool,
+    timings: bool,
+    timings_top: int,
+    timings_output: Optional[Path],
+) -> CheckOptions:
+    """
+    Options of `pwrforge check` as passed to `pwrforge_check`, must be called before changing the directory.
+    """
+    # Report paths are relative to the directory pwrforge was started in
+    return CheckOptions(
+        jobs=jobs,
+        use_cache=not no_cache,
+        changed_since=changed_since,
+        staged=staged,
+        report_format=report_format,
+        output=output.absolute() if output else None,
+        watch=watch,
+        plan=plan,
+        fail_fast=fail_fast,
+        timings=timings,
+        timings_top=timings_top,
+        timings_output=timings_output.absolute() if timings_output else None,
     )
 
 
@@ -205,12 +343,26 @@ def fix(
     clang_format: bool = Option(False, "--clang-format", help="Fix clang-format violations"),
     copy_right: bool = Option(False, "--copyright", help="Fix copyrights violations"),
     pragma: bool = Option(False, "--pragma", help="Fix pragma violations"),
+    clang_tidy: bool = Option(False, "--clang-tidy", help="Apply clang-tidy fix-its, requires a build"),
+    jobs: Optional[int] = JOBS_OPTION,
+    no_cache: bool = NO_CACHE_OPTION,
+    changed_since: Optional[str] = CHANGED_SINCE_OPTION,
+    staged: bool = STAGED_OPTION,
     base_dir: Optional[Path] = BASE_DIR_OPTION,
 ) -> None:
     """Fix violations reported by command `check`."""
     if base_dir:
         os.chdir(base_dir)
-    pwrforge_fix(pragma, copy_right, clang_format)
+    pwrforge_fix(
+        pragma,
+        copy_right,
+        clang_format,
+        jobs,
+        use_cache=not no_cache,
+        changed_since=changed_since,
+        staged=staged,
+        clang_tidy=clang_tidy,
+    )
 
 
 ###############################################################################
@@ -475,12 +627,15 @@ def test(
     verbose: bool = Option(False, "--verbose", "-v", help="Verbose mode."),
     profile: str = Option("Debug", "-p", "--profile", metavar="PROFILE", help="CMake profile to use"),
     detailed_coverage: bool = Option(False, help="Generate detailed coverage HTML files"),
+    force_install: bool = Option(
+        False, "--force-install", help="Run conan install even if its inputs did not change since the last test build."
+    ),
     base_dir: Optional[Path] = BASE_DIR_OPTION,
 ) -> None:
     """Compile and run all tests in directory `test`."""
     if base_dir:
         os.chdir(base_dir)
-    pwrforge_test(verbose, profile, detailed_coverage)
+    pwrforge_test(verbose, profile, detailed_coverage, force_install)
 
 
 ###############################################################################
@@ -1,26 +1,55 @@
 """Build project bin/lib exec file"""
 
+import os
 import subprocess
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
 from pathlib import Path
-from typing import List, Optional
+from typing import List, NamedTuple, Optional, Sequence, Union
 
 from pwrforge.config import Config, Target, pwrforgeTarget
 from pwrforge.config_utils import get_target_or_default, prepare_config
-from pwrforge.file_generators.conan_gen import conan_add_default_profile_if_missing
 from pwrforge.logger import get_logger
-from pwrforge.utils.conan_utils import conan_add_remote, conan_source
+from pwrforge.utils.artifact_utils import sync_artifacts
+from pwrforge.utils.ccache_utils import report_compiler_cache_stats
+from pwrforge.utils.conan_utils import conan_install, conan_setup
 
 logger = get_logger()
 
+# Output lines of builds running at the same time are written whole, one at a time
+_output_lock = threading.Lock()
 
-def pwrforge_build(profile: str, target: Optional[pwrforgeTarget], all_targets: bool = False) -> None:
+
+class BuildResult(NamedTuple):
+    target: Target
+    profile: str
+    # Step which failed, None if the build succeeded
+    failed_step: Optional[str]
+    duration: float
+
+    @property
+    def name(self) -> str:
+        return f"{self.target.id}/{self.profile}"
+
+
+def pwrforge_build(
+    profile: Union[str, Sequence[str]],
+    target: Optional[pwrforgeTarget],
+    all_targets: bool = False,
+    jobs: Optional[int] = None,
+    force_install: bool = False,
+) -> None:
     """
     Build project exec file.
 
-    :param str profile: Profile
+    :param profile: Profile, or profiles to build at the same time
     :param target: Target to build
     :param bool all_targets: Build all targets
+    :param jobs: compile jobs shared by builds running at the same time, defaults to max-build-jobs or CPU count
+    :param bool force_install: run `conan install` even if its inputs did not change
     :return: None
     """
     config = prepare_config()
@@ -31,73 +60,210 @@ def pwrforge_build(profile: str, target: Optional[pwrforgeTarget], all_targets:
         logger.info("Did you run `pwrforge update`?")
         sys.exit(1)
 
-    conan_add_default_profile_if_missing()
-    conan_add_remote(project_dir, config)
-    conan_source(project_dir)
+    conan_setup(config)
 
     if not all_targets:
-        _pwrforge_build_targets(config, profile, [get_target_or_default(config, target)])
+        targets = [get_target_or_default(config, target)]
     else:
-        _pwrforge_build_targets(config, profile, config.project.target)
+        targets = config.project.target
+    with report_compiler_cache_stats(config):
+        _pwrforge_build_targets(config, profile, targets, jobs, force_install)
 
 
-def _pwrforge_build_targets(config: Config, profile: str, targets: List[Target]) -> None:
+def _pwrforge_build_targets(
+    config: Config,
+    profile: Union[str, Sequence[str]],
+    targets: List[Target],
+    jobs: Optional[int] = None,
+    force_install: bool = False,
+) -> None:
     """
     Build project exec file.
 
-    :param str profile: Profile for which to build
+    A single build runs with the output of conan as is. Several targets or profiles are built at the same time,
+    sharing `jobs` compile jobs, with every output line prefixed by the target and profile. A failing build does not
+    stop the others, the summary lists the result of each build.
+
+    :param profile: Profile, or profiles for which to build
     :param list targets: Targets to build
+    :param jobs: compile jobs shared by builds running at the same time
+    :param bool force_install: run `conan install` even if its inputs did not change
     :return: None
     """
-    project_dir = config.project_root
-    for build_target in targets:
-        logger.info("Building %s target", build_target.id)
-
-        build_dir = Path(project_dir, build_target.get_profile_build_dir(profile))
-        build_dir.mkdir(parents=True, exist_ok=True)
-        profile_name = build_target.get_conan_profile_name(profile)
-
-        try:
-            subprocess.run(
-                [
-                    "conan",
-                    "install",
-                    ".",
-                    "-pr",
-                    f"./config/conan/profiles/{profile_name}",
-                    "-of",
-                    build_dir,
-                    "-b",
-                    "missing",
-                ],
-                cwd=project_dir,
-                check=True,
-            )
-            subprocess.run(
-                [
-                    "conan",
-                    "build",
-                    ".",
-                    "-pr",
-                    f"./config/conan/profiles/{profile_name}",
-                    "-of",
-                    build_dir,
-                ],
-                cwd=project_dir,
-                check=True,
+    profiles = [profile] if isinstance(profile, str) else list(dict.fromkeys(profile))
+    builds = [(build_target, build_profile) for build_target in targets for build_profile in profiles]
+    if len(builds) == 1:
+        if _build_target(config, *builds[0], build_jobs=jobs, force_install=force_install).failed_step is not None:
+            sys.exit(1)
+        return
+
+    total_jobs = jobs or config.project.max_build_jobs or os.cpu_count() or 1
+    concurrent_builds = min(len(builds), total_jobs)
+    build_jobs = max(total_jobs // concurrent_builds, 1)
+    logger.info(
+        "Building %d targets and profiles, %d at the same time with %d compile jobs each",
+        len(builds),
+        concurrent_builds,
+        build_jobs,
+    )
+    # Conan cache is not safe for concurrent writes, dependencies are installed by one build at a time
+    install_lock = threading.Lock()
+    with ThreadPoolExecutor(max_workers=concurrent_builds) as executor:
+        results = list(
+            executor.map(
+                lambda build: _build_target(
+                    config,
+                    build[0],
+                    build[1],
+                    build_jobs,
+                    install_lock,
+                    prefix_output=True,
+                    force_install=force_install,
+                ),
+                builds,
             )
+        )
+    if not log_build_summary(results):
+        sys.exit(1)
+
+
+def log_build_summary(results: Sequence[BuildResult]) -> bool:
+    """
+    :param results: results of builds which ran at the same time
+    :return: True if all builds succeeded
+    """
+    logger.info("Build summary:")
+    for result in results:
+        if result.failed_step is None:
+            logger.info(f"  {result.name:<24} succeeded in {result.duration:.1f} s")
+        else:
+            logger.error(f"  {result.name:<24} failed at {result.failed_step} after {result.duration:.1f} s")
+    failed = [result for result in results if result.failed_step is not None]
+    if failed:
+        logger.error("%d of %d builds failed", len(failed), len(results))
+    return not failed
 
-            logger.info("Copying artifacts...")
-            # This is a workaround so that different profiles can work together with conan
-            # Conan always calls CMake with '
-            subprocess.run(
-                f"cp -r -f {build_dir}/build/{config.profiles[profile].cmake_build_type}/* .",
-                cwd=build_dir,
-                shell=True,
-                check=True,
+
+def _build_target(
+    config: Config,
+    build_target: Target,
+    profile: str,
+    build_jobs: Optional[int] = None,
+    install_lock: Optional[threading.Lock] = None,
+    prefix_output: bool = False,
+    force_install: bool = False,
+) -> BuildResult:
+    """
+    Install dependencies, build and copy artifacts of one target and profile.
+
+    :param build_jobs: compile jobs of the build, as set in the conan profile if not given
+    :param install_lock: held while installing dependencies
+    :param prefix_output: prefix output lines with the target and profile
+    :param force_install: run `conan install` even if its inputs did not change
+    :return: result of the build
+    """
+    start = time.perf_counter()
+    name = f"{build_target.id}/{profile}"
+    log_prefix = f"[{name}] " if prefix_output else ""
+    logger.info("%sBuilding %s target", log_prefix, build_target.id)
+
+    build_dir = Path(config.project_root, build_target.get_profile_build_dir(profile))
+    build_dir.mkdir(parents=True, exist_ok=True)
+    profile_name = build_target.get_conan_profile_name(profile)
+    output_prefix = name if prefix_output else None
+
+    step = "conan install"
+    try:
+        with install_lock if install_lock is not None else nullcontext():
+            conan_install(
+                config,
+                _get_conan_install_cmd(profile_name, build_dir),
+                Path(config.project_root, "conanfile.py"),
+                build_dir,
+                Path(config.project_root, "config", "conan", "profiles", profile_name),
+                force=force_install,
+                run=lambda cmd: run_build_step(cmd, config.project_root, output_prefix),
             )
-            logger.info("Artifacts copied")
+        step = "conan build"
+        run_build_step(_get_conan_build_cmd(profile_name, build_dir, build_jobs), config.project_root, output_prefix)
 
-        except subprocess.CalledProcessError:
-            logger.error("pwrforge build target %s failed", build_target.id)
-            sys.exit(1)
+        step = "artifact sync"
+        _sync_target_artifacts(config, profile, build_dir, log_prefix)
+    except subprocess.CalledProcessError:
+        logger.error("%spwrforge build target %s failed", log_prefix, build_target.id)
+        return BuildResult(build_target, profile, step, time.perf_counter() - start)
+    except OSError as e:
+        logger.error("%sUnable to sync artifacts: %s", log_prefix, e)
+        logger.error("%spwrforge build target %s failed", log_prefix, build_target.id)
+        return BuildResult(build_target, profile, step, time.perf_counter() - start)
+    return BuildResult(build_target, profile, None, time.perf_counter() - start)
+
+
+def _get_conan_install_cmd(profile_name: str, build_dir: Path) -> List[Union[str, Path]]:
+    return [
+        "conan",
+        "install",
+        ".",
+        "-pr",
+        f"./config/conan/profiles/{profile_name}",
+        "-of",
+        build_dir,
+        "-b",
+        "missing",
+    ]
+
+
+def _get_conan_build_cmd(profile_name: str, build_dir: Path, build_jobs: Optional[int]) -> List[Union[str, Path]]:
+    return [
+        "conan",
+        "build",
+        ".",
+        "-pr",
+        f"./config/conan/profiles/{profile_name}",
+        "-of",
+        build_dir,
+        *(["-c", f"tools.build:jobs={build_jobs}"] if build_jobs is not None else []),
+    ]
+
+
+def _sync_target_artifacts(config: Config, profile: str, build_dir: Path, log_prefix: str) -> None:
+    """
+    :raises OSError: if an artifact could not be synced
+    """
+    logger.info("%sSyncing artifacts...", log_prefix)
+    # This is a workaround so that different profiles can work together with conan
+    # Conan always builds into build/<cmake build type> of the output folder
+    # cmake_build_type is filled in when the config is loaded, falls back to the profile name otherwise
+    cmake_build_type = config.profiles[profile].cmake_build_type or profile
+    counts = sync_artifacts(Path(build_dir, "build", cmake_build_type), build_dir)
+    logger.info(
+        "%sArtifacts synced: %d updated, %d unchanged",
+        log_prefix,
+        sum(counts.values()) - counts.get("unchanged", 0),
+        counts.get("unchanged", 0),
+    )
+
+
+def run_build_step(cmd: Sequence[Union[str, Path]], cwd: Path, output_prefix: Optional[str] = None) -> None:
+    """
+    Run a build command, optionally prefixing every line of its output.
+
+    :param cmd: command to run
+    :param cwd: working directory of the command
+    :param output_prefix: prefix of output lines, the output is passed through as is if not given
+    :raises subprocess.CalledProcessError: if the command failed
+    """
+    if output_prefix is None:
+        subprocess.run(cmd, cwd=cwd, check=True)
+        return
+
+    with subprocess.Popen(
+        cmd, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, errors="replace"
+    ) as process:
+        assert process.stdout is not None
+        for line in process.stdout:
+            with _output_lock:
+                sys.stdout.write(f"[{output_prefix}] {line}")
+                sys.stdout.flush()
+    if process.returncode != 0:
+        raise subprocess.CalledProcessError(process.returncode, cmd)
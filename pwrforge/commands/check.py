@@ -1,26 +1,111 @@
 """Check written code with formatters"""
 
-import abc
-import glob
 import os
 import re
-import shutil
 import subprocess
 import sys
-from itertools import chain
+import threading
+import time
 from pathlib import Path
-from typing import Iterable, List, NamedTuple, Optional, Sequence, Set, Type
-
-from pwrforge.config import CheckConfig, Config, TodoCheckConfig
+from typing import (
+    AbstractSet,
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    TypeVar,
+)
+
+from pwrforge.commands.check_analyzers import CppcheckChecker, CyclomaticChecker
+from pwrforge.commands.check_base import (
+    CheckerFixer,
+    CheckResult,
+    JobBudget,
+    capture_log_records,
+    chunk_file_paths,
+    create_thread_pool,
+    get_changed_files_to_check,
+    get_check_cache,
+    get_default_jobs,
+    get_program_version,
+    parse_diagnostics,
+    replay_log_records,
+    split_diagnostics_per_file,
+)
+from pwrforge.commands.check_clang_tidy import ClangTidyChecker
+from pwrforge.commands.check_scheduler import (
+    CheckScheduler,
+    load_check_timings,
+    log_check_summary,
+    log_check_timings,
+    register_corpus_files,
+    store_check_timings,
+    store_check_timings_report,
+    watch_and_check,
+)
+from pwrforge.config import Config, TodoCheckConfig
 from pwrforge.config_utils import prepare_config
 from pwrforge.logger import get_logger
-from pwrforge.utils.clang_utils import get_comment_lines
-from pwrforge.utils.file_utils import extract_comment_sections
+from pwrforge.utils.cache_utils import JsonCache, hash_content
+from pwrforge.utils.comment_utils import get_comment_lines
+from pwrforge.utils.file_utils import (
+    FileIndex,
+    SourceCorpus,
+    get_comment_sections,
+    read_header_prefix,
+)
+from pwrforge.utils.report_utils import (
+    Finding,
+    FindingsReporter,
+    ReportFormat,
+    create_reporter,
+)
+from pwrforge.utils.timing_utils import CheckTimings
 
 logger = get_logger()
 
+T = TypeVar("T")
+
+
+class CheckOptions(NamedTuple):
+    """
+    Options of a check run, besides the choice of checks.
+
+    :param jobs: number of files checked in parallel, defaults to CPU count
+    :param use_cache: reuse stored results of file-local checks for unchanged files
+    :param changed_since: check only files changed since this git ref
+    :param staged: check only files staged in git
+    :param report_format: additionally write findings in this machine-readable format
+    :param output: file for the machine-readable report, standard output if not given
+    :param watch: after checking, keep checking changed files until interrupted
+    :param plan: only log the order and predicted duration of checkers, based on the previous run
+    :param fail_fast: run checks tier by tier, as configured in [check] tiers, and stop at the first failing tier
+    :param timings: log the time taken by every checker and the slowest files, store all timings as JSON
+    :param timings_top: number of the slowest files and directories logged with timings
+    :param timings_output: file for all timings, defaults to a file in the pwrforge state directory
+    """
 
-def pwrforge_check(  # pylint: disable=too-many-branches
+    jobs: Optional[int] = None
+    use_cache: bool = True
+    changed_since: Optional[str] = None
+    staged: bool = False
+    report_format: Optional[ReportFormat] = None
+    output: Optional[Path] = None
+    watch: bool = False
+    plan: bool = False
+    fail_fast: bool = False
+    timings: bool = False
+    timings_top: int = 10
+    timings_output: Optional[Path] = None
+
+
+def pwrforge_check(
     clang_format: bool,
     clang_tidy: bool,
     copy_right: bool,
@@ -29,6 +114,7 @@ def pwrforge_check(  # pylint: disable=too-many-branches
     pragma: bool,
     todo: bool,
     verbose: bool,
+    options: Optional[CheckOptions] = None,
 ) -> None:
     """
     Check written code using different formatters
@@ -41,13 +127,37 @@ def pwrforge_check(  # pylint: disable=too-many-branches
     :param bool pragma: check pragma
     :param bool todo: check todo left in code
     :param bool verbose: set verbose
+    :param options: options of the check run, defaults of `CheckOptions` if not given
     :return: None
     """
+    options = options or CheckOptions()
     config = prepare_config()
+    checker_classes = _select_checkers(clang_format, clang_tidy, copy_right, cppcheck, cyclomatic, pragma, todo)
+    reporter = (
+        create_reporter(options.report_format, options.output, config.project_root) if options.report_format else None
+    )
 
     # Todo, remove chdir and change cwd for checks
     os.chdir(config.project_root)
 
+    try:
+        problems_found = _run_checks(config, checker_classes, verbose, options, reporter)
+    finally:
+        if reporter is not None:
+            reporter.close()
+    if problems_found and not options.watch:
+        sys.exit(1)
+
+
+def _select_checkers(
+    clang_format: bool,
+    clang_tidy: bool,
+    copy_right: bool,
+    cppcheck: bool,
+    cyclomatic: bool,
+    pragma: bool,
+    todo: bool,
+) -> List[Type[CheckerFixer]]:
     checkers: List[Type[CheckerFixer]] = []
     if clang_format:
         checkers.append(ClangFormatChecker)
@@ -75,118 +185,178 @@ def pwrforge_check(  # pylint: disable=too-many-branches
             PragmaChecker,
             TodoChecker,
         ]
+    return checkers
 
-    problem_counts = []
-    for checker_class in checkers:
-        problem_count = checker_class(config, verbose=verbose).check()
-        problem_counts.append((checker_class, problem_count))
-    if len(checkers) > 0:
-        logger.info("Summary:")
-        if any(count > 0 for _, count in problem_counts):
-            for checker_class, problem_count in problem_counts:
-                logger.info(f"{checker_class.check_name}: {problem_count} problems found")
-            sys.exit(1)
-        else:
-            logger.info("No problems found!")
-
-
-class CheckResult(NamedTuple):
-    problems_found: int
-    fix: bool = True
 
+def _run_checks(
+    config: Config,
+    checker_classes: List[Type[CheckerFixer]],
+    verbose: bool,
+    options: CheckOptions,
+    reporter: Optional[FindingsReporter],
+) -> bool:
+    """
+    Run the checks, or only log their plan, then keep checking changed files in watch mode.
 
-class CheckerFixer(abc.ABC):
-    check_name: str
-    headers_only = False
-    can_fix = False
+    :return: True if any check found problems
+    """
+    jobs = options.jobs or get_default_jobs()
+    corpus = SourceCorpus(comment_lines_reader=get_comment_lines)
+    file_index = FileIndex(config.check.exclude, config.project_root)
+    check_timings = CheckTimings(config.project_root) if options.timings else None
+    cancel_event = threading.Event()
+    checkers = _create_checkers(
+        config,
+        checker_classes,
+        verbose,
+        options,
+        jobs=jobs,
+        corpus=corpus,
+        file_index=file_index,
+        reporter=reporter,
+        cancel_event=cancel_event,
+        check_timings=check_timings,
+    )
+    scheduler = CheckScheduler(checkers, jobs, load_check_timings(config), cancel_event)
+    tiers = config.check.tiers if options.fail_fast else None
+    if options.plan:
+        scheduler.log_plan(tiers)
+        return False
+    # Register all readers upfront, so files are kept in the corpus until the last checker is done with them
+    register_corpus_files(corpus, checkers)
+
+    problems_found = log_check_summary(scheduler.run_tiers(tiers) if tiers is not None else scheduler.run())
+    # Checks limited to changed files would make the timings of full checks too optimistic
+    if options.changed_since is None and not options.staged:
+        store_check_timings(config, scheduler.durations)
+    if check_timings is not None:
+        log_check_timings(check_timings, options.timings_top)
+        store_check_timings_report(config, check_timings, options.timings_output)
+    if options.watch:
+        watch_and_check(config, checkers, corpus, file_index)
+    return problems_found
+
+
+def _create_checkers(
+    config: Config,
+    checker_classes: List[Type[CheckerFixer]],
+    verbose: bool,
+    options: CheckOptions,
+    jobs: int,
+    corpus: SourceCorpus,
+    file_index: FileIndex,
+    reporter: Optional[FindingsReporter],
+    cancel_event: threading.Event,
+    check_timings: Optional[CheckTimings],
+) -> List[CheckerFixer]:
+    """
+    Checkers sharing the cache, the corpus, the file index, the job budget and the reports of one check run.
+    """
+    cache = get_check_cache(config) if options.use_cache else None
+    changed_files = get_changed_files_to_check(config, options.changed_since, options.staged)
+    job_budget = JobBudget(jobs)
+    return [
+        checker_class(
+            config,
+            verbose=verbose,
+            jobs=jobs,
+            cache=cache,
+            corpus=corpus,
+            changed_files=changed_files,
+            file_index=file_index,
+            reporter=reporter,
+            job_budget=job_budget,
+            cancel_event=cancel_event,
+            check_timings=check_timings,
+        )
+        for checker_class in checker_classes
+    ]
 
-    def __init__(self, config: Config, fix_errors: bool = False, verbose: bool = False) -> None:
-        self._config = config
-        self._fix_errors = fix_errors
-        self._verbose = verbose
 
-    def check(self) -> int:
-        logger.info(f"Starting {self.check_name} check...")
-        error_count = self.check_files()
-        self.report(error_count)
-        return error_count
+PRAGMA_ONCE_PATTERN = re.compile(r"^[ \t]*#[ \t]*pragma[ \t]+once\b", re.MULTILINE)
 
-    def check_files(self) -> int:
-        error_counter = 0
-        for file_path in find_files(
-            self._config.source_dir_path,
-            ("*.h", "*.hpp") if self.headers_only else ("*.h", "*.hpp", "*.c", "*.cpp"),
-            self.get_exclude_patterns(),
-        ):
-            result = self.check_file(file_path)
-            error_counter += result.problems_found
-            if result.problems_found > 0 and self._fix_errors and self.can_fix and result.fix:
-                logger.info("Fixing...")
-                self.fix_file(file_path)
-        return error_counter
 
-    def report(self, count: int) -> None:
-        problem_count = self.format_problem_count(count)
-        if self._fix_errors and self.can_fix:
-            logger.info(f"Finished {self.check_name} check. Fixed {problem_count}.")
-        else:
-            logger.info(f"Finished {self.check_name} check. Found {problem_count}.")
-            if count > 0:
-                logger.error(f"{self.check_name} check fail!")
-
-    @staticmethod
-    def format_problem_count(count: int) -> str:
-        return f"problems in {count} files"
+class HeaderPrefixChecker(CheckerFixer):
+    """
+    Checker of the comments and preprocessor directives at the top of files.
 
-    def get_exclude_patterns(self) -> List[str]:
-        return [*self._config.check.exclude, *self.get_check_config().exclude]
+    Files are read only up to their first declaration, see `read_header_prefix`.
+    """
 
-    def get_check_config(self) -> CheckConfig:
-        return getattr(self._config.check, self.check_name.replace("-", "_"))  # type: ignore[no-any-return]
+    cacheable = True
 
-    @abc.abstractmethod
-    def check_file(self, file_path: Path) -> CheckResult:
-        pass
+    def get_header_prefix(self, file_path: Path) -> str:
+        return read_header_prefix(file_path, self._config.check.header_window)
 
-    def fix_file(self, file_path: Path) -> None:
-        pass
+    def get_content_hash(self, file_path: Path) -> str:
+        # The result depends only on the prefix, the rest of the file is not read
+        return hash_content(self.get_header_prefix(file_path).encode("utf-8"))
 
 
-class PragmaChecker(CheckerFixer):
+class PragmaChecker(HeaderPrefixChecker):
     check_name = "pragma"
     headers_only = True
     can_fix = True
 
     def check_file(self, file_path: Path) -> CheckResult:
-        with open(file_path, encoding="utf-8") as file:
-            for line in file.readlines():
-                if "#pragma once" in line:
-                    return CheckResult(0)
+        if PRAGMA_ONCE_PATTERN.search(self.get_header_prefix(file_path)):
+            return CheckResult(0)
         logger.warning("Missing '#pragma once' in %s", file_path)
-        return CheckResult(1)
+        return CheckResult(1, findings=(Finding(str(file_path), "Missing '#pragma once'", line=1, rule="pragma-once"),))
 
-    def fix_file(self, file_path: Path) -> None:
-        with open(file_path, encoding="utf-8") as file:
-            old = file.read()
+    def fix_content(self, file_path: Path, content: str) -> str:
+        return "#pragma once\n\n" + content
 
-        with open(file_path, "w", encoding="utf-8") as file:
-            file.write("#pragma once\n")
-            file.write("\n")
-            file.write(old)
 
-
-class CopyrightChecker(CheckerFixer):
+class CopyrightChecker(HeaderPrefixChecker):
     check_name = "copyright"
     can_fix = True
 
-    def __init__(self, config: Config, fix_errors: bool = False, verbose: bool = False):
-        super().__init__(config, fix_errors, verbose)
+    def __init__(
+        self,
+        config: Config,
+        fix_errors: bool = False,
+        verbose: bool = False,
+        jobs: int = 1,
+        cache: Optional[JsonCache] = None,
+        corpus: Optional[SourceCorpus] = None,
+        changed_files: Optional[AbstractSet[Path]] = None,
+        file_index: Optional[FileIndex] = None,
+        reporter: Optional[FindingsReporter] = None,
+        job_budget: Optional[JobBudget] = None,
+        cancel_event: Optional[threading.Event] = None,
+        check_timings: Optional[CheckTimings] = None,
+    ):
+        super().__init__(
+            config,
+            fix_errors,
+            verbose,
+            jobs,
+            cache,
+            corpus,
+            changed_files,
+            file_index,
+            reporter,
+            job_budget,
+            cancel_event,
+            check_timings,
+        )
         self.copyright_desc = self.get_check_config().description or ""
         self.copyright_fix_desc = self._config.fix.copyright.description
+        self.copyright_pattern: Optional[re.Pattern[str]] = None
+        try:
+            self.copyright_pattern = re.compile(self.copyright_desc, re.MULTILINE)
+        except re.error as e:
+            logger.debug("Invalid regex in config file: %s", e.msg)
 
-    def check(self) -> int:
+    def is_enabled(self) -> bool:
         if not self.copyright_desc:
             logger.warning("No copyright line defined in pwrforge.toml at check.copyright.description")
+            return False
+        return True
+
+    def check(self) -> int:
+        if not self.is_enabled():
             return 0
         return super().check()
 
@@ -198,32 +368,25 @@ class CopyrightChecker(CheckerFixer):
         return ""
 
     def check_file(self, file_path: Path) -> CheckResult:
-        comment_sections = extract_comment_sections(file_path)
-        for comment_section in comment_sections:
+        for comment_section in get_comment_sections(self.get_header_prefix(file_path)):
             if self.copyright_desc in comment_section:
                 return CheckResult(problems_found=0)
-
-            try:
-                result = re.search(self.copyright_desc, comment_section, re.MULTILINE)
-                if result:
-                    return CheckResult(problems_found=0)
-            except re.error as e:
-                logger.debug("Invalid regex in config file: %s", e.msg)
+            if self.copyright_pattern is not None and self.copyright_pattern.search(comment_section):
+                return CheckResult(problems_found=0)
 
         logger.warning("Missing copyright line in %s.", file_path)
-        return CheckResult(problems_found=1)
-
-    def fix_file(self, file_path: Path) -> None:
-        with open(file_path, encoding="utf-8") as file:
-            old = file.read()
+        return CheckResult(
+            problems_found=1, findings=(Finding(str(file_path), "Missing copyright line", line=1, rule="copyright"),)
+        )
 
-        with open(file_path, "w", encoding="utf-8") as file:
-            file.write(self._get_fix_copyright_description())
-            file.write(old)
+    def fix_content(self, file_path: Path, content: str) -> str:
+        return self._get_fix_copyright_description() + content
 
 
 class TodoChecker(CheckerFixer):
     check_name = "todo"
+    cacheable = True
+    uses_corpus = True
 
     @staticmethod
     def format_problem_count(count: int) -> str:
@@ -232,380 +395,218 @@ class TodoChecker(CheckerFixer):
     def check_file(self, file_path: Path) -> CheckResult:
         keywords = self.get_check_config().keywords
         keyword_patterns = [re.compile(rf"\b{re.escape(keyword)}\b") for keyword in keywords]
-        error_counter = 0
-        for line_number, line in get_comment_lines(file_path):
+        findings = []
+        source = self.get_source(file_path)
+        comment_lines = source.comment_lines if source is not None else get_comment_lines(file_path)
+        for line_number, line in comment_lines:
             for keyword, keyword_pattern in zip(keywords, keyword_patterns):
                 if keyword_pattern.search(line):
-                    error_counter += 1
+                    findings.append(Finding(str(file_path), f"Found {keyword}", line=line_number, rule="todo"))
                     logger.warning(f"Found {keyword} in {file_path} at line {line_number}")
-        return CheckResult(error_counter)
+        return CheckResult(len(findings), findings=tuple(findings))
 
     def get_check_config(self) -> TodoCheckConfig:
         return self._config.check.todo
 
 
+CLANG_FORMAT_DRY_RUN_CMD = ("/usr/bin/clang-format", "--style=file", "--dry-run", "-Werror")
+CLANG_FORMAT_FIX_CMD = ("/usr/bin/clang-format", "-style=file", "-i")
+CLANG_FORMAT_STDIN_CMD = ("/usr/bin/clang-format", "-style=file")
+
+
 class ClangFormatChecker(CheckerFixer):
     check_name = "clang-format"
     can_fix = True
+    cacheable = True
+    formatter = True
+    style_file_names = (".clang-format", "_clang-format")
+    # Maximal number of files passed to a single clang-format process
+    batch_size = 100
 
-    def check_file(self, file_path: Path) -> CheckResult:
-        cmd = [
-            "/usr/bin/clang-format",
-            "--style=file",
-            "--dry-run",
-            "-Werror",
-            str(file_path),
-        ]
-        try:
-            log_cmd = " ".join(cmd)
-            logger.info(f"{log_cmd}")
-            subprocess.check_output(cmd)
-        except subprocess.CalledProcessError as e:
-            if self._verbose:
-                logger.info(e.output.decode())
-            else:
-                logger.warning("clang-format found error in file %s", file_path)
-            return CheckResult(1)
-        return CheckResult(0)
-
-    def fix_file(self, file_path: Path) -> None:
-        subprocess.check_call(["/usr/bin/clang-format", "-style=file", "-i", str(file_path)])
-
+    def get_tool_version(self) -> str:
+        return f"{super().get_tool_version()} {get_program_version('/usr/bin/clang-format')}"
 
-class ClangTidyChecker(CheckerFixer):
-    check_name = "clang-tidy"
-    build_path: Optional[Path] = None
+    def get_cache_inputs(self, file_path: Path) -> List[bytes]:
+        style_file = self.find_config_file(file_path.absolute().parent, self.style_file_names)
+        return [style_file.read_bytes()] if style_file else []
 
-    def check_file(self, file_path: Path) -> CheckResult:
-        target = self._config.project.default_target
-        for profile in self._config.profiles:
-            profile_build_dir = self._config.project_root / target.get_profile_build_dir(profile)
-            if profile_build_dir.is_dir():
-                self.build_path = profile_build_dir
-                break
-
-        if not self.build_path:
-            logger.error("Build folder does not exist.")
-            logger.info("Did you run `pwrforge build`?")
-            sys.exit(1)
-
-        cmd: List[str]
-        # Check if compilation database exists:
-        if not Path(self.build_path, "compile_commands.json").exists():
-            logger.error("Compilation database does not exist.")
-            logger.info("Did you run `pwrforge build`?")
-            sys.exit(1)
-
-        if self._config.project.is_esp32():
-            cmd = self.__get_cmd_esp32(file_path)
-        elif self._config.project.is_stm32() or self._config.project.is_atsam():
-            cmd = self.__get_cmd_arm(file_path)
-        elif self._config.project.is_x86():
-            cmd = self.__get_cmd_x86(file_path)
-
-        try:
-            log_cmd = " ".join(cmd)
-            logger.info(f"{log_cmd}")
-            subprocess.check_output(cmd)
-        except subprocess.CalledProcessError as e:
-            if self._verbose:
-                logger.info(e.output.decode())
-            else:
-                logger.warning("clang-tidy found error in file %s", file_path)
-            return CheckResult(1)
-        return CheckResult(0)
-
-    # pylint: disable=too-many-locals
-    def __get_cmd_esp32(self, file_path: Path) -> List[str]:
+    def check_files(self) -> int:
         """
-        Prepare clang-tidy command for ESP32 target.
+        Check files in batches, many files per clang-format process.
 
-        This function:
-        1. Creates a copy of compile_commands.json with ESP-IDF-only flags stripped.
-        2. Detects ESP32 toolchain include paths (GCC builtin, include-fixed, sysroot).
-        3. Adds ESP-IDF newlib platform includes.
-        4. Builds a clang-tidy command with proper -extra-arg=-I... options.
+        Cached results are replayed and findings are reported in file order, like in the per-file path.
         """
-        # mypy: make sure build_path is not None here
-        assert self.build_path is not None, "build_path must be set before calling __get_cmd_esp32"
-        build_path: Path = self.build_path
-
-        # These flags are added by esp-idf, however they are not recognized by clang-tidy:
-        strings_to_substitute = [
-            "-mlongcalls",
-            "-fno-tree-switch-conversion",
-            "-fstrict-volatile-bitfields",
-            "-fno-shrink-wrap",
-        ]
-
-        compile_db = build_path / "compile_commands.json"
-        if not compile_db.is_file():
-            logger.error("Compilation database does not exist.")
-            logger.info("Did you run `pwrforge build`?")
-            sys.exit(1)
-
-        # Prepare a copy of compilation database with stripped flags
-        file_contents = compile_db.read_text(encoding="utf-8")
-        for flag in strings_to_substitute:
-            file_contents = file_contents.replace(flag, "")
-
-        db_dir_for_check = build_path / "compilation_db_for_check"
-        db_dir_for_check.mkdir(parents=True, exist_ok=True)
-        db_path_for_check = db_dir_for_check / "compile_commands.json"
-        db_path_for_check.write_text(file_contents, encoding="utf-8")
-
-        include_dirs: Set[Path] = set()
-
-        def _add_include_dir(path_str: str, log_prefix: str) -> None:
-            """Add include dir if it exists."""
-            if not path_str:
-                return
-            path = Path(path_str).resolve()
-            if path.is_dir():
-                logger.info(log_prefix, path)
-                include_dirs.add(path)
-
-        def _add_sysroot_includes(root: Path) -> None:
-            """Add typical sysroot include locations."""
-            logger.info("Using ESP32 GCC sysroot for clang-tidy: %s", root)
-            for suffix in ("include", "usr/include"):
-                candidate = root / suffix
-                if candidate.is_dir():
-                    logger.info("Adding ESP32 sysroot include for clang-tidy: %s", candidate)
-                    include_dirs.add(candidate)
-
-        # Collect extra include paths for clang-tidy from xtensa-esp32-elf-gcc
-        gcc_path = shutil.which("xtensa-esp32-elf-gcc")
-        if gcc_path:
-            try:
-                _add_include_dir(
-                    subprocess.check_output(
-                        [gcc_path, "-print-file-name=include"],
-                        text=True,
-                        encoding="utf-8",
-                    ).strip(),
-                    "Using ESP32 GCC include dir for clang-tidy: %s",
-                )
-
-                _add_include_dir(
-                    subprocess.check_output(
-                        [gcc_path, "-print-file-name=include-fixed"],
-                        text=True,
-                        encoding="utf-8",
-                    ).strip(),
-                    "Using ESP32 GCC include-fixed dir for clang-tidy: %s",
-                )
-
-                sysroot = subprocess.check_output(
-                    [gcc_path, "--print-sysroot"],
-                    text=True,
-                    encoding="utf-8",
-                ).strip()
-                if sysroot:
-                    _add_sysroot_includes(Path(sysroot).resolve())
-
-            except (subprocess.CalledProcessError, OSError) as exc:
-                # We do not want to fail the whole check if detection fails,
-                # we just log it and continue with whatever we have.
-                logger.debug("Failed to detect ESP32 toolchain includes for clang-tidy: %s", exc)
-
-        # ESP-IDF newlib platform includes (assert.h, stdlib.h chain)
-        newlib_platform_include = (
-            Path(os.environ.get("IDF_PATH", "/opt/esp-idf")) / "components" / "newlib" / "platform_include"
+        self.init_cache_salt()
+        file_paths = self.get_files()
+        cache_keys, cache_entries = self._get_cache_entries(file_paths)
+        outputs, durations = self._dry_run_files(
+            [file_path for file_path in file_paths if file_path not in cache_entries]
         )
-        if newlib_platform_include.is_dir():
-            logger.info(
-                "Adding ESP-IDF newlib platform_include for clang-tidy: %s",
-                newlib_platform_include,
-            )
-            include_dirs.add(newlib_platform_include)
-
-        # Build extra-arg list
-        extra_args = [f"-extra-arg=-I{inc_dir}" for inc_dir in sorted(include_dirs)]
-
-        # Prefer esp-clang clang-tidy, fall back to system one
-        cmd: List[str] = [
-            shutil.which("/opt/esp-idf/tools/esp-clang/esp-19.1.2_20250312/esp-clang/bin/clang-tidy")
-            or shutil.which("clang-tidy")
-            or "/opt/esp-idf/tools/esp-clang/esp-19.1.2_20250312/esp-clang/bin/clang-tidy",
-            "-header-filter=^/workspace/src(/|$)",
-            *extra_args,
-            "-p",
-            str(db_dir_for_check),
-            str(file_path),
-        ]
-
-        return cmd
-
-    def __get_cmd_x86(self, file_path: Path) -> List[str]:
-        return ["clang-tidy", str(file_path), "-p", str(self.build_path)]
-
-    def __get_cmd_arm(self, file_path: Path) -> List[str]:
-        cmd = self.__get_cmd_x86(file_path)
-        arm_none_eabi_includes = "/opt/gcc-arm-none-eabi/arm-none-eabi/include"
-
-        # Add includes to standard library from toolchain:
-        path = Path(arm_none_eabi_includes)
-        cmd.extend(["--extra-arg", f"-I{path}"])
-        cpp_ver = os.listdir(Path(path, "c++"))[-1]
-        path = Path(path, "c++", cpp_ver)
-        cmd.extend(["--extra-arg", f"-I{path}"])
-        path = Path(path, "arm-none-eabi")
-        cmd.extend(["--extra-arg", f"-I{path}"])
-        return cmd
-
-
-def find_files(dir_path: Path, glob_patterns: Sequence[str], exclude_patterns: Sequence[str]) -> Iterable[Path]:
-    exclude_list = [path for pattern in exclude_patterns for path in glob.glob(pattern)]
-
-    for file_path in chain.from_iterable(dir_path.rglob(pattern) for pattern in glob_patterns):
-        if file_path.is_file():
-            if any(exclude in str(file_path) for exclude in exclude_list):
-                logger.info("Skipping %s", file_path)
-                continue
-
-            yield file_path
 
+        error_counter = 0
+        files_to_fix: List[Path] = []
+        for file_path in file_paths:
+            if file_path in cache_entries:
+                result = self.replay_cache_entry(cache_entries[file_path])
+            else:
+                with capture_log_records() as records:
+                    result = self._report_file(file_path, outputs[file_path])
+                if self._cache is not None:
+                    self.store_cache_entry(cache_keys[file_path], result, records)
+                replay_log_records(records)
+            self.publish_findings(result.findings, durations.get(file_path))
+            self.record_file_time(file_path, durations.get(file_path))
+            error_counter += result.problems_found
+            if result.problems_found > 0 and self._fix_errors and result.fix:
+                files_to_fix.append(file_path)
 
-class CyclomaticChecker(CheckerFixer):
-    check_name = "cyclomatic"
+        if files_to_fix:
+            logger.info("Fixing...")
+            self._fix_chunks(files_to_fix)
+        return error_counter
 
-    def check_files(self) -> int:
+    def fix_files(self, file_paths: Sequence[Path]) -> List[Path]:
         """
-        Run lizard with the configured parameters and collect all cyclomatic complexity issues.
+        Check files in batches, skipping files cached as formatted, then format the failing ones in batches.
+        Fixed files are stored as formatted, so the next check or fix skips them.
         """
-        cmd = ["lizard", str(self._config.source_dir_path), "-C", "25", "-w"]
-
-        for exclude_pattern in self.get_exclude_patterns():
-            cmd.extend(["-x", exclude_pattern])
-
-        all_issues = []
-
-        try:
-            log_cmd = " ".join(cmd)
-            logger.info(f"{log_cmd}")
-            result = subprocess.run(cmd, capture_output=True, text=True, check=False)
-            all_issues = self._collect_lizard_issues(result.stdout)
-
-        except subprocess.CalledProcessError:
-            logger.error(f"{self.check_name} check failed!")
-
-        issue_len = len(all_issues)
-        if issue_len:
-            logger.info("Collected lizard issues:")
-            for issue in all_issues:
-                logger.warning(issue)
-        else:
-            logger.info("No issues found in lizard output.")
-        return issue_len
-
-    def _collect_lizard_issues(self, output: str) -> List[str]:
+        self.init_cache_salt()
+        _, cache_entries = self._get_cache_entries(file_paths)
+        outputs, _ = self._dry_run_files([file_path for file_path in file_paths if file_path not in cache_entries])
+        files_to_fix = []
+        for file_path in file_paths:
+            entry = cache_entries.get(file_path)
+            if entry is not None:
+                if entry["problems_found"] > 0 and entry["fix"]:
+                    files_to_fix.append(file_path)
+            elif outputs[file_path] is not None:
+                files_to_fix.append(file_path)
+            else:
+                self.store_result(file_path, CheckResult(0))
+        if files_to_fix:
+            self._fix_chunks(files_to_fix)
+            for file_path in files_to_fix:
+                self.store_result(file_path, CheckResult(0))
+        return files_to_fix
+
+    def _get_cache_entries(self, file_paths: Sequence[Path]) -> Tuple[Dict[Path, str], Dict[Path, Dict[str, Any]]]:
         """
-        Parse lizard output and collect lines with warnings or errors.
+        :return: cache keys of the files and the cache entries found for them
         """
-        issues = []
-        for line in output.splitlines():
-            if "warning:" in line or "error:" in line:
-                issues.append(line)
-        return issues
-
-    def report(self, count: int) -> None:
-        logger.info(f"Finished {self.check_name} check with {count} issues.")
-
-    def check_file(self, file_path: Path) -> CheckResult:
-        raise NotImplementedError
-
-
-class CppcheckChecker(CheckerFixer):
-    check_name = "cppcheck"
-
-    def check_files(self) -> int:
+        cache_keys: Dict[Path, str] = {}
+        cache_entries: Dict[Path, Dict[str, Any]] = {}
+        if self._cache is not None:
+            for file_path in file_paths:
+                cache_keys[file_path] = self.get_cache_key(file_path)
+                entry = self._cache.get(cache_keys[file_path])
+                if entry is not None:
+                    cache_entries[file_path] = entry
+        return cache_keys, cache_entries
+
+    def _dry_run_files(self, file_paths: Sequence[Path]) -> Tuple[Dict[Path, Optional[str]], Dict[Path, float]]:
         """
-        Run cppcheck with the configured suppressions and directories and collect all issues.
+        :return: clang-format diagnostics for every file, None for formatted files, and check time of every file
         """
-        cmd = [
-            "cppcheck",
-            "--enable=all",
-            "--inline-suppr",
-            "--language=c++",
-            "--std=c++17",
-        ]
-
-        # Add suppression rules
-        for suppress in self.get_suppression_rules():
-            cmd.append(f"--suppress={suppress}")
-
-        # Add directories to check
-        directories = self.get_directories_to_check()
-        cmd.extend(directories)
-
-        all_issues = []
 
-        try:
-            log_cmd = " ".join(cmd)
-            logger.info(f"{log_cmd}")
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-            if result.returncode != 0 or result.stderr:
-                all_issues = self._collect_cppcheck_issues(result.stderr)
-        except subprocess.CalledProcessError:
-            logger.error(f"{self.check_name} check failed!")
-
-        # Return the total number of issues found
-        issue_len = len(all_issues)
-        if issue_len:
-            logger.info("Collected cppcheck issues:")
-            for issue in all_issues:
-                logger.warning(issue)
-        return issue_len
-
-    def _collect_cppcheck_issues(self, output: str) -> List[str]:
+        def run_chunk(chunk: Sequence[Path]) -> Tuple[Dict[Path, Optional[str]], float]:
+            start = time.perf_counter()
+            chunk_outputs = self._run_dry_run(chunk)
+            return chunk_outputs, (time.perf_counter() - start) / len(chunk)
+
+        outputs: Dict[Path, Optional[str]] = {}
+        # Files of a batch are checked by one process, each of them gets an equal share of its time
+        durations: Dict[Path, float] = {}
+        for chunk_outputs, duration in self._map_chunks(run_chunk, file_paths, CLANG_FORMAT_DRY_RUN_CMD):
+            outputs.update(chunk_outputs)
+            durations.update(dict.fromkeys(chunk_outputs, duration))
+        return outputs, durations
+
+    def _fix_chunks(self, file_paths: Sequence[Path]) -> None:
+        for _ in self._map_chunks(self._run_fix, file_paths, CLANG_FORMAT_FIX_CMD):
+            pass
+
+    def _map_chunks(
+        self,
+        func: Callable[[Sequence[Path]], T],
+        file_paths: Sequence[Path],
+        cmd: Sequence[str],
+    ) -> Iterator[T]:
         """
-        Collect cppcheck issues and return a list of all real problems found.
+        Split files into chunks spread over `jobs` workers and call `func` for every chunk.
         """
-        issues: List[str] = []
-        issue_pattern = re.compile(r"(.+):(\d+):\d+: (.+) \[(.+)\]")
-
-        for line in output.splitlines():
-            match = issue_pattern.match(line)
-            if not match:
-                continue
-
-            file_path = match.group(1)
-            line_number = match.group(2)
-            message = match.group(3)
-            category = match.group(4)
-
-            # Ignore informational cppcheck report about active checkers
-            if category == "checkersReport":
-                continue
+        chunk_size = min(self.batch_size, -(-len(file_paths) // self._jobs)) if file_paths else 1
+        chunks = list(chunk_file_paths(file_paths, chunk_size))
+        for chunk in chunks:
+            log_cmd = " ".join([*cmd, *map(str, chunk)])
+            logger.info(f"{log_cmd}")
 
-            formatted_issue = f"{file_path}:{line_number}: {message} [{category}]"
-            issues.append(formatted_issue)
+        def run(chunk: Sequence[Path]) -> T:
+            with self.hold_jobs():
+                self.raise_if_cancelled()
+                return func(chunk)
 
-        return issues
+        if self._jobs == 1 or len(chunks) == 1:
+            yield from map(run, chunks)
+            return
+        with create_thread_pool(self._jobs) as executor:
+            yield from executor.map(run, chunks)
 
-    def report(self, count: int) -> None:
+    def _run_dry_run(self, file_paths: Sequence[Path]) -> Dict[Path, Optional[str]]:
         """
-        Report the check status, providing a summary of all issues found.
+        Run clang-format in dry run mode on a batch of files.
+
+        :return: clang-format diagnostics for every file, None for formatted files
         """
-        if count > 0:
-            logger.error(f"{self.check_name} check fail!")
+        result = subprocess.run(
+            [*CLANG_FORMAT_DRY_RUN_CMD, *map(str, file_paths)],
+            capture_output=True,
+            check=False,
+        )
+        if result.returncode == 0:
+            return dict.fromkeys(file_paths)
+        output = result.stdout.decode() + result.stderr.decode()
+        if len(file_paths) == 1:
+            return {file_paths[0]: output}
+
+        outputs: Dict[Path, Optional[str]] = dict(split_diagnostics_per_file(output, file_paths))
+        if not outputs:
+            # Failure not attributed to any file (e.g. a crash or missing file), check files one by one
+            for file_path in file_paths:
+                outputs.update(self._run_dry_run([file_path]))
+        return {file_path: outputs.get(file_path) for file_path in file_paths}
+
+    @staticmethod
+    def _run_fix(file_paths: Sequence[Path]) -> None:
+        subprocess.check_call([*CLANG_FORMAT_FIX_CMD, *map(str, file_paths)])
+
+    def _report_file(self, file_path: Path, output: Optional[str]) -> CheckResult:
+        if output is None:
+            return CheckResult(0)
+        if self._verbose:
+            logger.info(output)
         else:
-            logger.info(f"Finished {self.check_name} check. No problems found.")
+            logger.warning("clang-format found error in file %s", file_path)
+        findings = tuple(parse_diagnostics(output)) or (
+            Finding(str(file_path), "clang-format found error", rule="clang-format-violations", level="error"),
+        )
+        return CheckResult(1, findings=findings)
 
-    def get_suppression_rules(self) -> List[str]:
-        """
-        Retrieve the suppression rules from the config.
-        """
-        cppcheck_config = self._config.check.cppcheck
-        return cppcheck_config.suppress  # Ensure this attribute exists and is a List[str]
+    def check_file(self, file_path: Path) -> CheckResult:
+        log_cmd = " ".join([*CLANG_FORMAT_DRY_RUN_CMD, str(file_path)])
+        logger.info(f"{log_cmd}")
+        return self._report_file(file_path, self._run_dry_run([file_path])[file_path])
 
-    def get_directories_to_check(self) -> List[str]:
+    def fix_content(self, file_path: Path, content: str) -> str:
         """
-        Retrieve the directories to check from the config.
+        Format contents passed through standard input, the style is looked up as for the file itself.
         """
-        cppcheck_config = self._config.check.cppcheck
-        return cppcheck_config.directories  # Ensure this attribute exists and is a List[str]
-
-    def check_file(self, file_path: Path) -> CheckResult:
-        raise NotImplementedError
+        result = subprocess.run(
+            [*CLANG_FORMAT_STDIN_CMD, f"--assume-filename={file_path}"],
+            input=content.encode("utf-8"),
+            capture_output=True,
+            check=False,
+        )
+        if result.returncode != 0:
+            logger.error("clang-format failed on %s: %s", file_path, result.stderr.decode().strip())
+            return content
+        return result.stdout.decode("utf-8")
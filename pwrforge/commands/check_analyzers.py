@@ -0,0 +1,424 @@
+"""Cyclomatic complexity and cppcheck checkers"""
+
+import json
+import re
+import subprocess
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from pwrforge.commands.check_base import (
+    CheckerFixer,
+    CheckResult,
+    find_files,
+    find_profile_build_dir,
+)
+from pwrforge.global_values import (
+    PWRFORGE_CPPCHECK_BUILD_DIR,
+    PWRFORGE_CYCLOMATIC_HISTORY_FILE,
+    PWRFORGE_CYCLOMATIC_METRICS_FILE,
+    PWRFORGE_SRC_EXTENSIONS_DEFAULT,
+)
+from pwrforge.logger import get_logger
+from pwrforge.utils.cache_utils import hash_content, write_file_atomically
+from pwrforge.utils.lizard_utils import (
+    FunctionMetrics,
+    analyze_source,
+    get_lizard_version,
+    is_lizard_source,
+)
+from pwrforge.utils.report_utils import Finding
+
+logger = get_logger()
+
+
+CYCLOMATIC_HOT_SPOTS = 10
+LIZARD_ISSUE_PATTERN = re.compile(r"^(?P<file>.+?):(?P<line>\d+): (?P<severity>warning|error): (?P<message>.*)$")
+CPPCHECK_OUTPUT_PATTERN = re.compile(r"(.+):(\d+):\d+: (.+) \[(.+)\]")
+CPPCHECK_ISSUE_PATTERN = re.compile(
+    r"^(?P<file>.+?):(?P<line>\d+): (?:(?P<severity>\w+): )?(?P<message>.*) \[(?P<rule>[^\]]+)\]$"
+)
+
+
+class CyclomaticChecker(CheckerFixer):
+    check_name = "cyclomatic"
+    whole_project = True
+
+    def check_files(self) -> int:
+        """
+        Compute function metrics with lizard and report functions over the configured thresholds.
+
+        Metrics are stored per file together with the hash of its contents, so only new and changed files are
+        analysed again, in a process pool when more than one job is used.
+        """
+        file_paths = self.get_files()
+        if self._changed_files is not None and not file_paths:
+            logger.info("No changed files to check")
+            return 0
+
+        metrics_path = self._config.project_root / PWRFORGE_CYCLOMATIC_METRICS_FILE
+        files_metrics = self.update_metrics(file_paths, self.load_metrics(metrics_path))
+
+        issue_len = 0
+        for file_path in file_paths:
+            issues = self.get_issues(file_path, files_metrics[self.get_metrics_key(file_path)]["functions"])
+            if issues and not issue_len:
+                logger.info("Collected lizard issues:")
+            for issue in issues:
+                logger.warning(issue)
+            issue_len += len(issues)
+            self.publish_findings([self._get_finding(issue) for issue in issues])
+        if not issue_len:
+            logger.info("No functions over the complexity thresholds.")
+
+        write_file_atomically(metrics_path, json.dumps({"lizard": get_lizard_version(), "files": files_metrics}))
+        if self._changed_files is None:
+            self.append_history(files_metrics, issue_len)
+        return issue_len
+
+    def get_files(self) -> List[Path]:
+        """
+        Files in any language lizard supports, e.g. also `.cc` and `.cxx` sources, like `lizard <source dir>`.
+        """
+        if self._file_paths is None:
+            self._file_paths = self.filter_changed(
+                file_path
+                for file_path in find_files(
+                    self._config.source_dir_path, ("*",), self.get_exclude_patterns(), self._file_index
+                )
+                if is_lizard_source(file_path.name)
+            )
+        return self._file_paths
+
+    def get_metrics_key(self, file_path: Path) -> str:
+        try:
+            return file_path.absolute().relative_to(self._config.project_root.absolute()).as_posix()
+        except ValueError:
+            return file_path.absolute().as_posix()
+
+    def load_metrics(self, metrics_path: Path) -> Dict[str, Any]:
+        """
+        Metrics stored by the previous run, empty if there are none or they come from another lizard version.
+        """
+        try:
+            data = json.loads(metrics_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict) or data.get("lizard") != get_lizard_version():
+            return {}
+        return data.get("files", {})  # type: ignore[no-any-return]
+
+    def update_metrics(self, file_paths: List[Path], stored_metrics: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Metrics of the checked files, reusing the stored ones of files which did not change unless the cache
+        is disabled. In a full run files which are not checked any more are dropped, otherwise their metrics are kept.
+
+        :param file_paths: checked files
+        :param stored_metrics: metrics by file from the previous run
+        :return: metrics by file: content hash and functions
+        """
+        files_metrics = dict(stored_metrics) if self._changed_files is not None else {}
+        to_analyze = self._reuse_stored_metrics(file_paths, stored_metrics, files_metrics)
+        if to_analyze:
+            logger.info(f"Analysing {len(to_analyze)} of {len(file_paths)} files with lizard")
+        results = self._analyze_sources([key for key, _, _ in to_analyze], [content for _, _, content in to_analyze])
+        for (key, content_hash, _), functions in zip(to_analyze, results):
+            files_metrics[key] = {"hash": content_hash, "functions": [list(function) for function in functions]}
+        return files_metrics
+
+    def _reuse_stored_metrics(
+        self, file_paths: List[Path], stored_metrics: Dict[str, Any], files_metrics: Dict[str, Any]
+    ) -> List[Tuple[str, str, str]]:
+        """
+        Copy stored metrics of unchanged files into `files_metrics`.
+
+        :return: metrics key, content hash and contents of every file to analyse
+        """
+        to_analyze = []
+        for file_path in file_paths:
+            key = self.get_metrics_key(file_path)
+            content = file_path.read_bytes()
+            content_hash = hash_content(content)
+            stored = stored_metrics.get(key) if self._cache is not None else None
+            if stored is not None and stored.get("hash") == content_hash:
+                files_metrics[key] = stored
+            else:
+                to_analyze.append((key, content_hash, content.decode("utf-8", errors="replace")))
+        return to_analyze
+
+    def _analyze_sources(self, names: List[str], contents: List[str]) -> List[List[FunctionMetrics]]:
+        """
+        Analyse sources with lizard, in a process pool when more than one job is granted.
+        """
+        self.raise_if_cancelled()
+        with self.hold_jobs(min(self._jobs, len(names)), whole_project=True) as jobs:
+            if jobs == 1 or len(names) < 2:
+                return list(map(analyze_source, names, contents))
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                chunk_size = max(1, len(names) // (jobs * 4))
+                return list(executor.map(analyze_source, names, contents, chunksize=chunk_size))
+
+    def get_issues(self, file_path: Path, functions: List[List[Any]]) -> List[str]:
+        """
+        Functions over any of the thresholds, in the format of lizard warnings.
+        """
+        check_config = self._config.check.cyclomatic
+        issues = []
+        for function in map(FunctionMetrics._make, functions):
+            if (
+                function.ccn > check_config.ccn
+                or function.length > check_config.length
+                or function.parameters > check_config.arguments
+            ):
+                issues.append(
+                    f"{file_path}:{function.line}: warning: {function.name} has {function.nloc} NLOC, "
+                    f"{function.ccn} CCN, {function.tokens} token, {function.parameters} PARAM, "
+                    f"{function.length} length"
+                )
+        return issues
+
+    def append_history(self, files_metrics: Dict[str, Any], issue_count: int) -> None:
+        """
+        Append a summary of the run with the most complex functions to the metrics history.
+        """
+        functions = [
+            (key, FunctionMetrics._make(function))
+            for key, file_metrics in files_metrics.items()
+            for function in file_metrics["functions"]
+        ]
+        hot_spots = sorted(functions, key=lambda item: (-item[1].ccn, -item[1].nloc, item[0], item[1].line))
+        entry = {
+            "time": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "files": len(files_metrics),
+            "functions": len(functions),
+            "issues": issue_count,
+            "ccn": sum(function.ccn for _, function in functions),
+            "hotspots": [
+                {"file": key, "function": function.name, "line": function.line, "ccn": function.ccn}
+                for key, function in hot_spots[:CYCLOMATIC_HOT_SPOTS]
+            ],
+        }
+        history_path = self._config.project_root / PWRFORGE_CYCLOMATIC_HISTORY_FILE
+        history_path.parent.mkdir(parents=True, exist_ok=True)
+        with history_path.open("a", encoding="utf-8") as history_file:
+            history_file.write(json.dumps(entry) + "\n")
+
+    @staticmethod
+    def _get_finding(issue: str) -> Finding:
+        match = LIZARD_ISSUE_PATTERN.match(issue)
+        if not match:
+            return Finding("", issue, rule="cyclomatic-complexity")
+        return Finding(
+            match.group("file"),
+            match.group("message"),
+            line=int(match.group("line")),
+            rule="cyclomatic-complexity",
+            level=match.group("severity"),
+        )
+
+    def report(self, count: int) -> None:
+        logger.info(f"Finished {self.check_name} check with {count} issues.")
+
+    def check_file(self, file_path: Path) -> CheckResult:
+        raise NotImplementedError
+
+
+class CppcheckChecker(CheckerFixer):
+    check_name = "cppcheck"
+    whole_project = True
+
+    def check_files(self) -> int:
+        """
+        Run cppcheck with the configured suppressions and directories and report issues as cppcheck prints them.
+
+        Analysis results are kept in a build dir, so cppcheck analyses again only files which changed since the
+        previous run. When the project was built, the compilation database is checked instead of bare directories,
+        so include paths and defines are the same as in the build.
+        """
+        build_dir = self._config.project_root / PWRFORGE_CPPCHECK_BUILD_DIR
+        build_dir.mkdir(parents=True, exist_ok=True)
+        # Options following the number of jobs, which is known only once the jobs are granted
+        args: List[str] = []
+
+        # Add suppression rules
+        for suppress in self.get_suppression_rules():
+            args.append(f"--suppress={suppress}")
+
+        directories = self.get_directories_to_check()
+        compile_commands = self.get_compilation_database()
+        if compile_commands is not None:
+            args.append(f"--project={compile_commands}")
+            args.extend(f"--file-filter={file_filter}" for file_filter in self.get_file_filters(directories))
+        else:
+            args.extend(["--language=c++", "--std=c++17"])
+            # Add directories to check
+            if self._changed_files is not None:
+                changed_sources = self.get_changed_sources(directories)
+                if not changed_sources:
+                    logger.info("No changed files to check")
+                    return 0
+                args.extend(changed_sources)
+            else:
+                args.extend(directories)
+
+        all_issues: List[str] = []
+        with self.hold_jobs(self._config.check.cppcheck.jobs or self._jobs, whole_project=True) as jobs:
+            cmd = [
+                "cppcheck",
+                "--enable=all",
+                "--inline-suppr",
+                f"--cppcheck-build-dir={build_dir}",
+                "-j",
+                str(jobs),
+                *args,
+            ]
+            log_cmd = " ".join(cmd)
+            logger.info(f"{log_cmd}")
+            self.raise_if_cancelled()
+            with subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True) as process:
+                self.terminate_when_cancelled(process)
+                assert process.stderr is not None
+                for line in process.stderr:
+                    issue = self._parse_cppcheck_issue(line.rstrip("\n"))
+                    if issue is not None:
+                        self._report_issue(issue, first=not all_issues)
+                        all_issues.append(issue)
+        # Results of a terminated run are incomplete, they are not returned
+        self.raise_if_cancelled()
+        if process.returncode != 0:
+            logger.error(f"{self.check_name} check failed!")
+
+        # Return the total number of issues found
+        return len(all_issues)
+
+    def terminate_when_cancelled(self, process: "subprocess.Popen[str]") -> None:
+        """
+        Terminate the cppcheck process if the check is cancelled while it runs.
+        """
+        cancel_event = self._cancel_event
+        if cancel_event is None:
+            return
+
+        def watch() -> None:
+            while process.poll() is None:
+                if cancel_event.wait(0.1):
+                    process.terminate()
+                    return
+
+        threading.Thread(target=watch, daemon=True).start()
+
+    def _report_issue(self, issue: str, first: bool) -> None:
+        if first:
+            logger.info("Collected cppcheck issues:")
+        logger.warning(issue)
+        self.publish_findings([self._get_finding(issue)])
+
+    @staticmethod
+    def _get_finding(issue: str) -> Finding:
+        match = CPPCHECK_ISSUE_PATTERN.match(issue)
+        if not match:
+            return Finding("", issue)
+        severity = match.group("severity")
+        return Finding(
+            match.group("file"),
+            match.group("message"),
+            line=int(match.group("line")),
+            rule=match.group("rule"),
+            level={"error": "error", "information": "note"}.get(severity or "", "warning"),
+        )
+
+    def is_affected(self) -> bool:
+        directories = self.get_directories_to_check()
+        if self._changed_files is None or not directories:
+            return super().is_affected()
+        return bool(self.get_changed_sources(directories))
+
+    def get_changed_sources(self, directories: List[str]) -> List[str]:
+        """
+        Changed C/C++ files from the directories to check.
+        """
+        assert self._changed_files is not None
+        resolved_directories = [Path(directory).resolve() for directory in directories]
+        return [
+            str(file_path)
+            for file_path in sorted(self._changed_files)
+            if file_path.suffix in (".h", ".hpp", ".c", ".cpp")
+            and any(file_path.is_relative_to(directory) for directory in resolved_directories)
+        ]
+
+    def get_compilation_database(self) -> Optional[Path]:
+        """
+        Compilation database of the first built profile, None if the project was not built.
+        """
+        build_path = find_profile_build_dir(self._config)
+        if build_path is None or not Path(build_path, "compile_commands.json").is_file():
+            return None
+        return build_path / "compile_commands.json"
+
+    def get_file_filters(self, directories: List[str]) -> List[str]:
+        """
+        Limit the translation units of the compilation database to the directories or to the changed files.
+        Translation units are not filtered by changed headers, the build dir keeps re-analysis of the unchanged
+        ones cheap.
+        """
+        resolved_directories = [Path(directory).resolve() for directory in directories]
+        if self._changed_files is not None:
+            changed_files = [
+                file_path
+                for file_path in sorted(self._changed_files)
+                if not resolved_directories
+                or any(file_path.is_relative_to(directory) for directory in resolved_directories)
+            ]
+            if changed_files and all(
+                file_path.suffix in PWRFORGE_SRC_EXTENSIONS_DEFAULT for file_path in changed_files
+            ):
+                return [str(file_path) for file_path in changed_files]
+        return [f"{directory}/*" for directory in resolved_directories]
+
+    @staticmethod
+    def _parse_cppcheck_issue(line: str) -> Optional[str]:
+        """
+        Parse one line of cppcheck output, None if it is not a real problem.
+        """
+        match = CPPCHECK_OUTPUT_PATTERN.match(line)
+        if not match:
+            return None
+
+        file_path = match.group(1)
+        line_number = match.group(2)
+        message = match.group(3)
+        category = match.group(4)
+
+        # Ignore informational cppcheck report about active checkers
+        if category == "checkersReport":
+            return None
+
+        return f"{file_path}:{line_number}: {message} [{category}]"
+
+    def report(self, count: int) -> None:
+        """
+        Report the check status, providing a summary of all issues found.
+        """
+        if count > 0:
+            logger.error(f"{self.check_name} check fail!")
+        else:
+            logger.info(f"Finished {self.check_name} check. No problems found.")
+
+    def get_suppression_rules(self) -> List[str]:
+        """
+        Retrieve the suppression rules from the config.
+        """
+        cppcheck_config = self._config.check.cppcheck
+        return cppcheck_config.suppress  # Ensure this attribute exists and is a List[str]
+
+    def get_directories_to_check(self) -> List[str]:
+        """
+        Retrieve the directories to check from the config.
+        """
+        cppcheck_config = self._config.check.cppcheck
+        return cppcheck_config.directories  # Ensure this attribute exists and is a List[str]
+
+    def check_file(self, file_path: Path) -> CheckResult:
+        raise NotImplementedError
@@ -0,0 +1,710 @@
+"""Base classes and shared helpers of checkers"""
+
+import abc
+import fnmatch
+import logging
+import os
+import re
+import subprocess
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import (
+    AbstractSet,
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+from pwrforge import __version__
+from pwrforge.config import CheckConfig, Config
+from pwrforge.global_values import PWRFORGE_CHECK_CACHE_DIR
+from pwrforge.logger import get_logger
+from pwrforge.utils.cache_utils import (
+    JsonCache,
+    hash_content,
+    hash_data,
+    hash_file,
+    write_file_atomically,
+)
+from pwrforge.utils.file_utils import (
+    ExcludeMatcher,
+    FileIndex,
+    SourceCorpus,
+    SourceFile,
+    walk_files,
+)
+from pwrforge.utils.git_utils import get_changed_files
+from pwrforge.utils.report_utils import Finding, FindingsReporter
+from pwrforge.utils.timing_utils import CheckTimings
+
+logger = get_logger()
+
+
+_capture_state = threading.local()
+
+
+class _CaptureFilter(logging.Filter):
+    """Hold back records logged by a thread which is inside `capture_log_records`."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        records: Optional[List[logging.LogRecord]] = getattr(_capture_state, "records", None)
+        if records is None:
+            return True
+        records.append(record)
+        return False
+
+
+logger.addFilter(_CaptureFilter())
+
+
+@contextmanager
+def capture_log_records() -> Iterator[List[logging.LogRecord]]:
+    """
+    Collect log records emitted by the current thread instead of passing them to the handlers.
+
+    Records can be emitted later, in a deterministic order, with `replay_log_records`.
+    """
+    records: List[logging.LogRecord] = []
+    previous = getattr(_capture_state, "records", None)
+    _capture_state.records = records
+    try:
+        yield records
+    finally:
+        _capture_state.records = previous
+
+
+def replay_log_records(records: Iterable[logging.LogRecord]) -> None:
+    for record in records:
+        logger.handle(record)
+
+
+def _set_captured_records(records: Optional[List[logging.LogRecord]]) -> None:
+    _capture_state.records = records
+
+
+def create_thread_pool(max_workers: int) -> ThreadPoolExecutor:
+    """
+    Thread pool whose workers log into the records captured by the creating thread, if it captures them.
+
+    A checker running next to other checkers captures its output, so it is not mixed with theirs.
+    """
+    return ThreadPoolExecutor(
+        max_workers=max_workers,
+        initializer=_set_captured_records,
+        initargs=(getattr(_capture_state, "records", None),),
+    )
+
+
+class JobBudget:
+    """
+    Jobs shared by checkers running at the same time.
+
+    Every checked file, batch or translation unit holds a job while it runs, so all checkers together run at most
+    `jobs` tasks. Whole-project tools get at most half of the jobs, so per-file checks run next to them.
+    """
+
+    def __init__(self, jobs: int) -> None:
+        self.jobs = max(jobs, 1)
+        self._available = self.jobs
+        self._condition = threading.Condition()
+        # Jobs are given in the order they were asked for, so a checker is not starved by another one
+        self._waiting: Deque[object] = deque()
+
+    @contextmanager
+    def hold(self, count: int = 1, whole_project: bool = False) -> Iterator[int]:
+        """
+        Wait for jobs and hold them until the block exits.
+
+        :param count: number of jobs wanted
+        :param whole_project: take at most half of the jobs and only those which are free, waiting for at least one
+        :return: number of held jobs
+        """
+        if whole_project:
+            count = min(count, max(self.jobs // 2, 1))
+        count = min(max(count, 1), self.jobs)
+        needed = 1 if whole_project else count
+        ticket = object()
+        with self._condition:
+            self._waiting.append(ticket)
+            self._condition.wait_for(lambda: self._waiting[0] is ticket and self._available >= needed)
+            self._waiting.popleft()
+            held = min(count, self._available)
+            self._available -= held
+            self._condition.notify_all()
+        try:
+            yield held
+        finally:
+            with self._condition:
+                self._available += held
+                self._condition.notify_all()
+
+
+def get_default_jobs() -> int:
+    return os.cpu_count() or 1
+
+
+class CheckCancelled(Exception):
+    """Raised inside a checker when its check was cancelled, e.g. after another check failed with --fail-fast."""
+
+
+def get_check_cache(config: Config) -> JsonCache:
+    return JsonCache(config.project_root / PWRFORGE_CHECK_CACHE_DIR)
+
+
+def find_profile_build_dir(config: Config) -> Optional[Path]:
+    """
+    Build directory of the first profile which was built, None if none of them was.
+    """
+    target = config.project.default_target
+    for profile in config.profiles:
+        profile_build_dir = config.project_root / target.get_profile_build_dir(profile)
+        if profile_build_dir.is_dir():
+            return profile_build_dir
+    return None
+
+
+def get_changed_files_to_check(
+    config: Config, changed_since: Optional[str] = None, staged: bool = False
+) -> Optional[Set[Path]]:
+    """
+    Files changed according to git, None if all files should be checked.
+    """
+    if changed_since is None and not staged:
+        return None
+    changed_files = get_changed_files(config.project_root, changed_since, staged)
+    if staged:
+        logger.info("Limiting checks to %d files staged in git", len(changed_files))
+    else:
+        logger.info("Limiting checks to %d files changed since %s", len(changed_files), changed_since)
+    return changed_files
+
+
+class CheckResult(NamedTuple):
+    problems_found: int
+    fix: bool = True
+    findings: Tuple[Finding, ...] = ()
+
+
+class CheckerBase(abc.ABC):
+    """
+    Run environment of a check: files to check, shared corpus, job budget, cancellation, timings and reports.
+    """
+
+    check_name: str
+    headers_only = False
+    can_fix = False
+    # check_file reads files through the shared source corpus
+    uses_corpus = False
+    # One tool run checks all files, it gets a part of the job budget when checkers run at the same time
+    whole_project = False
+
+    def __init__(
+        self,
+        config: Config,
+        fix_errors: bool = False,
+        verbose: bool = False,
+        jobs: int = 1,
+        cache: Optional[JsonCache] = None,
+        corpus: Optional[SourceCorpus] = None,
+        changed_files: Optional[AbstractSet[Path]] = None,
+        file_index: Optional[FileIndex] = None,
+        reporter: Optional[FindingsReporter] = None,
+        job_budget: Optional[JobBudget] = None,
+        cancel_event: Optional[threading.Event] = None,
+        check_timings: Optional[CheckTimings] = None,
+    ) -> None:
+        self._config = config
+        self._fix_errors = fix_errors
+        self._verbose = verbose
+        self._jobs = max(jobs, 1)
+        self._cache = cache
+        self._cache_salt: Optional[str] = None
+        self._corpus = corpus
+        self._changed_files = changed_files
+        self._file_index = file_index
+        self._reporter = reporter
+        self._job_budget = job_budget
+        self._cancel_event = cancel_event
+        self._check_timings = check_timings
+        self._file_paths: Optional[List[Path]] = None
+        # Config file lookups of one check run, style files may be added or moved between runs in watch mode
+        self._config_file_lookup: Dict[Tuple[Path, Tuple[str, ...]], Optional[Path]] = {}
+
+    def check(self) -> int:
+        logger.info(f"Starting {self.check_name} check...")
+        start = time.perf_counter()
+        with self.measure():
+            error_count = self.check_files()
+        self.report(error_count)
+        if self._reporter is not None:
+            self._reporter.check_finished(self.check_name, error_count, time.perf_counter() - start)
+        return error_count
+
+    def is_enabled(self) -> bool:
+        """
+        Whether the check has everything it needs in the config, logs why if it does not.
+        """
+        return True
+
+    def get_files(self) -> List[Path]:
+        if self._file_paths is None:
+            self._file_paths = self.filter_changed(
+                find_files(
+                    self._config.source_dir_path,
+                    ("*.h", "*.hpp") if self.headers_only else ("*.h", "*.hpp", "*.c", "*.cpp"),
+                    self.get_exclude_patterns(),
+                    self._file_index,
+                )
+            )
+        return self._file_paths
+
+    def set_changed_files(self, changed_files: Optional[AbstractSet[Path]]) -> None:
+        """
+        Limit the next check to other changed files, e.g. when files change in watch mode.
+        """
+        self._changed_files = changed_files
+        self._file_paths = None
+        self._config_file_lookup.clear()
+
+    def find_config_file(self, dir_path: Path, file_names: Tuple[str, ...]) -> Optional[Path]:
+        """
+        Find a tool config file like `find_file_upwards`, remembering lookups until the files to check change.
+        """
+        return find_file_upwards(dir_path, file_names, self._config_file_lookup)
+
+    def is_affected(self) -> bool:
+        """
+        Whether the changed files can change the result of this check.
+        """
+        return self._changed_files is None or bool(self.get_files())
+
+    def filter_changed(self, file_paths: Iterable[Path]) -> List[Path]:
+        """
+        Keep only files changed in git, if checks are limited to changed files.
+        """
+        if self._changed_files is None:
+            return list(file_paths)
+        return [file_path for file_path in file_paths if file_path.resolve() in self._changed_files]
+
+    def get_source(self, file_path: Path) -> Optional[SourceFile]:
+        """
+        File contents from the shared corpus, None if this checker reads files on its own.
+        """
+        if self._corpus is None or not self.uses_corpus:
+            return None
+        return self._corpus.get(file_path)
+
+    def publish_findings(self, findings: Sequence[Finding], duration: Optional[float] = None) -> None:
+        """
+        Pass findings of a checked file or translation unit to the machine-readable report.
+        """
+        if self._reporter is not None:
+            self._reporter.file_checked(self.check_name, findings, duration)
+
+    @contextmanager
+    def measure(self) -> Iterator[None]:
+        """
+        Measure wall time and child process CPU time of the check, if timings are collected.
+        """
+        if self._check_timings is None:
+            yield
+            return
+        with self._check_timings.measure(self.check_name):
+            yield
+
+    def record_file_time(self, file_path: Path, duration: Optional[float]) -> None:
+        """
+        Record the wall time of checking a file or translation unit, if timings are collected.
+        """
+        if self._check_timings is not None:
+            self._check_timings.file_checked(self.check_name, file_path, duration)
+
+    @contextmanager
+    def hold_jobs(self, count: int = 1, whole_project: bool = False) -> Iterator[int]:
+        """
+        Hold jobs of the budget shared with checkers running at the same time, if there is one.
+
+        :return: number of jobs which may be used
+        """
+        if self._job_budget is None:
+            yield count
+            return
+        with self._job_budget.hold(count, whole_project) as held:
+            yield held
+
+    def raise_if_cancelled(self) -> None:
+        """
+        Stop the check, called before every file, batch or translation unit.
+
+        :raises CheckCancelled: if the check was cancelled
+        """
+        if self._cancel_event is not None and self._cancel_event.is_set():
+            raise CheckCancelled(self.check_name)
+
+    def map_files(self, func: Callable[[Path], CheckResult], file_paths: Iterable[Path]) -> Iterator[CheckResult]:
+        """
+        Call `func` for every file, using up to `jobs` worker threads.
+
+        Results are yielded and log records are emitted in the order of `file_paths`,
+        so the output does not depend on the number of jobs.
+        """
+        if self._jobs == 1:
+            yield from map(func, file_paths)
+            return
+
+        def run(file_path: Path) -> Tuple[CheckResult, List[logging.LogRecord]]:
+            with capture_log_records() as records:
+                result = func(file_path)
+            return result, records
+
+        executor = create_thread_pool(self._jobs)
+        try:
+            for result, records in executor.map(run, file_paths):
+                replay_log_records(records)
+                yield result
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def report(self, count: int) -> None:
+        problem_count = self.format_problem_count(count)
+        if self._fix_errors and self.can_fix:
+            logger.info(f"Finished {self.check_name} check. Fixed {problem_count}.")
+        else:
+            logger.info(f"Finished {self.check_name} check. Found {problem_count}.")
+            if count > 0:
+                logger.error(f"{self.check_name} check fail!")
+
+    @staticmethod
+    def format_problem_count(count: int) -> str:
+        return f"problems in {count} files"
+
+    def get_exclude_patterns(self) -> List[str]:
+        return [*self._config.check.exclude, *self.get_check_config().exclude]
+
+    def get_check_config(self) -> CheckConfig:
+        return getattr(self._config.check, self.check_name.replace("-", "_"))  # type: ignore[no-any-return]
+
+    @abc.abstractmethod
+    def check_files(self) -> int:
+        pass
+
+    @abc.abstractmethod
+    def check_file(self, file_path: Path) -> CheckResult:
+        pass
+
+
+class CheckerFixer(CheckerBase):
+    """
+    Check which caches results of unchanged files and can fix the files which do not pass it.
+    """
+
+    # Result of check_file depends only on the file contents, the checker config and the tool version
+    cacheable = False
+    # Rewrites whole files, so in the fix pipeline it runs after the other fixers, in memory on the files they
+    # changed and with fix_files on the other ones
+    formatter = False
+
+    def init_cache_salt(self) -> None:
+        if self._cache is not None and self.cacheable:
+            self._cache_salt = self.get_cache_salt()
+
+    def check_files(self) -> int:
+        error_counter = 0
+        self.init_cache_salt()
+        for result in self.map_files(self._check_and_fix_file, self.get_files()):
+            error_counter += result.problems_found
+        return error_counter
+
+    def _check_and_fix_file(self, file_path: Path) -> CheckResult:
+        start = time.perf_counter()
+        try:
+            with self.hold_jobs():
+                self.raise_if_cancelled()
+                result = self.check_file_cached(file_path)
+                duration = time.perf_counter() - start
+                self.publish_findings(result.findings, duration)
+                self.record_file_time(file_path, duration)
+                if result.problems_found > 0 and self._fix_errors and self.can_fix and result.fix:
+                    logger.info("Fixing...")
+                    self.fix_file(file_path)
+                    if self._corpus is not None:
+                        self._corpus.invalidate(file_path)
+        finally:
+            if self._corpus is not None and self.uses_corpus:
+                self._corpus.release(file_path)
+        return result
+
+    def check_file_cached(self, file_path: Path) -> CheckResult:
+        """
+        Check file or replay the findings stored for identical file contents by a previous run.
+        """
+        if self._cache is None or self._cache_salt is None:
+            return self.check_file(file_path)
+
+        key = self.get_cache_key(file_path)
+        entry = self._cache.get(key)
+        if entry is not None:
+            return self.replay_cache_entry(entry)
+
+        with capture_log_records() as records:
+            result = self.check_file(file_path)
+        self.store_cache_entry(key, result, records)
+        replay_log_records(records)
+        return result
+
+    def get_cached_result(self, file_path: Path) -> Optional[CheckResult]:
+        """
+        Result stored by a previous run for identical file contents, without replaying its log, None if there is none.
+        """
+        if self._cache is None or self._cache_salt is None:
+            return None
+        entry = self._cache.get(self.get_cache_key(file_path))
+        if entry is None:
+            return None
+        return CheckResult(
+            entry["problems_found"], entry["fix"], tuple(Finding(*item) for item in entry.get("findings", []))
+        )
+
+    def store_result(self, file_path: Path, result: CheckResult) -> None:
+        """
+        Store the result for the current contents of the file, e.g. after the file was fixed.
+        """
+        if self._cache is not None and self._cache_salt is not None:
+            self.store_cache_entry(self.get_cache_key(file_path), result, [])
+
+    @staticmethod
+    def replay_cache_entry(entry: Dict[str, Any]) -> CheckResult:
+        for level, message in entry["records"]:
+            logger.log(level, "%s", message)
+        findings = tuple(Finding(*finding) for finding in entry.get("findings", []))
+        return CheckResult(entry["problems_found"], entry["fix"], findings)
+
+    def store_cache_entry(self, key: str, result: CheckResult, records: List[logging.LogRecord]) -> None:
+        assert self._cache is not None
+        self._cache.put(
+            key,
+            {
+                "problems_found": result.problems_found,
+                "fix": result.fix,
+                "records": [(record.levelno, record.getMessage()) for record in records],
+                "findings": result.findings,
+            },
+        )
+
+    def get_cache_salt(self) -> str:
+        """
+        Hash of everything besides the file itself which may change the result of `check_file`.
+        """
+        return hash_data(
+            self.check_name,
+            self.get_check_config().json(),
+            self.get_tool_version(),
+            str(self._verbose),
+        )
+
+    def get_cache_key(self, file_path: Path) -> str:
+        assert self._cache_salt is not None, "cache salt must be computed before checking files"
+        return hash_data(
+            self._cache_salt, str(file_path), self.get_content_hash(file_path), *self.get_cache_inputs(file_path)
+        )
+
+    def get_content_hash(self, file_path: Path) -> str:
+        """
+        Hash of the part of the file contents which may change the result of `check_file`, by default all of it.
+        """
+        source = self.get_source(file_path)
+        return hash_content(source.data) if source is not None else hash_file(file_path)
+
+    def get_tool_version(self) -> str:
+        return __version__
+
+    def get_cache_inputs(self, file_path: Path) -> List[bytes]:  # pylint: disable=unused-argument
+        """
+        Additional per-file inputs of the check, e.g. style files found next to the checked file.
+        """
+        return []
+
+    def fix_files(self, file_paths: Sequence[Path]) -> List[Path]:
+        """
+        Fix files on disk which do not pass the check, formatters are run like this after the other fixers.
+
+        :return: fixed files
+        """
+        fixed_files = []
+        for file_path in file_paths:
+            result = self.check_file_cached(file_path)
+            if result.problems_found > 0 and result.fix:
+                self.fix_file(file_path)
+                fixed_files.append(file_path)
+        return fixed_files
+
+    def fix_file(self, file_path: Path) -> None:
+        """
+        Fix the file with `fix_content`, writing it atomically and only if it changed.
+        """
+        content = file_path.read_bytes().decode("utf-8")
+        fixed_content = self.fix_content(file_path, content)
+        if fixed_content != content:
+            write_file_atomically(file_path, fixed_content)
+
+    def fix_content(self, file_path: Path, content: str) -> str:  # pylint: disable=unused-argument
+        """
+        Fixed contents of a file which did not pass the check.
+
+        :param file_path: path of the file, the contents may already differ from the file on disk
+        :param content: current contents
+        :return: fixed contents
+        """
+        return content
+
+
+DIAGNOSTIC_PATTERN = re.compile(r"^(?P<file>.+?):(?P<line>\d+):(?P<column>\d+): (?P<severity>error|warning): ")
+DIAGNOSTIC_MESSAGE_PATTERN = re.compile(
+    r"^(?P<file>.+?):(?P<line>\d+):(?P<column>\d+): (?P<severity>error|warning|note): "
+    r"(?P<message>.*?)(?: \[(?P<rule>[^\]]+)\])?$"
+)
+
+
+def parse_diagnostics(output: str) -> Iterator[Finding]:
+    """
+    Findings from compiler-style output, one for every `file:line:col: error: message [rule]` line.
+    """
+    for line in output.splitlines():
+        match = DIAGNOSTIC_MESSAGE_PATTERN.match(line)
+        if not match or match.group("severity") == "note":
+            continue
+        rule = match.group("rule")
+        yield Finding(
+            file=match.group("file"),
+            message=match.group("message"),
+            line=int(match.group("line")),
+            column=int(match.group("column")),
+            rule=rule[2:] if rule and rule.startswith("-W") else rule,
+            level=match.group("severity"),
+        )
+
+
+def split_diagnostic_blocks(output: str) -> List[Tuple[Optional[str], str]]:
+    """
+    Split compiler-style output into diagnostic blocks: a `file:line:col: error: ...` line with its context lines.
+
+    :return: (file, block) tuples, file is None for output preceding the first diagnostic
+    """
+    blocks: List[Tuple[Optional[str], List[str]]] = []
+    for line in output.splitlines():
+        match = DIAGNOSTIC_PATTERN.match(line)
+        if match:
+            blocks.append((match.group("file"), [line]))
+        elif blocks:
+            blocks[-1][1].append(line)
+        else:
+            blocks.append((None, [line]))
+    return [(file, "\n".join(lines)) for file, lines in blocks]
+
+
+def chunk_file_paths(file_paths: Sequence[Path], chunk_size: int, max_chars: int = 100_000) -> Iterator[List[Path]]:
+    """
+    Split files into chunks of at most `chunk_size` files, keeping every command line below `max_chars`.
+    """
+    chunk: List[Path] = []
+    chunk_chars = 0
+    for file_path in file_paths:
+        path_chars = len(str(file_path)) + 1
+        if chunk and (len(chunk) >= chunk_size or chunk_chars + path_chars > max_chars):
+            yield chunk
+            chunk, chunk_chars = [], 0
+        chunk.append(file_path)
+        chunk_chars += path_chars
+    if chunk:
+        yield chunk
+
+
+def split_diagnostics_per_file(output: str, file_paths: Sequence[Path]) -> Dict[Path, str]:
+    """
+    Attribute compiler-style diagnostics (`file:line:col: error: ...` followed by context lines) to files.
+    """
+    paths_by_name = {str(file_path): file_path for file_path in file_paths}
+    outputs: Dict[Path, List[str]] = {}
+    current: Optional[List[str]] = None
+    for line in output.splitlines():
+        match = DIAGNOSTIC_PATTERN.match(line)
+        if match and match.group("file") in paths_by_name:
+            current = outputs.setdefault(paths_by_name[match.group("file")], [])
+        if current is not None:
+            current.append(line)
+    return {file_path: "\n".join(lines) for file_path, lines in outputs.items()}
+
+
+def get_program_version(program: str) -> str:
+    try:
+        return subprocess.run([program, "--version"], capture_output=True, text=True, check=True).stdout.strip()
+    except (subprocess.CalledProcessError, OSError):
+        return "unknown"
+
+
+def find_file_upwards(
+    dir_path: Path,
+    file_names: Tuple[str, ...],
+    lookup: Optional[Dict[Tuple[Path, Tuple[str, ...]], Optional[Path]]] = None,
+) -> Optional[Path]:
+    """
+    Find the first of `file_names` in `dir_path` or its closest parent, like clang tools look up their config.
+
+    :param lookup: results of earlier lookups, filled for every visited directory
+    """
+    if lookup is not None and (dir_path, file_names) in lookup:
+        return lookup[(dir_path, file_names)]
+    found = next((dir_path / name for name in file_names if (dir_path / name).is_file()), None)
+    if found is None and dir_path.parent != dir_path:
+        found = find_file_upwards(dir_path.parent, file_names, lookup)
+    if lookup is not None:
+        lookup[(dir_path, file_names)] = found
+    return found
+
+
+def find_files(
+    dir_path: Path,
+    glob_patterns: Sequence[str],
+    exclude_patterns: Sequence[str],
+    file_index: Optional[FileIndex] = None,
+) -> List[Path]:
+    """
+    Find files with names matching any of `glob_patterns` in a directory tree.
+
+    :param dir_path: root of the tree
+    :param glob_patterns: file name patterns, e.g. "*.cpp"
+    :param exclude_patterns: glob patterns of excluded files and directories, relative to the current directory
+    :param file_index: files listed earlier in this run, the tree is walked if not given
+    :return: sorted paths of the files found
+    """
+    name_regex = re.compile("|".join(fnmatch.translate(pattern) for pattern in glob_patterns))
+    exclude = ExcludeMatcher(exclude_patterns)
+    if file_index is None:
+        # Excluded directories are not entered at all
+        return [file_path for file_path in walk_files(dir_path, exclude) if name_regex.match(file_path.name)]
+
+    file_paths = []
+    for file_path in file_index.get_files(dir_path):
+        if not name_regex.match(file_path.name):
+            continue
+        if exclude.match(file_path):
+            logger.info("Skipping %s", file_path)
+            continue
+        file_paths.append(file_path)
+    return file_paths
+
+
+# Number of the most complex functions stored in each entry of the metrics history
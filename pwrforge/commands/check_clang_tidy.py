@@ -0,0 +1,658 @@
+"""Clang-tidy checker"""
+
+import json
+import os
+import re
+import shlex
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import as_completed
+from pathlib import Path
+from typing import (
+    AbstractSet,
+    Any,
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from pwrforge.commands.check_base import (
+    CheckerFixer,
+    CheckResult,
+    JobBudget,
+    create_thread_pool,
+    find_profile_build_dir,
+    get_program_version,
+    parse_diagnostics,
+    split_diagnostic_blocks,
+)
+from pwrforge.config import Config
+from pwrforge.logger import get_logger
+from pwrforge.utils.cache_utils import (
+    JsonCache,
+    hash_data,
+    hash_file,
+    write_file_atomically,
+)
+from pwrforge.utils.file_utils import ExcludeMatcher, FileIndex, SourceCorpus
+from pwrforge.utils.replacement_utils import (
+    Replacement,
+    apply_replacements,
+    load_replacements,
+    merge_replacements,
+)
+from pwrforge.utils.report_utils import Finding, FindingsReporter
+from pwrforge.utils.timing_utils import CheckTimings
+
+logger = get_logger()
+
+# These flags are added by esp-idf, however they are not recognized by clang-tidy:
+ESP32_UNSUPPORTED_FLAGS = (
+    "-mlongcalls",
+    "-fno-tree-switch-conversion",
+    "-fstrict-volatile-bitfields",
+    "-fno-shrink-wrap",
+)
+ESP32_CLANG_TIDY = "/opt/esp-idf/tools/esp-clang/esp-19.1.2_20250312/esp-clang/bin/clang-tidy"
+
+
+class Esp32TidyContext(NamedTuple):
+    """Toolchain includes and stripped compilation database shared by all clang-tidy calls of a run."""
+
+    db_dir: Path
+    include_dirs: List[Path]
+
+
+class ClangTidyChecker(CheckerFixer):
+    check_name = "clang-tidy"
+    build_path: Optional[Path] = None
+    esp32_context: Optional[Esp32TidyContext] = None
+    config_file_names = (".clang-tidy", "_clang-tidy")
+
+    def __init__(
+        self,
+        config: Config,
+        fix_errors: bool = False,
+        verbose: bool = False,
+        jobs: int = 1,
+        cache: Optional[JsonCache] = None,
+        corpus: Optional[SourceCorpus] = None,
+        changed_files: Optional[AbstractSet[Path]] = None,
+        file_index: Optional[FileIndex] = None,
+        reporter: Optional[FindingsReporter] = None,
+        job_budget: Optional[JobBudget] = None,
+        cancel_event: Optional[threading.Event] = None,
+        check_timings: Optional[CheckTimings] = None,
+    ) -> None:
+        super().__init__(
+            config,
+            fix_errors,
+            verbose,
+            jobs,
+            cache,
+            corpus,
+            changed_files,
+            file_index,
+            reporter,
+            job_budget,
+            cancel_event,
+            check_timings,
+        )
+        self._compile_commands: Dict[Path, Dict[str, Any]] = {}
+        # Version of every clang-tidy executable found in the compilation database
+        self._tool_versions: Dict[str, str] = {}
+
+    def check_files(self) -> int:
+        """
+        Run clang-tidy on every translation unit from the compilation database, like run-clang-tidy.
+
+        Translation units are scheduled over `jobs` workers and their results are reported as soon as they finish.
+        Diagnostics in headers shared by several translation units are reported once.
+        """
+        self.prepare()
+        translation_units = self.get_translation_units()
+        if self._changed_files is not None:
+            translation_units = self.select_changed_translation_units(translation_units)
+        logger.info("Running clang-tidy on %d translation units", len(translation_units))
+
+        reported_diagnostics: Set[str] = set()
+        files_with_problems: Set[str] = set()
+        for file_path, returncode, stdout, stderr, duration in self._run_translation_units(translation_units):
+            diagnostic_blocks = [(file, block) for file, block in split_diagnostic_blocks(stdout) if file is not None]
+            new_blocks = []
+            for diagnostic_file, block in diagnostic_blocks:
+                if block in reported_diagnostics:
+                    continue
+                reported_diagnostics.add(block)
+                new_blocks.append(block)
+                if diagnostic_file not in files_with_problems:
+                    files_with_problems.add(diagnostic_file)
+                    if not self._verbose:
+                        logger.warning("clang-tidy found error in file %s", diagnostic_file)
+            findings = [finding for block in new_blocks for finding in parse_diagnostics(block.split("\n", 1)[0])]
+
+            if returncode != 0 and not diagnostic_blocks:
+                # Failure without diagnostics, e.g. the translation unit could not be compiled
+                files_with_problems.add(str(file_path))
+                findings.append(Finding(str(file_path), "clang-tidy failed", level="error"))
+                if self._verbose:
+                    logger.info(stdout + stderr)
+                else:
+                    logger.warning("clang-tidy found error in file %s", file_path)
+            elif new_blocks and self._verbose:
+                logger.info("\n".join(new_blocks))
+            self.publish_findings(findings, duration)
+            self.record_file_time(file_path, duration)
+        return len(files_with_problems)
+
+    def fix_translation_units(self) -> int:
+        """
+        Apply clang-tidy fix-its of every translation unit in one pass.
+
+        Translation units run in parallel, each exporting its fixes to a separate file instead of applying them,
+        so fixes of headers shared by several translation units do not race. The exported fixes are merged,
+        duplicates and conflicting fixes are dropped, and every file is rewritten once.
+
+        :return: number of fixed files
+        """
+        logger.info(f"Starting {self.check_name} fix...")
+        self.prepare()
+        translation_units = self.get_translation_units()
+        if self._changed_files is not None:
+            translation_units = self.select_changed_translation_units(translation_units)
+        logger.info("Running clang-tidy on %d translation units", len(translation_units))
+
+        with tempfile.TemporaryDirectory(prefix="pwrforge-clang-tidy-") as fixes_dir:
+            replacements = self._export_fixes(translation_units, Path(fixes_dir))
+        fixed_count = self._apply_fixes(merge_replacements(replacements))
+        logger.info(f"Finished {self.check_name} fix. Fixed {self.format_problem_count(fixed_count)}.")
+        return fixed_count
+
+    def _export_fixes(self, translation_units: List[Path], fixes_dir: Path) -> List[Replacement]:
+        def run(index: int, file_path: Path) -> List[Replacement]:
+            fixes_file = fixes_dir / f"{index}.yaml"
+            cmd = [*self.get_cmd(file_path), f"-export-fixes={fixes_file}"]
+            logger.info(" ".join(cmd))
+            result = subprocess.run(cmd, capture_output=True, check=False)
+            if not fixes_file.is_file():
+                if result.returncode != 0:
+                    logger.warning("clang-tidy failed on %s", file_path)
+                    if self._verbose:
+                        logger.info(result.stdout.decode() + result.stderr.decode())
+                return []
+            return load_replacements(fixes_file)
+
+        with create_thread_pool(self._jobs) as executor:
+            exported = executor.map(run, range(len(translation_units)), translation_units)
+            return [replacement for replacements in exported for replacement in replacements]
+
+    def _apply_fixes(self, merged: Dict[Path, List[Replacement]]) -> int:
+        source_dir = self._config.source_dir_path.resolve()
+        exclude = ExcludeMatcher(self.get_exclude_patterns())
+        file_fixes = []
+        # Paths of loaded replacements are resolved
+        for file_path, replacements in merged.items():
+            if not file_path.is_relative_to(source_dir) or exclude.match(file_path):
+                logger.info("Skipping clang-tidy fixes of %s", file_path)
+                continue
+            file_fixes.append((file_path, replacements))
+
+        def apply(file_path: Path, replacements: List[Replacement]) -> bool:
+            try:
+                content = file_path.read_bytes()
+                fixed_content = apply_replacements(content, replacements)
+            except (OSError, ValueError) as e:
+                logger.error("Unable to apply clang-tidy fixes to %s: %s", file_path, e)
+                return False
+            if fixed_content == content:
+                return False
+            write_file_atomically(file_path, fixed_content)
+            return True
+
+        fixed_count = 0
+        with create_thread_pool(self._jobs) as executor:
+            for (file_path, replacements), fixed in zip(
+                file_fixes, executor.map(lambda file_fix: apply(*file_fix), file_fixes)
+            ):
+                if fixed:
+                    logger.info("Fixed %s (%d clang-tidy fixes)", file_path, len(replacements))
+                    fixed_count += 1
+        return fixed_count
+
+    def get_translation_units(self) -> List[Path]:
+        """
+        List source files from the compilation database which belong to the project and are not excluded.
+        """
+        assert self.build_path is not None
+        with open(self.build_path / "compile_commands.json", encoding="utf-8") as compile_db_file:
+            compile_db = json.load(compile_db_file)
+
+        source_dir = self._config.source_dir_path.absolute()
+        exclude = ExcludeMatcher(self.get_exclude_patterns())
+        translation_units: List[Path] = []
+        self._compile_commands = {}
+        for entry in compile_db:
+            file_path = Path(entry["directory"], entry["file"]).absolute()
+            if not file_path.is_relative_to(source_dir) or file_path in self._compile_commands:
+                continue
+            if exclude.match(file_path):
+                logger.info("Skipping %s", file_path)
+                continue
+            self._compile_commands[file_path] = entry
+            translation_units.append(file_path)
+        return translation_units
+
+    def select_changed_translation_units(self, translation_units: List[Path]) -> List[Path]:
+        """
+        Translation units which were changed or include a changed file.
+        """
+        assert self._changed_files is not None
+        resolved_units = {file_path: file_path.resolve() for file_path in translation_units}
+        changed_includes = self._changed_files - set(resolved_units.values())
+        selected = {file_path for file_path, resolved in resolved_units.items() if resolved in self._changed_files}
+        if changed_includes:
+            candidates = [file_path for file_path in translation_units if file_path not in selected]
+            with create_thread_pool(self._jobs) as executor:
+                dependencies = executor.map(
+                    lambda file_path: get_translation_unit_dependencies(self._compile_commands[file_path]), candidates
+                )
+                for file_path, file_dependencies in zip(candidates, dependencies):
+                    # Check the translation unit if its dependencies are unknown
+                    if file_dependencies is None or not changed_includes.isdisjoint(file_dependencies):
+                        selected.add(file_path)
+        return [file_path for file_path in translation_units if file_path in selected]
+
+    def get_translation_unit_cache_key(self, file_path: Path, cmd: List[str]) -> Optional[str]:
+        """
+        Key of the clang-tidy result of a translation unit.
+
+        The key covers the preprocessed translation unit, so editing a header invalidates exactly the
+        translation units which include it. None if the translation unit cannot be preprocessed.
+        """
+        entry = self._compile_commands.get(file_path)
+        if entry is None:
+            return None
+        preprocessed = preprocess_translation_unit(entry)
+        if preprocessed is None:
+            return None
+        tidy_config = self.find_config_file(file_path.parent, self.config_file_names)
+        return hash_data(
+            self.check_name,
+            self.get_tool_version_for(cmd[0]),
+            json.dumps(cmd),
+            json.dumps(get_compile_arguments(entry)),
+            tidy_config.read_bytes() if tidy_config else b"",
+            preprocessed,
+        )
+
+    def get_tool_version_for(self, program: str) -> str:
+        if program not in self._tool_versions:
+            self._tool_versions[program] = get_program_version(program)
+        return self._tool_versions[program]
+
+    def _run_translation_units(self, translation_units: List[Path]) -> Iterator[Tuple[Path, int, str, str, float]]:
+        """
+        Run clang-tidy for translation units in parallel, yielding results in the order they finish.
+
+        :return: translation unit, return code, stdout, stderr and wall time of the run
+        """
+
+        def run(file_path: Path) -> Tuple[Path, int, str, str, float]:
+            start = time.perf_counter()
+            with self.hold_jobs():
+                self.raise_if_cancelled()
+                cmd = self.get_cmd(file_path)
+                cache_key = self.get_translation_unit_cache_key(file_path, cmd) if self._cache is not None else None
+                if self._cache is not None and cache_key is not None:
+                    entry = self._cache.get(cache_key)
+                    if entry is not None:
+                        logger.info("Using cached clang-tidy result for %s", file_path)
+                        duration = time.perf_counter() - start
+                        return file_path, entry["returncode"], entry["stdout"], entry["stderr"], duration
+
+                log_cmd = " ".join(cmd)
+                logger.info(f"{log_cmd}")
+                result = subprocess.run(cmd, capture_output=True, check=False)
+                stdout, stderr = result.stdout.decode(), result.stderr.decode()
+                if self._cache is not None and cache_key is not None:
+                    self._cache.put(cache_key, {"returncode": result.returncode, "stdout": stdout, "stderr": stderr})
+                return file_path, result.returncode, stdout, stderr, time.perf_counter() - start
+
+        executor = create_thread_pool(self._jobs)
+        try:
+            futures = [executor.submit(run, file_path) for file_path in translation_units]
+            for future in as_completed(futures):
+                yield future.result()
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def prepare(self) -> None:
+        """
+        Find the build directory and, for ESP32, prepare the toolchain context once per run.
+        """
+        if self.build_path is None:
+            self.build_path = self._find_build_path()
+        if self._config.project.is_esp32() and self.esp32_context is None:
+            self.esp32_context = self._prepare_esp32_context(self.build_path)
+
+    def _find_build_path(self) -> Path:
+        build_path = find_profile_build_dir(self._config)
+        if not build_path:
+            logger.error("Build folder does not exist.")
+            logger.info("Did you run `pwrforge build`?")
+            sys.exit(1)
+
+        # Check if compilation database exists:
+        if not Path(build_path, "compile_commands.json").exists():
+            logger.error("Compilation database does not exist.")
+            logger.info("Did you run `pwrforge build`?")
+            sys.exit(1)
+
+        return build_path
+
+    def get_cmd(self, file_path: Path) -> List[str]:
+        cmd: List[str]
+        if self._config.project.is_esp32():
+            cmd = self.__get_cmd_esp32(file_path)
+        elif self._config.project.is_stm32() or self._config.project.is_atsam():
+            cmd = self.__get_cmd_arm(file_path)
+        elif self._config.project.is_x86():
+            cmd = self.__get_cmd_x86(file_path)
+        return cmd
+
+    def check_file(self, file_path: Path) -> CheckResult:
+        self.prepare()
+        cmd = self.get_cmd(file_path)
+
+        try:
+            log_cmd = " ".join(cmd)
+            logger.info(f"{log_cmd}")
+            subprocess.check_output(cmd)
+        except subprocess.CalledProcessError as e:
+            if self._verbose:
+                logger.info(e.output.decode())
+            else:
+                logger.warning("clang-tidy found error in file %s", file_path)
+            return CheckResult(1)
+        return CheckResult(0)
+
+    @staticmethod
+    def _prepare_esp32_context(build_path: Path) -> Esp32TidyContext:
+        """
+        Prepare the clang-tidy context for ESP32 target.
+
+        This function:
+        1. Creates a copy of compile_commands.json with ESP-IDF-only flags stripped.
+        2. Detects ESP32 toolchain include paths (GCC builtin, include-fixed, sysroot).
+        3. Adds ESP-IDF newlib platform includes.
+
+        Both results are stored next to the stripped database and reused by later runs,
+        as long as the compiler (path and mtime) and the original database did not change.
+        """
+        compile_db = build_path / "compile_commands.json"
+        db_dir_for_check = build_path / "compilation_db_for_check"
+        db_path_for_check = db_dir_for_check / "compile_commands.json"
+        context_path = db_dir_for_check / "pwrforge_context.json"
+
+        gcc_path = shutil.which("xtensa-esp32-elf-gcc")
+        newlib_platform_include = (
+            Path(os.environ.get("IDF_PATH", "/opt/esp-idf")) / "components" / "newlib" / "platform_include"
+        )
+        toolchain_key = hash_data(
+            gcc_path or "",
+            str(Path(gcc_path).stat().st_mtime_ns) if gcc_path else "",
+            str(newlib_platform_include),
+        )
+        db_hash = hash_file(compile_db)
+
+        stored: Dict[str, Any] = {}
+        if context_path.is_file():
+            try:
+                stored = json.loads(context_path.read_text(encoding="utf-8"))
+            except ValueError:
+                stored = {}
+
+        if stored.get("db_hash") != db_hash or not db_path_for_check.is_file():
+            # Prepare a copy of compilation database with stripped flags
+            file_contents = compile_db.read_text(encoding="utf-8")
+            for flag in ESP32_UNSUPPORTED_FLAGS:
+                file_contents = file_contents.replace(flag, "")
+            db_dir_for_check.mkdir(parents=True, exist_ok=True)
+            db_path_for_check.write_text(file_contents, encoding="utf-8")
+        else:
+            logger.debug("Reusing stripped compilation database %s", db_path_for_check)
+
+        if stored.get("toolchain_key") == toolchain_key:
+            include_dirs = [Path(include_dir) for include_dir in stored.get("include_dirs", [])]
+            logger.info("Using cached ESP32 toolchain includes for clang-tidy")
+        else:
+            include_dirs = sorted(_detect_esp32_include_dirs(gcc_path, newlib_platform_include))
+
+        write_file_atomically(
+            context_path,
+            json.dumps(
+                {
+                    "db_hash": db_hash,
+                    "toolchain_key": toolchain_key,
+                    "include_dirs": [str(include_dir) for include_dir in include_dirs],
+                }
+            ),
+        )
+        return Esp32TidyContext(db_dir_for_check, include_dirs)
+
+    def __get_cmd_esp32(self, file_path: Path) -> List[str]:
+        """
+        Prepare clang-tidy command for ESP32 target, using the context prepared for this run.
+        """
+        # mypy: make sure esp32_context is not None here
+        assert self.esp32_context is not None, "esp32_context must be prepared before calling __get_cmd_esp32"
+
+        # Build extra-arg list
+        extra_args = [f"-extra-arg=-I{inc_dir}" for inc_dir in self.esp32_context.include_dirs]
+
+        # Prefer esp-clang clang-tidy, fall back to system one
+        cmd: List[str] = [
+            shutil.which(ESP32_CLANG_TIDY) or shutil.which("clang-tidy") or ESP32_CLANG_TIDY,
+            "-header-filter=^/workspace/src(/|$)",
+            *extra_args,
+            "-p",
+            str(self.esp32_context.db_dir),
+            str(file_path),
+        ]
+
+        return cmd
+
+    def __get_cmd_x86(self, file_path: Path) -> List[str]:
+        return ["clang-tidy", str(file_path), "-p", str(self.build_path)]
+
+    def __get_cmd_arm(self, file_path: Path) -> List[str]:
+        cmd = self.__get_cmd_x86(file_path)
+        arm_none_eabi_includes = "/opt/gcc-arm-none-eabi/arm-none-eabi/include"
+
+        # Add includes to standard library from toolchain:
+        path = Path(arm_none_eabi_includes)
+        cmd.extend(["--extra-arg", f"-I{path}"])
+        cpp_ver = os.listdir(Path(path, "c++"))[-1]
+        path = Path(path, "c++", cpp_ver)
+        cmd.extend(["--extra-arg", f"-I{path}"])
+        path = Path(path, "arm-none-eabi")
+        cmd.extend(["--extra-arg", f"-I{path}"])
+        return cmd
+
+
+# Compiler options followed by a value, which write output or dependency files
+OUTPUT_OPTIONS_WITH_VALUE = ("-o", "-MF", "-MT", "-MQ")
+# Compiler options which select the compilation stage or generate dependency files
+STAGE_AND_DEPENDENCY_OPTIONS = ("-c", "-S", "-E", "-M", "-MM", "-MD", "-MMD", "-MP", "-MG")
+
+
+def get_compile_arguments(entry: Dict[str, Any]) -> List[str]:
+    """
+    Compiler arguments of a compilation database entry, without options which produce output files.
+    """
+    arguments: List[str] = entry["arguments"] if "arguments" in entry else shlex.split(entry["command"])
+    result: List[str] = []
+    skip_value = False
+    for argument in arguments:
+        if skip_value:
+            skip_value = False
+        elif argument in OUTPUT_OPTIONS_WITH_VALUE:
+            skip_value = True
+        elif argument in STAGE_AND_DEPENDENCY_OPTIONS or argument.startswith(OUTPUT_OPTIONS_WITH_VALUE[1:]):
+            continue
+        else:
+            result.append(argument)
+    return result
+
+
+def get_dependency_file_path(entry: Dict[str, Any]) -> Optional[Path]:
+    """
+    Dependency file written by the compiler for a compilation database entry, if the build generates them.
+    """
+    arguments: List[str] = entry["arguments"] if "arguments" in entry else shlex.split(entry["command"])
+    for index, argument in enumerate(arguments):
+        if argument == "-MF" and index + 1 < len(arguments):
+            return Path(entry["directory"], arguments[index + 1])
+        if argument.startswith("-MF") and len(argument) > len("-MF"):
+            return Path(entry["directory"], argument[len("-MF") :])
+    return None
+
+
+def parse_dependency_file(content: str) -> List[str]:
+    """
+    Prerequisites from a Makefile dependency file, as written by `gcc -M` or `-MD`.
+    """
+    content = content.replace("\\\r\n", " ").replace("\\\n", " ")
+    dependencies: List[str] = []
+    for rule in content.splitlines():
+        _, separator, prerequisites = rule.partition(": ")
+        if not separator:
+            continue
+        for word in re.findall(r"(?:\\.|[^\s\\])+", prerequisites):
+            dependencies.append(word.replace("\\ ", " ").replace("\\#", "#").replace("$$", "$"))
+    return dependencies
+
+
+def get_translation_unit_dependencies(entry: Dict[str, Any]) -> Optional[Set[Path]]:
+    """
+    Files included by a translation unit.
+
+    The dependency file from the last build is used when it is newer than the source file,
+    otherwise the preprocessor is run with `-M`.
+
+    :return: resolved paths of the dependencies or None if they cannot be determined
+    """
+    directory = Path(entry["directory"])
+    file_path = directory / entry["file"]
+    dependency_file = get_dependency_file_path(entry)
+    try:
+        if dependency_file is not None and dependency_file.stat().st_mtime >= file_path.stat().st_mtime:
+            content = dependency_file.read_text(encoding="utf-8", errors="replace")
+            return {(directory / dependency).resolve() for dependency in parse_dependency_file(content)}
+    except OSError:
+        pass
+
+    cmd = [*get_compile_arguments(entry), "-M"]
+    try:
+        result = subprocess.run(cmd, cwd=directory, capture_output=True, text=True, check=False)
+    except OSError as e:
+        logger.debug("Unable to list dependencies of %s: %s", entry["file"], e)
+        return None
+    if result.returncode != 0:
+        logger.debug("Unable to list dependencies of %s: %s", entry["file"], result.stderr)
+        return None
+    return {(directory / dependency).resolve() for dependency in parse_dependency_file(result.stdout)}
+
+
+def preprocess_translation_unit(entry: Dict[str, Any]) -> Optional[bytes]:
+    """
+    Run the preprocessor for a compilation database entry.
+
+    :return: preprocessed translation unit or None if the preprocessor failed
+    """
+    cmd = [*get_compile_arguments(entry), "-E"]
+    try:
+        result = subprocess.run(cmd, cwd=entry["directory"], capture_output=True, check=False)
+    except OSError as e:
+        logger.debug("Unable to preprocess %s: %s", entry["file"], e)
+        return None
+    if result.returncode != 0:
+        logger.debug("Unable to preprocess %s: %s", entry["file"], result.stderr.decode())
+        return None
+    return result.stdout
+
+
+def _detect_esp32_include_dirs(gcc_path: Optional[str], newlib_platform_include: Path) -> Set[Path]:
+    """
+    Collect extra include paths for clang-tidy from xtensa-esp32-elf-gcc and ESP-IDF.
+    """
+    include_dirs: Set[Path] = set()
+
+    def _add_include_dir(path_str: str, log_prefix: str) -> None:
+        """Add include dir if it exists."""
+        if not path_str:
+            return
+        path = Path(path_str).resolve()
+        if path.is_dir():
+            logger.info(log_prefix, path)
+            include_dirs.add(path)
+
+    def _add_sysroot_includes(root: Path) -> None:
+        """Add typical sysroot include locations."""
+        logger.info("Using ESP32 GCC sysroot for clang-tidy: %s", root)
+        for suffix in ("include", "usr/include"):
+            candidate = root / suffix
+            if candidate.is_dir():
+                logger.info("Adding ESP32 sysroot include for clang-tidy: %s", candidate)
+                include_dirs.add(candidate)
+
+    if gcc_path:
+        try:
+            _add_include_dir(
+                subprocess.check_output(
+                    [gcc_path, "-print-file-name=include"],
+                    text=True,
+                    encoding="utf-8",
+                ).strip(),
+                "Using ESP32 GCC include dir for clang-tidy: %s",
+            )
+
+            _add_include_dir(
+                subprocess.check_output(
+                    [gcc_path, "-print-file-name=include-fixed"],
+                    text=True,
+                    encoding="utf-8",
+                ).strip(),
+                "Using ESP32 GCC include-fixed dir for clang-tidy: %s",
+            )
+
+            sysroot = subprocess.check_output(
+                [gcc_path, "--print-sysroot"],
+                text=True,
+                encoding="utf-8",
+            ).strip()
+            if sysroot:
+                _add_sysroot_includes(Path(sysroot).resolve())
+
+        except (subprocess.CalledProcessError, OSError) as exc:
+            # We do not want to fail the whole check if detection fails,
+            # we just log it and continue with whatever we have.
+            logger.debug("Failed to detect ESP32 toolchain includes for clang-tidy: %s", exc)
+
+    # ESP-IDF newlib platform includes (assert.h, stdlib.h chain)
+    if newlib_platform_include.is_dir():
+        logger.info(
+            "Adding ESP-IDF newlib platform_include for clang-tidy: %s",
+            newlib_platform_include,
+        )
+        include_dirs.add(newlib_platform_include)
+
+    return include_dirs
@@ -0,0 +1,317 @@
+"""Scheduling of checkers, check timings and watch mode"""
+
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from pwrforge.commands.check_base import (
+    CheckCancelled,
+    CheckerBase,
+    capture_log_records,
+    replay_log_records,
+)
+from pwrforge.config import Config
+from pwrforge.global_values import (
+    PWRFORGE_CHECK_TIMINGS_FILE,
+    PWRFORGE_CHECK_TIMINGS_HISTORY_FILE,
+    PWRFORGE_CHECK_TIMINGS_REPORT_FILE,
+)
+from pwrforge.logger import get_logger
+from pwrforge.utils.cache_utils import write_file_atomically
+from pwrforge.utils.file_utils import ExcludeMatcher, FileIndex, SourceCorpus
+from pwrforge.utils.timing_utils import CheckTimings
+from pwrforge.utils.watch_utils import FileChanges, FileWatcher, create_watcher
+
+logger = get_logger()
+
+
+def log_check_summary(problem_counts: List[Tuple[str, int]]) -> bool:
+    """
+    :param problem_counts: number of problems found by each check
+    :return: True if any check found problems
+    """
+    logger.info("Summary:")
+    if any(count > 0 for _, count in problem_counts):
+        for check_name, problem_count in problem_counts:
+            logger.info(f"{check_name}: {problem_count} problems found")
+        return True
+    logger.info("No problems found!")
+    return False
+
+
+class CheckScheduler:
+    """
+    Runs checkers at the same time, sharing the job budget they were created with.
+
+    Checkers which took longest in the previous run start first. Output of each checker is held back and logged as
+    one block, in the order of the given checkers, as soon as the checker and all checkers before it finished.
+    """
+
+    def __init__(
+        self,
+        checkers: Sequence[CheckerBase],
+        jobs: int,
+        timings: Optional[Dict[str, float]] = None,
+        cancel_event: Optional[threading.Event] = None,
+    ) -> None:
+        self._checkers = list(checkers)
+        self._jobs = max(jobs, 1)
+        self._timings = timings or {}
+        # Set to stop the checkers created with the same event
+        self._cancel_event = cancel_event or threading.Event()
+        self.durations: Dict[str, float] = {}
+
+    def get_start_order(self, checkers: Optional[Sequence[CheckerBase]] = None) -> List[CheckerBase]:
+        """
+        Longest checkers first, checkers without previous timings before them, as they may be the longest.
+        """
+        return sorted(
+            self._checkers if checkers is None else checkers,
+            key=lambda checker: -self._timings.get(checker.check_name, float("inf")),
+        )
+
+    def get_tiers(self, tiers: Sequence[Sequence[str]]) -> List[List[CheckerBase]]:
+        """
+        Split checkers into tiers by check name, checkers missing from the tiers form the last one.
+        """
+        remaining = list(self._checkers)
+        checker_tiers = []
+        for tier in [*tiers, [checker.check_name for checker in self._checkers]]:
+            checker_tiers.append([checker for checker in remaining if checker.check_name in tier])
+            remaining = [checker for checker in remaining if checker.check_name not in tier]
+        return [checker_tier for checker_tier in checker_tiers if checker_tier]
+
+    def run(self) -> List[Tuple[str, int]]:
+        """
+        :return: number of problems found by each checker, in the order of the given checkers
+        """
+        return self._run_checkers(self._checkers)
+
+    def run_tiers(self, tiers: Sequence[Sequence[str]]) -> List[Tuple[str, int]]:
+        """
+        Run tiers one after another and stop after the first tier which found problems.
+
+        As soon as a checker finds problems, the other checkers of its tier are cancelled.
+
+        :param tiers: check names of every tier
+        :return: number of problems found by each checker which finished, in the order of the given checkers
+        """
+        problem_counts: List[Tuple[str, int]] = []
+        for checker_tier in self.get_tiers(tiers):
+            problem_counts += self._run_checkers(checker_tier, fail_fast=True)
+            if self._cancel_event.is_set():
+                finished = {check_name for check_name, _ in problem_counts}
+                skipped = [checker.check_name for checker in self._checkers if checker.check_name not in finished]
+                if skipped:
+                    logger.info("Stopped after the first failing tier, not checked: %s", ", ".join(skipped))
+                break
+        return problem_counts
+
+    def _run_checkers(self, checkers: List[CheckerBase], fail_fast: bool = False) -> List[Tuple[str, int]]:
+        if len(checkers) == 1:
+            results = [(checker.check_name, self._run_checker(checker, fail_fast)) for checker in checkers]
+            return [(check_name, count) for check_name, count in results if count is not None]
+
+        groups: Dict[str, List[logging.LogRecord]] = {}
+
+        def run(checker: CheckerBase) -> Optional[int]:
+            with capture_log_records() as records:
+                groups[checker.check_name] = records
+                return self._run_checker(checker, fail_fast)
+
+        with ThreadPoolExecutor(max_workers=len(checkers)) as executor:
+            futures = {checker.check_name: executor.submit(run, checker) for checker in self.get_start_order(checkers)}
+            problem_counts = []
+            for checker in checkers:
+                try:
+                    problem_count = futures[checker.check_name].result()
+                finally:
+                    replay_log_records(groups.get(checker.check_name, []))
+                if problem_count is not None:
+                    problem_counts.append((checker.check_name, problem_count))
+        return problem_counts
+
+    def _run_checker(self, checker: CheckerBase, fail_fast: bool = False) -> Optional[int]:
+        """
+        :return: number of problems found, None if the check was cancelled
+        """
+        start = time.perf_counter()
+        try:
+            problem_count = checker.check()
+        except CheckCancelled:
+            logger.info(f"{checker.check_name} check cancelled")
+            return None
+        self.durations[checker.check_name] = time.perf_counter() - start
+        if fail_fast and problem_count > 0:
+            self._cancel_event.set()
+        return problem_count
+
+    def log_plan(self, tiers: Optional[Sequence[Sequence[str]]] = None) -> None:
+        """
+        Log the order in which checkers start and their predicted duration, based on the previous run.
+
+        :param tiers: check names of every tier, if checks run tier by tier
+        """
+        logger.info("Check plan, %d jobs shared by checkers running at the same time:", self._jobs)
+        checker_tiers = self.get_tiers(tiers) if tiers is not None else [self._checkers]
+        for index, checker_tier in enumerate(checker_tiers, start=1):
+            if tiers is not None:
+                logger.info(f"Tier {index}:")
+            for checker in self.get_start_order(checker_tier):
+                kind = "whole project" if checker.whole_project else "per file"
+                duration = self._timings.get(checker.check_name)
+                predicted = f"~{duration:.1f} s" if duration is not None else "no previous timing"
+                logger.info(f"  {checker.check_name:<13} {kind:<14} {predicted}")
+        known = [self._timings[checker.check_name] for checker in self._checkers if checker.check_name in self._timings]
+        if known:
+            # Checkers of a tier run at the same time, tiers one after another
+            predicted_time = sum(
+                max((self._timings.get(checker.check_name, 0.0) for checker in checker_tier), default=0.0)
+                for checker_tier in checker_tiers
+            )
+            logger.info(
+                "Predicted time: ~%.1f s, %.1f s when run one after another%s",
+                predicted_time,
+                sum(known),
+                "" if len(known) == len(self._checkers) else ", not counting checkers without previous timing",
+            )
+
+
+def load_check_timings(config: Config) -> Dict[str, float]:
+    """
+    Duration of each checker in the last full check, empty if there was none.
+    """
+    try:
+        data = json.loads((config.project_root / PWRFORGE_CHECK_TIMINGS_FILE).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    checkers = data.get("checkers") if isinstance(data, dict) else None
+    return {name: float(duration) for name, duration in checkers.items()} if isinstance(checkers, dict) else {}
+
+
+def store_check_timings(config: Config, durations: Dict[str, float]) -> None:
+    """
+    Store checker durations, keeping those of checkers which did not run.
+    """
+    timings = {**load_check_timings(config), **durations}
+    write_file_atomically(
+        config.project_root / PWRFORGE_CHECK_TIMINGS_FILE,
+        json.dumps({"checkers": {name: round(duration, 3) for name, duration in timings.items()}}, indent=2),
+    )
+
+
+def log_check_timings(check_timings: CheckTimings, top: int = 10) -> None:
+    """
+    Log the time taken by every checker, then the slowest files and directories.
+    """
+    logger.info("Check timings:")
+    for checker_timing in check_timings.get_checker_timings():
+        children_cpu = f"{checker_timing.children_cpu:.2f} s" if checker_timing.children_cpu is not None else "unknown"
+        files = (
+            f", {checker_timing.files} files in {checker_timing.files_duration:.2f} s" if checker_timing.files else ""
+        )
+        logger.info(
+            f"  {checker_timing.checker:<13} {checker_timing.duration:8.2f} s wall, {children_cpu} tools CPU{files}"
+        )
+    slowest_files = check_timings.get_slowest_files(top)
+    if slowest_files:
+        logger.info("Slowest files:")
+        for file_timing in slowest_files:
+            logger.info(f"  {file_timing.duration:8.3f} s {file_timing.checker:<13} {file_timing.file}")
+        logger.info("Slowest directories, all checkers together:")
+        for file_timing in check_timings.get_slowest_directories(top):
+            logger.info(f"  {file_timing.duration:8.3f} s {file_timing.file}")
+
+
+def store_check_timings_report(config: Config, check_timings: CheckTimings, output: Optional[Path] = None) -> None:
+    """
+    Write all timings as JSON and append the checker totals to the timings history, for tracking them over time.
+
+    :param output: file for all timings, defaults to a file in the pwrforge state directory
+    """
+    data = check_timings.get_data()
+    report_path = output or config.project_root / PWRFORGE_CHECK_TIMINGS_REPORT_FILE
+    write_file_atomically(report_path, json.dumps(data, indent=2))
+    logger.info("Check timings written to %s", report_path)
+    history_path = config.project_root / PWRFORGE_CHECK_TIMINGS_HISTORY_FILE
+    history_path.parent.mkdir(parents=True, exist_ok=True)
+    with history_path.open("a", encoding="utf-8") as history_file:
+        history_file.write(json.dumps({key: value for key, value in data.items() if key != "files"}) + "\n")
+
+
+def register_corpus_files(corpus: SourceCorpus, checkers: Sequence[CheckerBase]) -> None:
+    """
+    Register the files of checkers which read them through the corpus, before any of these checkers runs.
+    """
+    for checker in checkers:
+        if checker.uses_corpus:
+            corpus.register(checker.get_files())
+
+
+def watch_and_check(
+    config: Config,
+    checkers: Sequence[CheckerBase],
+    corpus: Optional[SourceCorpus] = None,
+    file_index: Optional[FileIndex] = None,
+    watcher: Optional[FileWatcher] = None,
+) -> None:
+    """
+    Check files again whenever they change, until interrupted.
+
+    Config, file index and checkers are kept between runs, only checkers affected by the changed files are run
+    and only on these files.
+
+    :param config: project config
+    :param checkers: checkers which already checked the project
+    :param corpus: corpus shared by the checkers
+    :param file_index: file index shared by the checkers, refreshed when files are created or removed
+    :param watcher: source of changes, watches the source directory if not given
+    """
+    source_dir = config.source_dir_path.resolve()
+    if watcher is None:
+        watcher = create_watcher(source_dir, ExcludeMatcher(config.check.exclude, config.project_root))
+    logger.info("Watching %s for changes, press Ctrl+C to stop", source_dir)
+    try:
+        for changes in watcher.watch():
+            check_changes(changes, checkers, corpus, file_index)
+    except KeyboardInterrupt:
+        logger.info("Stopped watching")
+    finally:
+        watcher.close()
+
+
+def check_changes(
+    changes: FileChanges,
+    checkers: Sequence[CheckerBase],
+    corpus: Optional[SourceCorpus] = None,
+    file_index: Optional[FileIndex] = None,
+) -> None:
+    """
+    Run the checkers affected by one batch of changes, only on the changed files.
+    """
+    if changes.structure_changed and file_index is not None:
+        file_index.invalidate()
+    changed_files = {file_path for file_path in changes.paths if file_path.is_file()}
+    if not changed_files:
+        return
+    affected = []
+    for checker in checkers:
+        checker.set_changed_files(changed_files)
+        if checker.is_affected():
+            affected.append(checker)
+    if not affected:
+        return
+    if corpus is not None:
+        for file_path in changed_files:
+            corpus.invalidate(file_path)
+        register_corpus_files(corpus, affected)
+    logger.info(
+        "%d files changed, running %s",
+        len(changed_files),
+        ", ".join(checker.check_name for checker in affected),
+    )
+    log_check_summary([(checker.check_name, checker.check()) for checker in affected])
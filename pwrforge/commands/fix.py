@@ -1,27 +1,189 @@
 """Format project code using formatter"""
 
+import logging
 import os
-from typing import List, Type
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import (
+    Callable,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Type,
+)
 
-from pwrforge.commands.check import (
+from pwrforge.commands.check import ClangFormatChecker, CopyrightChecker, PragmaChecker
+from pwrforge.commands.check_base import (
     CheckerFixer,
-    ClangFormatChecker,
-    CopyrightChecker,
-    PragmaChecker,
+    CheckResult,
+    capture_log_records,
+    get_changed_files_to_check,
+    get_check_cache,
+    get_default_jobs,
+    replay_log_records,
 )
+from pwrforge.commands.check_clang_tidy import ClangTidyChecker
 from pwrforge.config_utils import prepare_config
+from pwrforge.logger import get_logger
+from pwrforge.utils.cache_utils import write_file_atomically
+from pwrforge.utils.comment_utils import get_comment_lines
+from pwrforge.utils.file_utils import FileIndex, SourceCorpus
+
+logger = get_logger()
+
+
+class FileFixResult(NamedTuple):
+    file_path: Path
+    # Names of the fixers which changed the file
+    fixed_by: Tuple[str, ...]
+
+
+class FixPipeline:
+    """
+    Fixes each file in memory with all fixers and writes it once, atomically, only if its contents changed.
+
+    Formatters run last. They format in memory the files changed by the other fixers, the files which no other fixer
+    changed are checked and formatted in batches instead. Files are fixed in parallel.
+    """
+
+    def __init__(self, fixers: Sequence[CheckerFixer], jobs: int = 1, corpus: Optional[SourceCorpus] = None) -> None:
+        self._fixers = [fixer for fixer in fixers if not fixer.formatter]
+        self._formatters = [fixer for fixer in fixers if fixer.formatter]
+        self._jobs = max(jobs, 1)
+        self._corpus = corpus or SourceCorpus(comment_lines_reader=get_comment_lines)
+        self._fixer_files: Dict[str, Set[Path]] = {}
 
+    def run(self) -> List[FileFixResult]:
+        """
+        :return: fixed files in the order in which fixers list them
+        """
+        file_paths: Dict[Path, None] = {}
+        fixer_files: Dict[str, List[Path]] = {}
+        for fixer in [*self._fixers, *self._formatters]:
+            fixer.init_cache_salt()
+            fixer_files[fixer.check_name] = fixer.get_files()
+            self._fixer_files[fixer.check_name] = set(fixer_files[fixer.check_name])
+            file_paths.update(dict.fromkeys(fixer_files[fixer.check_name]))
 
-def pwrforge_fix(pragma: bool, copy_right: bool, clang_format: bool) -> None:
+        in_memory_files: Dict[Path, None] = {}
+        for fixer in self._fixers:
+            in_memory_files.update(dict.fromkeys(fixer_files[fixer.check_name]))
+        fixed_by: Dict[Path, List[str]] = {}
+        for result in self._map_files(self.fix_file, list(in_memory_files)):
+            if result.fixed_by:
+                fixed_by[result.file_path] = list(result.fixed_by)
+        # Files written above are already formatted, the other ones are formatted on disk
+        for formatter in self._formatters:
+            unchanged_files = [
+                file_path for file_path in fixer_files[formatter.check_name] if file_path not in fixed_by
+            ]
+            for file_path in formatter.fix_files(unchanged_files):
+                fixed_by.setdefault(file_path, []).append(formatter.check_name)
+
+        results = []
+        for file_path in file_paths:
+            if fixed_by.get(file_path):
+                logger.info("Fixed %s (%s)", file_path, ", ".join(fixed_by[file_path]))
+                results.append(FileFixResult(file_path, tuple(fixed_by[file_path])))
+        for fixer in [*self._fixers, *self._formatters]:
+            fixed_count = sum(fixer.check_name in result.fixed_by for result in results)
+            logger.info(f"Finished {fixer.check_name} fix. Fixed {fixer.format_problem_count(fixed_count)}.")
+        return results
+
+    def _map_files(self, func: Callable[[Path], FileFixResult], file_paths: List[Path]) -> List[FileFixResult]:
+        if self._jobs == 1:
+            return list(map(func, file_paths))
+
+        def run(file_path: Path) -> Tuple[FileFixResult, List[logging.LogRecord]]:
+            with capture_log_records() as records:
+                result = func(file_path)
+            return result, records
+
+        results = []
+        with ThreadPoolExecutor(max_workers=self._jobs) as executor:
+            # Log records are emitted in file order, so the output does not depend on the number of jobs
+            for result, records in executor.map(run, file_paths):
+                replay_log_records(records)
+                results.append(result)
+        return results
+
+    def fix_file(self, file_path: Path) -> FileFixResult:
+        """
+        Apply the fixers to the file in memory, formatters only if other fixers changed it.
+        The file is written only if its contents changed.
+        """
+        self._corpus.register([file_path])
+        try:
+            original = self._corpus.get(file_path).text
+            content = original
+            fixed_by = []
+            for fixer in self._fixers:
+                if file_path not in self._fixer_files[fixer.check_name]:
+                    continue
+                result = fixer.check_file_cached(file_path)
+                if result.problems_found == 0 or not result.fix:
+                    continue
+                fixed_content = fixer.fix_content(file_path, content)
+                if fixed_content != content:
+                    fixed_by.append(fixer.check_name)
+                    content = fixed_content
+            if content != original:
+                for formatter in self._formatters:
+                    if file_path in self._fixer_files[formatter.check_name]:
+                        formatted_content = formatter.fix_content(file_path, content)
+                        if formatted_content != content:
+                            fixed_by.append(formatter.check_name)
+                            content = formatted_content
+        finally:
+            self._corpus.release(file_path)
+
+        if content != original:
+            write_file_atomically(file_path, content)
+            self._store_formatted(file_path, fixed_by)
+        return FileFixResult(file_path, tuple(fixed_by))
+
+    def _store_formatted(self, file_path: Path, fixed_by: List[str]) -> None:
+        """
+        Formatters run last, so a file they rewrote passes their check, store it for the next check or fix.
+        """
+        for formatter in self._formatters:
+            if formatter.check_name in fixed_by:
+                formatter.store_result(file_path, CheckResult(0))
+
+
+def pwrforge_fix(
+    pragma: bool,
+    copy_right: bool,
+    clang_format: bool,
+    jobs: Optional[int] = None,
+    use_cache: bool = True,
+    changed_since: Optional[str] = None,
+    staged: bool = False,
+    clang_tidy: bool = False,
+) -> None:
     """
     Fix format
 
     :param bool pragma: fix pragma format
     :param bool copy_right: fix copyrights
     :param bool clang_format: fix clang format
+    :param jobs: number of files fixed in parallel, defaults to CPU count
+    :param bool use_cache: skip files which passed the check before and did not change since
+    :param changed_since: fix only files changed since this git ref
+    :param bool staged: fix only files staged in git
+    :param bool clang_tidy: apply clang-tidy fix-its, before the other fixes
     :return: None
     """
     config = prepare_config()
+    jobs = jobs or get_default_jobs()
+    cache = get_check_cache(config) if use_cache else None
+    corpus = SourceCorpus(comment_lines_reader=get_comment_lines)
+    changed_files = get_changed_files_to_check(config, changed_since, staged)
+    file_index = FileIndex(config.check.exclude, config.project_root)
 
     checkers: List[Type[CheckerFixer]] = []
     if pragma:
@@ -31,11 +193,26 @@ def pwrforge_fix(pragma: bool, copy_right: bool, clang_format: bool) -> None:
     if clang_format:
         checkers.append(ClangFormatChecker)
 
-    if not checkers:
+    if not checkers and not clang_tidy:
         checkers = [PragmaChecker, CopyrightChecker, ClangFormatChecker]
 
     # Todo, remove chdir and change cwd for checks
     os.chdir(config.project_root)
 
-    for checker_class in checkers:
-        checker_class(config, fix_errors=True).check()
+    if clang_tidy:
+        # Fix-its are applied first, so the files they changed are formatted by the other fixers
+        ClangTidyChecker(config, fix_errors=True, jobs=jobs, changed_files=changed_files).fix_translation_units()
+
+    fixers = [
+        checker_class(
+            config,
+            fix_errors=True,
+            jobs=jobs,
+            cache=cache,
+            corpus=corpus,
+            changed_files=changed_files,
+            file_index=file_index,
+        )
+        for checker_class in checkers
+    ]
+    FixPipeline([fixer for fixer in fixers if fixer.is_enabled()], jobs, corpus).run()
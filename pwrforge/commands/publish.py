@@ -6,7 +6,7 @@ from pathlib import Path
 
 from pwrforge.config_utils import prepare_config
 from pwrforge.logger import get_logger
-from pwrforge.utils.conan_utils import conan_add_remote, conan_source
+from pwrforge.utils.conan_utils import conan_setup
 
 logger = get_logger()
 
@@ -33,8 +33,7 @@ def pwrforge_publish(repo: str, profile: str = "Release") -> None:
         logger.info(f"Did you run 'pwrforge build --profile {profile}'?")
         sys.exit(1)
 
-    conan_add_remote(project_path, config)
-    conan_source(project_path)
+    conan_setup(config, default_profile=False)
 
     profile_name = target.get_conan_profile_name(profile)
     profile_path = f"./config/conan/profiles/{profile_name}"
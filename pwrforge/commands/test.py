@@ -8,23 +8,26 @@ from typing import Any, Dict, List, Union
 
 from pwrforge.config import Config
 from pwrforge.config_utils import prepare_config
-from pwrforge.file_generators.conan_gen import conan_add_default_profile_if_missing
 from pwrforge.global_values import (
     PWRFORGE_SRC_EXTENSIONS_DEFAULT,
     PWRFORGE_UT_COV_FILES_PREFIX,
 )
 from pwrforge.logger import get_logger
-from pwrforge.utils.conan_utils import conan_add_remote, conan_source
+from pwrforge.utils.ccache_utils import report_compiler_cache_stats
+from pwrforge.utils.conan_utils import conan_install, conan_setup
 
 logger = get_logger()
 
 
-def pwrforge_test(verbose: bool, profile: str = "Debug", detailed_coverage: bool = False) -> None:
+def pwrforge_test(
+    verbose: bool, profile: str = "Debug", detailed_coverage: bool = False, force_install: bool = False
+) -> None:
     """
     Run test
     :param bool verbose: if verbose
     :param str profile: CMake profile to use
     :param bool detailed_coverage: Generate detailed coverage HTML files
+    :param bool force_install: run `conan install` even if its inputs did not change
     """
     config = prepare_config()
 
@@ -43,47 +46,47 @@ def pwrforge_test(verbose: bool, profile: str = "Debug", detailed_coverage: bool
         sys.exit(1)
 
     test_build_dir.mkdir(parents=True, exist_ok=True)
-    conan_add_default_profile_if_missing()
-
-    conan_add_remote(project_dir, config)
-    conan_source(project_dir)
-
-    try:
-        # Run CMake and build tests.
-        subprocess.run(
-            [
-                "conan",
-                "install",
-                tests_src_dir,
-                "-of",
-                test_build_dir,
-                f"-sbuild_type={profile}",
-                "-b",
-                "missing",
-            ],
-            cwd=project_dir,
-            check=True,
-        )
-        subprocess.run(
-            [
-                "conan",
-                "build",
-                "-of",
+    conan_setup(config)
+
+    with report_compiler_cache_stats(config):
+        try:
+            # Run CMake and build tests.
+            conan_install(
+                config,
+                [
+                    "conan",
+                    "install",
+                    tests_src_dir,
+                    "-of",
+                    test_build_dir,
+                    f"-sbuild_type={profile}",
+                    "-b",
+                    "missing",
+                ],
+                tests_src_dir / "conanfile.py",
                 test_build_dir,
-                tests_src_dir,
-                f"-sbuild_type={profile}",
-                "-b",
-                "missing",
-            ],
-            cwd=project_dir,
-            check=True,
-        )
-    except subprocess.CalledProcessError:
-        logger.error("Failed to build tests.")
-        sys.exit(1)
-
-    # run ut
-    run_ut(config, verbose, test_build_dir, detailed_coverage)
+                force=force_install,
+            )
+            subprocess.run(
+                [
+                    "conan",
+                    "build",
+                    "-of",
+                    test_build_dir,
+                    tests_src_dir,
+                    f"-sbuild_type={profile}",
+                    "-b",
+                    "missing",
+                ],
+                cwd=project_dir,
+                check=True,
+            )
+        except subprocess.CalledProcessError:
+            logger.error("Failed to build tests.")
+            sys.exit(1)
+
+        # run ut
+        run_ut(config, verbose, test_build_dir, detailed_coverage)
 
 
 def _gcov_json_create_empty_record(fpath: Path) -> Union[Dict[str, Any], None]:
@@ -3,7 +3,7 @@ from pathlib import Path
 from typing import Any, Dict, List, Optional, Sequence, Union
 
 import toml
-from pydantic import BaseModel, Extra, Field, root_validator
+from pydantic import BaseModel, Extra, Field, root_validator, validator
 
 from pwrforge.global_values import PWRFORGE_DEFAULT_BUILD_ENV, PWRFORGE_DOCKER_ENV
 
@@ -150,6 +150,9 @@ class ProjectConfig(BaseModel):
 
     max_build_jobs: Optional[int] = Field(default=None, alias="max-build-jobs")
     cmake_variables: Dict[str, str] = Field(default={}, alias="cmake-variables")
+    cache: "CompilerCacheConfig" = Field(
+        default_factory=lambda: CompilerCacheConfig(),  # pylint: disable=unnecessary-lambda
+    )
 
     @property
     def target(self) -> List["Target"]:
@@ -182,6 +185,16 @@ class ProjectConfig(BaseModel):
         return isinstance(self.target_id, list) and len(self.target_id) > 1
 
 
+class CompilerCacheConfig(BaseModel):
+    enabled: bool = False
+    launcher: str = "ccache"
+    # Relative to the project root, so it is kept in the mounted workspace in docker mode
+    dir: str = ".ccache"
+
+    def get_dir_path(self, project_root: Path) -> Path:
+        return Path(project_root, self.dir)
+
+
 class Target(BaseModel):
     id: str
     elf_file_extension: str
@@ -249,17 +262,33 @@ class LicenseCheckConfig(BaseModel):
     )
 
 
+# Order of checks with --fail-fast: cheap text checks, formatting, then the analysers
+DEFAULT_CHECK_TIERS = (("pragma", "copyright", "todo"), ("clang-format",), ("cppcheck", "cyclomatic", "clang-tidy"))
+
+
 class ChecksConfig(BaseModel):
     exclude: List[str]
+    tiers: List[List[str]] = Field(default_factory=lambda: [list(tier) for tier in DEFAULT_CHECK_TIERS])
+    # Bytes read at first from the top of each file by the pragma and copyright checks
+    header_window: int = Field(default=8192, alias="header-window")
     pragma: "CheckConfig"
     copyright: "CheckConfig"
     todo: "TodoCheckConfig"
     cppcheck: "CppCheckConfig" = Field(..., alias="cppcheck")
     clang_format: "CheckConfig" = Field(..., alias="clang-format")
     clang_tidy: "CheckConfig" = Field(..., alias="clang-tidy")
-    cyclomatic: "CheckConfig"
+    cyclomatic: "CyclomaticCheckConfig"
     license: Optional[LicenseCheckConfig] = None
 
+    @validator("tiers")
+    def validate_tiers(cls, tiers: List[List[str]]) -> List[List[str]]:  # pylint: disable=no-self-argument
+        check_names = [name for tier in DEFAULT_CHECK_TIERS for name in tier]
+        for tier in tiers:
+            for name in tier:
+                if name not in check_names:
+                    raise ConfigError(f"Unknown check {name!r} in check tiers, known checks: {', '.join(check_names)}")
+        return tiers
+
 
 class FixesConfig(BaseModel):
     copyright: "FixConfig" = Field(default_factory=lambda: FixConfig())  # pylint: disable=unnecessary-lambda
@@ -274,6 +303,13 @@ class FixConfig(BaseModel):
     description: Optional[str] = None
 
 
+class CyclomaticCheckConfig(CheckConfig):
+    # Functions are reported when any of the values is exceeded
+    ccn: int = 25
+    length: int = 1000
+    arguments: int = 100
+
+
 class TodoCheckConfig(CheckConfig):
     keywords: List[str] = Field(default_factory=list)
 
@@ -283,6 +319,8 @@ class CppCheckConfig(BaseModel):
     exclude: List[str] = Field(default_factory=list)
     suppress: List[str] = []
     directories: List[str] = []
+    # Number of cppcheck threads, the --jobs option of the check command when not set
+    jobs: Optional[int] = None
 
 
 class DocConfig(BaseModel):
@@ -19,6 +19,8 @@ def set_up_environment_variables(config: Config) -> None:
     os.environ["pwrforge_PROJECT_ROOT"] = str(config.project_root.absolute())
     if config.project.in_repo_conan_cache:
         os.environ["CONAN_HOME"] = f"{config.project_root}/.conan2"
+    if config.project.cache.enabled:
+        os.environ["CCACHE_DIR"] = str(config.project.cache.get_dir_path(config.project_root.absolute()))
 
 
 def get_pwrforge_config_or_exit(
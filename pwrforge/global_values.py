@@ -18,3 +18,13 @@ PWRFORGE_HEADER_EXTENSIONS_DEFAULT = (".h", ".hpp", ".hxx", ".hh", ".inc", ".inl
 PWRFORGE_SRC_EXTENSIONS_DEFAULT = (".c", ".cpp", ".cxx", ".cc", ".s", ".S", ".asm")
 
 PWRFORGE_UT_COV_FILES_PREFIX = "ut-coverage"
+
+PWRFORGE_STATE_DIR = "build/.pwrforge"
+PWRFORGE_CHECK_CACHE_DIR = f"{PWRFORGE_STATE_DIR}/check-cache"
+PWRFORGE_CPPCHECK_BUILD_DIR = f"{PWRFORGE_STATE_DIR}/cppcheck"
+PWRFORGE_CYCLOMATIC_METRICS_FILE = f"{PWRFORGE_STATE_DIR}/cyclomatic-metrics.json"
+PWRFORGE_CYCLOMATIC_HISTORY_FILE = f"{PWRFORGE_STATE_DIR}/cyclomatic-history.jsonl"
+PWRFORGE_CHECK_TIMINGS_FILE = f"{PWRFORGE_STATE_DIR}/check-timings.json"
+PWRFORGE_CHECK_TIMINGS_REPORT_FILE = f"{PWRFORGE_STATE_DIR}/check-timings-report.json"
+PWRFORGE_CHECK_TIMINGS_HISTORY_FILE = f"{PWRFORGE_STATE_DIR}/check-timings-history.jsonl"
+PWRFORGE_CONAN_SETUP_FILE = f"{PWRFORGE_STATE_DIR}/conan-setup.json"
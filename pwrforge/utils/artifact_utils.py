@@ -0,0 +1,130 @@
+"""Sync of build artifacts out of the CMake build tree"""
+
+import fnmatch
+import os
+import shutil
+from pathlib import Path
+from typing import Dict, List
+
+from pwrforge.utils.cache_utils import hash_file
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None  # type: ignore[assignment]
+
+# Every file under these top-level directories of the build tree is an artifact (runtime and archive output dirs)
+ARTIFACT_DIRS = ("bin", "lib")
+ARTIFACT_PATTERNS = (
+    "*.elf",
+    "*.bin",
+    "*.hex",
+    "*.map",
+    "*.a",
+    "*.so",
+    "*.so.*",
+    "*.dylib",
+    "*.dll",
+    "compile_commands.json",
+    "flash_args",
+    "flasher_args.json",
+)
+# CMake internals, e.g. compiler identification binaries
+SKIPPED_DIRS = ("CMakeFiles",)
+
+# ioctl request cloning a whole file on Linux (btrfs, XFS, ...)
+_FICLONE = 0x40049409
+
+
+def find_artifacts(build_tree: Path) -> List[Path]:
+    """
+    :param Path build_tree: CMake build directory
+    :return: artifact paths relative to `build_tree`, sorted
+    """
+    artifacts = []
+    for root, dirs, files in os.walk(build_tree):
+        dirs[:] = [name for name in dirs if name not in SKIPPED_DIRS]
+        rel_root = Path(root).relative_to(build_tree)
+        in_artifact_dir = bool(rel_root.parts) and rel_root.parts[0] in ARTIFACT_DIRS
+        for name in files:
+            if in_artifact_dir or any(fnmatch.fnmatch(name, pattern) for pattern in ARTIFACT_PATTERNS):
+                artifacts.append(rel_root / name)
+    return sorted(artifacts)
+
+
+def is_same_file_content(src: Path, dst: Path) -> bool:
+    """
+    Files are the same if they are one file, or have the same size and either the same mtime or the same hash.
+    """
+    try:
+        src_stat = src.stat()
+        dst_stat = dst.stat()
+    except OSError:
+        return False
+    if (src_stat.st_dev, src_stat.st_ino) == (dst_stat.st_dev, dst_stat.st_ino):
+        return True
+    if src_stat.st_size != dst_stat.st_size:
+        return False
+    if src_stat.st_mtime_ns == dst_stat.st_mtime_ns:
+        return True
+    return hash_file(src) == hash_file(dst)
+
+
+def _reflink(src: Path, dst: Path) -> bool:
+    if fcntl is None:
+        return False
+    try:
+        with open(src, "rb") as src_file, open(dst, "wb") as dst_file:
+            fcntl.ioctl(dst_file.fileno(), _FICLONE, src_file.fileno())
+    except OSError:
+        dst.unlink(missing_ok=True)
+        return False
+    shutil.copystat(src, dst)
+    return True
+
+
+def sync_file(src: Path, dst: Path) -> str:
+    """
+    Make `dst` a hardlink, reflink or copy of `src`, in this order of preference.
+    An existing `dst` with the same content is left untouched, so its mtime is kept.
+
+    :return: "unchanged", "linked", "reflinked" or "copied"
+    """
+    if is_same_file_content(src, dst):
+        return "unchanged"
+
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    tmp_dst = dst.with_name(f".{dst.name}.pwrforge-tmp")
+    tmp_dst.unlink(missing_ok=True)
+    try:
+        try:
+            os.link(src, tmp_dst)
+            method = "linked"
+        except OSError:
+            if _reflink(src, tmp_dst):
+                method = "reflinked"
+            else:
+                shutil.copy2(src, tmp_dst)
+                method = "copied"
+        os.replace(tmp_dst, dst)
+    except BaseException:
+        tmp_dst.unlink(missing_ok=True)
+        raise
+    return method
+
+
+def sync_artifacts(build_tree: Path, output_dir: Path) -> Dict[str, int]:
+    """
+    Bring the artifacts of a CMake build tree into `output_dir`, keeping their relative paths.
+    Object files and other intermediate files are not synced.
+
+    :param Path build_tree: CMake build directory
+    :param Path output_dir: directory receiving the artifacts
+    :return: number of artifacts per `sync_file` result
+    :raises OSError: if an artifact could not be synced
+    """
+    counts: Dict[str, int] = {}
+    for artifact in find_artifacts(build_tree):
+        result = sync_file(build_tree / artifact, output_dir / artifact)
+        counts[result] = counts.get(result, 0) + 1
+    return counts
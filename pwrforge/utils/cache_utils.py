@@ -0,0 +1,91 @@
+"""On-disk caches addressed by content hashes"""
+
+import hashlib
+import json
+import os
+import stat
+import tempfile
+from pathlib import Path
+from typing import Any, Optional, Union
+
+from pwrforge.logger import get_logger
+
+logger = get_logger()
+
+
+def hash_data(*parts: Union[str, bytes]) -> str:
+    """
+    Hash several values into one hex digest.
+
+    Every part is length-prefixed, so ("ab", "c") and ("a", "bc") give different digests.
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        data = part.encode("utf-8") if isinstance(part, str) else part
+        digest.update(len(data).to_bytes(8, "little"))
+        digest.update(data)
+    return digest.hexdigest()
+
+
+def hash_content(data: bytes) -> str:
+    """Same digest as `hash_file` gives for a file with this content."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_file(file_path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        for chunk in iter(lambda: file.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def write_file_atomically(file_path: Path, data: Union[str, bytes]) -> None:
+    """
+    Write a file so that readers see either the old or the new content, never a partial one.
+    Permissions of an existing file are kept.
+    """
+    content = data.encode("utf-8") if isinstance(data, str) else data
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=file_path.parent, prefix=f".{file_path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as tmp_file:
+            tmp_file.write(content)
+        try:
+            os.chmod(tmp_name, stat.S_IMODE(os.stat(file_path).st_mode))
+        except FileNotFoundError:
+            pass
+        os.replace(tmp_name, file_path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+
+class JsonCache:
+    """
+    Directory of JSON documents, one file per key.
+
+    Corrupted or unreadable entries are treated as cache misses, so the cache can always be deleted safely.
+    """
+
+    def __init__(self, cache_dir: Path) -> None:
+        self.cache_dir = cache_dir
+
+    def _get_entry_path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Any]:
+        try:
+            with open(self._get_entry_path(key), encoding="utf-8") as entry_file:
+                return json.load(entry_file)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.debug("Ignoring unreadable cache entry %s: %s", key, e)
+            return None
+
+    def put(self, key: str, value: Any) -> None:
+        try:
+            write_file_atomically(self._get_entry_path(key), json.dumps(value))
+        except OSError as e:
+            logger.debug("Unable to write cache entry %s: %s", key, e)
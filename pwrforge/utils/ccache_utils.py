@@ -0,0 +1,70 @@
+"""Compiler cache statistics"""
+
+import subprocess
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, NamedTuple, Optional
+
+from pwrforge.config import Config
+from pwrforge.logger import get_logger
+
+logger = get_logger()
+
+CCACHE_HIT_COUNTERS = ("direct_cache_hit", "preprocessed_cache_hit")
+CCACHE_MISS_COUNTERS = ("cache_miss",)
+
+
+class CompilerCacheStats(NamedTuple):
+    hits: int
+    misses: int
+
+
+def read_compiler_cache_stats(config: Config) -> Optional[CompilerCacheStats]:
+    """
+    :param Config config: project configuration
+    :return: cumulative statistics of the compiler cache, None if disabled, not ccache or unavailable
+    """
+    cache = config.project.cache
+    if not cache.enabled or Path(cache.launcher).name != "ccache":
+        return None
+    try:
+        result = subprocess.run(
+            [cache.launcher, "--print-stats"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError) as e:
+        logger.debug("Unable to read compiler cache statistics: %s", e)
+        return None
+
+    counters = {}
+    for line in result.stdout.decode(errors="replace").splitlines():
+        key, _, value = line.partition("\t")
+        if value.strip().isdigit():
+            counters[key.strip()] = int(value)
+    return CompilerCacheStats(
+        hits=sum(counters.get(key, 0) for key in CCACHE_HIT_COUNTERS),
+        misses=sum(counters.get(key, 0) for key in CCACHE_MISS_COUNTERS),
+    )
+
+
+def log_compiler_cache_stats(before: CompilerCacheStats, after: CompilerCacheStats) -> None:
+    hits = after.hits - before.hits
+    misses = after.misses - before.misses
+    if hits + misses <= 0:
+        logger.info("Compiler cache: no cacheable compilations")
+        return
+    logger.info("Compiler cache: %d hits, %d misses (%.1f%% hit rate)", hits, misses, 100.0 * hits / (hits + misses))
+
+
+@contextmanager
+def report_compiler_cache_stats(config: Config) -> Iterator[None]:
+    """Log hits and misses of the compiler cache during the block, also if it fails."""
+    before = read_compiler_cache_stats(config)
+    try:
+        yield
+    finally:
+        after = read_compiler_cache_stats(config) if before is not None else None
+        if before is not None and after is not None:
+            log_compiler_cache_stats(before, after)
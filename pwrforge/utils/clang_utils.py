@@ -1,5 +1,5 @@
 from pathlib import Path
-from typing import Iterable, Tuple
+from typing import Iterable, Optional, Tuple
 
 from clang import native  # type: ignore[attr-defined]
 from clang.cindex import Config, Index, TokenKind
@@ -7,9 +7,10 @@ from clang.cindex import Config, Index, TokenKind
 Config().set_library_file(str(Path(native.__file__).with_name("libclang.so")))
 
 
-def get_comment_lines(file_path: Path) -> Iterable[Tuple[int, str]]:
+def get_comment_lines_libclang(file_path: Path, content: Optional[str] = None) -> Iterable[Tuple[int, str]]:
     index = Index.create()
-    translation_unit = index.parse(str(file_path), args=["-x", "c++"])
+    unsaved_files = [(str(file_path), content)] if content is not None else None
+    translation_unit = index.parse(str(file_path), args=["-x", "c++"], unsaved_files=unsaved_files)
 
     for token in translation_unit.cursor.get_tokens():
         if token.kind == TokenKind.COMMENT:  # pylint: disable=no-member
@@ -0,0 +1,55 @@
+"""Lexer finding comments in C and C++ sources without parsing them"""
+
+import re
+from pathlib import Path
+from typing import Iterable, Iterator, Optional, Tuple
+
+# Only the tokens which may contain "//" or "/*" without starting a comment need to be recognized,
+# everything else is skipped by the regex engine.
+_TOKEN_PATTERN = re.compile(
+    r"""
+    (?P<comment>
+        //(?:[^\n\\]|\\(?:\r\n|\n)?)*            # line comment, continued by backslash-newline
+      | /\*(?s:.*?)(?:\*/|\Z)                     # block comment, unterminated one runs to the end of file
+    )
+  | (?<!\w)(?:u8|[uUL])?R"(?P<delimiter>[^()\\\s]{0,16})\((?s:.*?)\)(?P=delimiter)"  # raw string
+  | (?:(?<!\w)(?:u8|[uUL]))?"(?:[^"\\\n]|\\(?s:.))*"?                                # string literal
+  | (?:(?<!\w)(?:u8|[uUL]))?'(?:[^'\\\n]|\\(?s:.))*'?                                # character literal
+  | \b[0-9][\w.]*(?:'\w[\w.]*)+                   # number with digit separators, e.g. 1'000
+  | \#[ \t]*(?:include|include_next|import)[ \t]*<[^>\n]*>  # header name
+    """,
+    re.VERBOSE,
+)
+
+
+def iter_comments(content: str) -> Iterator[Tuple[int, str]]:
+    """
+    Find comments in C or C++ source.
+
+    :param content: source code
+    :return: line number of the comment start and full comment spelling, in the order of appearance
+    """
+    line_number = 1
+    position = 0
+    for match in _TOKEN_PATTERN.finditer(content):
+        comment = match.group("comment")
+        if comment is None:
+            continue
+        start = match.start()
+        line_number += content.count("\n", position, start)
+        position = start
+        yield line_number, comment
+
+
+def get_comment_lines(file_path: Path, content: Optional[str] = None) -> Iterable[Tuple[int, str]]:
+    """
+    Get all lines of comments in a C or C++ file.
+
+    :param file_path: path to the file, read only if content is not given
+    :param content: contents of the file
+    :return: line number and text of every comment line
+    """
+    if content is None:
+        content = file_path.read_text(encoding="utf-8", errors="replace")
+    for line_number, comment in iter_comments(content):
+        yield from enumerate(comment.splitlines(keepends=False), start=line_number)
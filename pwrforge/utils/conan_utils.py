@@ -1,24 +1,35 @@
+import importlib.metadata
+import json
+import os
+import shutil
 import subprocess
 from pathlib import Path
-from typing import Dict, List
+from typing import Callable, Dict, List, Optional, Sequence, Union
 
 from pwrforge.config import Config
+from pwrforge.file_generators.conan_gen import conan_add_default_profile_if_missing
+from pwrforge.global_values import PWRFORGE_CONAN_SETUP_FILE
 from pwrforge.logger import get_logger
+from pwrforge.utils.cache_utils import hash_data, write_file_atomically
 
 logger = get_logger()
 
 
 DEFAULT_PROFILES = ["Debug", "Release", "RelWithDebInfo", "MinSizeRel"]
 
+# Stored in the output folder of `conan install`
+CONAN_INSTALL_FINGERPRINT_FILE = "pwrforge-conan-install.json"
 
-def conan_add_remote(project_path: Path, config: Config) -> None:
+
+def conan_add_remote(project_path: Path, config: Config) -> bool:
     """
     Add conan remote repository
 
     :param Path project_path: path to project
     :param Config config:
-    :return: None
+    :return: True if all remotes were added and logged in
     """
+    success = True
     remotes_without_user = _get_remotes_without_user(config.conan.repo)
     for repo_name, repo_url in config.conan.repo.items():
         try:
@@ -32,18 +43,20 @@ def conan_add_remote(project_path: Path, config: Config) -> None:
             if b"already exists in remotes" not in e.stderr:
                 logger.error(e.stderr.decode().strip())
                 logger.error("Unable to add remote repository")
+                success = False
             else:
                 pass
         if repo_name in remotes_without_user:
-            conan_remote_login(repo_name)
+            success = conan_remote_login(repo_name) and success
+    return success
 
 
-def conan_remote_login(remote: str) -> None:
+def conan_remote_login(remote: str) -> bool:
     """
     Add conan user
 
     :param str remote: name of remote repository
-    :return: None
+    :return: True if logged in
     """
     remote_login_command = ["conan", "remote", "login", remote]
     logger.info("Login to conan remote %s", remote)
@@ -52,13 +65,90 @@ def conan_remote_login(remote: str) -> None:
         subprocess.run(remote_login_command, check=True)
     except subprocess.CalledProcessError:
         logger.error(f"Unable to log in to conan remote {remote}")
+        return False
+    return True
 
 
-def conan_source(project_dir: Path) -> None:
+def conan_source(project_dir: Path) -> bool:
+    """
+    :return: True if the sources were retrieved
+    """
     try:
         subprocess.run(["conan", "source", "."], cwd=project_dir, check=True)
     except subprocess.CalledProcessError:
         logger.error("Unable to source")
+        return False
+    return True
+
+
+def conan_setup(config: Config, default_profile: bool = True) -> None:
+    """
+    Prepare the conan home for the project: default profile, remotes and sources.
+
+    Each step runs only if its inputs changed since it last succeeded, the state is kept in the project build
+    directory. Inputs of all steps are the conan home and the conan version, the remotes step also depends on the
+    remote URLs and the source step on the project conanfile.
+
+    :param Config config: project configuration
+    :param bool default_profile: create the default conan profile if missing
+    :return: None
+    """
+    project_dir = config.project_root
+    state_file = Path(project_dir, PWRFORGE_CONAN_SETUP_FILE)
+    state = _load_conan_setup_state(state_file)
+    conan_home = get_conan_home()
+    conan_version = get_conan_version()
+
+    def get_file_stamp(file_path: Path) -> str:
+        try:
+            stat = file_path.stat()
+        except OSError:
+            return ""
+        return f"{stat.st_size} {stat.st_mtime_ns}"
+
+    def get_key(*parts: Union[str, bytes]) -> str:
+        return hash_data(str(conan_home), conan_version, *parts)
+
+    # Keys are computed after a step ran, as it updates the conan home files the keys cover
+    if default_profile:
+        profile_file = conan_home / "profiles" / "default"
+        if state.get("default-profile") != get_key(get_file_stamp(profile_file)):
+            conan_add_default_profile_if_missing()
+            state["default-profile"] = get_key(get_file_stamp(profile_file))
+            _store_conan_setup_state(state_file, state)
+
+    remotes = json.dumps(config.conan.repo, sort_keys=True)
+    remotes_file = conan_home / "remotes.json"
+    if state.get("remotes") != get_key(remotes, get_file_stamp(remotes_file)):
+        state.pop("remotes", None)
+        if conan_add_remote(project_dir, config):
+            state["remotes"] = get_key(remotes, get_file_stamp(remotes_file))
+        _store_conan_setup_state(state_file, state)
+
+    try:
+        conanfile = Path(project_dir, "conanfile.py").read_bytes()
+    except OSError:
+        conanfile = b""
+    if state.get("source") != get_key(conanfile):
+        state.pop("source", None)
+        if conan_source(project_dir):
+            state["source"] = get_key(conanfile)
+        _store_conan_setup_state(state_file, state)
+
+
+def _load_conan_setup_state(state_file: Path) -> Dict[str, str]:
+    try:
+        state = json.loads(state_file.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return state if isinstance(state, dict) else {}
+
+
+def _store_conan_setup_state(state_file: Path, state: Dict[str, str]) -> None:
+    try:
+        write_file_atomically(state_file, json.dumps(state, indent=2))
+    except OSError as e:
+        logger.debug("Unable to store conan setup state: %s", e)
 
 
 def _get_remotes_without_user(conan_remotes: Dict[str, str]) -> List[str]:
@@ -72,3 +162,138 @@ def _get_remotes_without_user(conan_remotes: Dict[str, str]) -> List[str]:
                 no_users.append(remote_line)
 
     return no_users
+
+
+def get_conan_home() -> Path:
+    return Path(os.environ.get("CONAN_HOME") or Path.home() / ".conan2")
+
+
+def get_conan_version() -> str:
+    """Version of the conan package together with the path and mtime of the `conan` executable"""
+    try:
+        version = importlib.metadata.version("conan")
+    except importlib.metadata.PackageNotFoundError:
+        version = "unknown"
+    program = shutil.which("conan")
+    try:
+        mtime = Path(program).stat().st_mtime_ns if program else None
+    except OSError:
+        mtime = None
+    return f"{version} {program} {mtime}"
+
+
+def get_conan_install_fingerprint(
+    config: Config,
+    conanfile: Path,
+    args: Sequence[Union[str, Path]],
+    profile_file: Optional[Path] = None,
+) -> str:
+    """
+    Hash of the inputs of `conan install`.
+
+    Covers the conanfile, the host profile and the default profile, the dependencies and remotes from the config,
+    the conan version and the install arguments.
+
+    :param Config config: project configuration
+    :param Path conanfile: conanfile.py which is installed
+    :param args: arguments of `conan install`
+    :param profile_file: host profile passed with `-pr`, if any
+    :return: hex digest
+    """
+
+    def read(file_path: Optional[Path]) -> bytes:
+        try:
+            return file_path.read_bytes() if file_path else b""
+        except OSError:
+            return b""
+
+    return hash_data(
+        read(conanfile),
+        read(profile_file),
+        read(get_conan_home() / "profiles" / "default"),
+        config.dependencies.json(),
+        json.dumps(config.conan.repo, sort_keys=True),
+        get_conan_version(),
+        json.dumps([str(arg) for arg in args]),
+    )
+
+
+def find_conan_toolchain_files(output_dir: Path) -> List[Path]:
+    """Toolchain files generated by `conan install`, with or without `cmake_layout`"""
+    return sorted(
+        [
+            *output_dir.glob("conan_toolchain.cmake"),
+            *output_dir.glob("build/generators/conan_toolchain.cmake"),
+            *output_dir.glob("build/*/generators/conan_toolchain.cmake"),
+        ]
+    )
+
+
+def is_conan_install_up_to_date(output_dir: Path, fingerprint: str) -> bool:
+    """
+    :param Path output_dir: output folder of `conan install`
+    :param str fingerprint: fingerprint of the current inputs
+    :return: True if the last install had the same inputs and its toolchain files still exist
+    """
+    try:
+        data = json.loads(Path(output_dir, CONAN_INSTALL_FINGERPRINT_FILE).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return False
+    if not isinstance(data, dict) or data.get("fingerprint") != fingerprint:
+        return False
+    toolchain_files = data.get("toolchain-files") or []
+    return bool(toolchain_files) and all(Path(output_dir, file).is_file() for file in toolchain_files)
+
+
+def store_conan_install_fingerprint(output_dir: Path, fingerprint: str) -> None:
+    """
+    Record the fingerprint of a successful install together with the toolchain files it generated.
+    Nothing is recorded if no toolchain file was found, so the next install is not skipped.
+    """
+    fingerprint_file = Path(output_dir, CONAN_INSTALL_FINGERPRINT_FILE)
+    toolchain_files = find_conan_toolchain_files(Path(output_dir))
+    if not toolchain_files:
+        logger.debug("No conan toolchain file in %s, install fingerprint not stored", output_dir)
+        fingerprint_file.unlink(missing_ok=True)
+        return
+    data = {
+        "fingerprint": fingerprint,
+        "toolchain-files": [file.relative_to(output_dir).as_posix() for file in toolchain_files],
+    }
+    write_file_atomically(fingerprint_file, json.dumps(data, indent=2))
+
+
+def conan_install(
+    config: Config,
+    cmd: Sequence[Union[str, Path]],
+    conanfile: Path,
+    output_dir: Path,
+    profile_file: Optional[Path] = None,
+    force: bool = False,
+    run: Optional[Callable[[Sequence[Union[str, Path]]], None]] = None,
+) -> bool:
+    """
+    Run `conan install` unless the fingerprint of its inputs matches the last install into `output_dir`.
+
+    :param Config config: project configuration
+    :param cmd: `conan install` command
+    :param Path conanfile: conanfile.py which is installed
+    :param Path output_dir: output folder of the install
+    :param profile_file: host profile passed with `-pr`, if any
+    :param bool force: install even if the inputs did not change
+    :param run: runs the command, `subprocess.run` in the project root if not given
+    :return: True if the install ran, False if it was skipped
+    :raises subprocess.CalledProcessError: if the install failed
+    """
+    fingerprint = get_conan_install_fingerprint(config, conanfile, cmd, profile_file)
+    if not force and is_conan_install_up_to_date(output_dir, fingerprint):
+        logger.info("Conan dependencies in %s are up to date, skipping install", output_dir)
+        return False
+
+    Path(output_dir, CONAN_INSTALL_FINGERPRINT_FILE).unlink(missing_ok=True)
+    if run is None:
+        subprocess.run(cmd, cwd=config.project_root, check=True)
+    else:
+        run(cmd)
+    store_conan_install_fingerprint(output_dir, fingerprint)
+    return True
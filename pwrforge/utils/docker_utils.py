@@ -1,6 +1,6 @@
 import sys
 from pathlib import Path, PurePosixPath
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Sequence
 
 import docker as dock
 from docker import DockerClient
@@ -22,12 +22,20 @@ def prepare_docker(project_config: ProjectConfig, project_path: Path) -> Dict[st
     docker_tag = project_config.docker_image_tag
     client = dock.from_env()
 
+    # Compiler cache outside the project is mounted at the same path to persist between containers
+    extra_volumes = []
+    cache_dir = project_config.cache.get_dir_path(project_path)
+    if project_config.cache.enabled and not cache_dir.is_relative_to(project_path):
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        extra_volumes.append(f"{cache_dir}:{cache_dir}")
+
     return {
         "project_path": project_path,
         "client": client,
         "path_in_docker": path_in_docker,
         "entrypoint": entrypoint,
         "docker_tag": docker_tag,
+        "extra_volumes": extra_volumes,
     }
 
 
@@ -59,12 +67,13 @@ def run_command_in_docker(  # type: ignore[no-any-unimported]
     entrypoint: str,
     project_path: Path,
     path_in_docker: PurePosixPath,
+    extra_volumes: Sequence[str] = (),
 ) -> Dict[str, Any]:
     logger.info(f"Running '{' '.join(command)}' command in docker.")
     container = client.containers.run(
         docker_tag,
         command,
-        volumes=[f"{project_path}:/workspace/", "/dev/:/dev/"],
+        volumes=[f"{project_path}:/workspace/", "/dev/:/dev/", *extra_volumes],
         entrypoint=entrypoint,
         privileged=True,
         detach=True,
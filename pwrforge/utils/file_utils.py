@@ -1,6 +1,13 @@
+import os
 import re
+import threading
+from collections import OrderedDict
 from pathlib import Path
-from typing import Iterable, List, Tuple
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from pwrforge.logger import get_logger
+
+logger = get_logger()
 
 
 def finditer_with_line_numbers(
@@ -67,16 +74,269 @@ def extract_grouped_line_comments(content: str) -> List[str]:
     return grouped_comments
 
 
-def extract_comment_sections(file_path: Path) -> List[str]:
+def get_comment_sections(content: str) -> List[str]:
     """
-    Extracts comment sections from the given file.
+    Extracts comment sections from the given content.
 
-    :param file_path: A Path object pointing to the file.
+    :param content: The string to extract comments from.
     :return: A list of comment sections.
     """
-    content = file_path.read_text()
-
     block_comments = extract_block_comments(content)
     grouped_line_comments = extract_grouped_line_comments(content)
 
     return block_comments + grouped_line_comments
+
+
+# Whitespace, comments and preprocessor directives, which may precede the first declaration of a file.
+# Unterminated comments and directives match up to the end of the text, so a prefix cut by a read is detected.
+HEADER_ITEM_PATTERN = re.compile(r"[\s\ufeff]+|//[^\n]*|/\*(?:.*?\*/|.*\Z)|#(?:\\\r?\n|[^\n])*", re.DOTALL)
+
+
+def get_header_prefix_end(content: str) -> int:
+    """
+    Offset of the first token which is not whitespace, a comment or a preprocessor directive.
+
+    :param content: contents of a source file, or its beginning
+    :return: offset of the token, length of `content` if there is none
+    """
+    position = 0
+    while True:
+        match = HEADER_ITEM_PATTERN.match(content, position)
+        if match is None or match.end() == position:
+            return position
+        position = match.end()
+
+
+def read_header_prefix(file_path: Path, window: int = 8192) -> str:
+    """
+    Comments and preprocessor directives at the top of a file, up to its first declaration.
+
+    The first `window` bytes are read, the rest of the file only if the prefix reaches further,
+    so checking a large generated file costs one small read.
+
+    :param file_path: A Path object pointing to the file.
+    :param window: number of bytes read at first, every further read is twice as large
+    :return: prefix of the file contents
+    """
+    data = b""
+    size = max(window, 1)
+    with open(file_path, "rb") as file:
+        while True:
+            chunk = file.read(size)
+            data += chunk
+            content = data.decode("utf-8", errors="replace")
+            end = get_header_prefix_end(content)
+            # A prefix ending at the last character may continue in the next chunk, e.g. after a cut "/*"
+            if not chunk or end < len(content) - 1:
+                return content[:end]
+            size *= 2
+
+
+CommentLinesReader = Callable[[Path, str], Iterable[Tuple[int, str]]]
+
+
+class SourceFile:
+    """
+    Contents of a source file with lazily computed views shared by all checkers.
+    """
+
+    def __init__(self, path: Path, data: bytes, comment_lines_reader: Optional[CommentLinesReader] = None) -> None:
+        self.path = path
+        self.data = data
+        self._comment_lines_reader = comment_lines_reader
+        self._text: Optional[str] = None
+        self._comment_lines: Optional[List[Tuple[int, str]]] = None
+
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            self._text = self.data.decode("utf-8")
+        return self._text
+
+    @property
+    def comment_lines(self) -> List[Tuple[int, str]]:
+        """(line number, line) pairs of every comment line."""
+        if self._comment_lines is None:
+            assert self._comment_lines_reader is not None, "no comment lines reader given to the corpus"
+            self._comment_lines = list(self._comment_lines_reader(self.path, self.text))
+        return self._comment_lines
+
+
+class SourceCorpus:
+    """
+    Per-run store of source files, so each file is read and parsed once for all checkers.
+
+    Consumers register the files they are going to read and release every file when done with it.
+    A file is evicted once all registered consumers released it. Independently, the least recently
+    used files are evicted when the total size exceeds `max_bytes`, so memory use stays bounded
+    even if consumers process files in different orders.
+    """
+
+    def __init__(self, comment_lines_reader: Optional[CommentLinesReader] = None, max_bytes: int = 256 << 20) -> None:
+        self._comment_lines_reader = comment_lines_reader
+        self._max_bytes = max_bytes
+        self._files: "OrderedDict[Path, SourceFile]" = OrderedDict()
+        self._size = 0
+        self._pending: Dict[Path, int] = {}
+        self._lock = threading.Lock()
+
+    def __contains__(self, file_path: Path) -> bool:
+        return file_path in self._files
+
+    def __len__(self) -> int:
+        return len(self._files)
+
+    def register(self, file_paths: Iterable[Path]) -> None:
+        with self._lock:
+            for file_path in file_paths:
+                self._pending[file_path] = self._pending.get(file_path, 0) + 1
+
+    def get(self, file_path: Path) -> SourceFile:
+        with self._lock:
+            source_file = self._files.get(file_path)
+            if source_file is not None:
+                self._files.move_to_end(file_path)
+                return source_file
+
+        source_file = SourceFile(file_path, file_path.read_bytes(), self._comment_lines_reader)
+        with self._lock:
+            if file_path in self._files:
+                return self._files[file_path]
+            if self._pending.get(file_path, 0) > 0:
+                self._files[file_path] = source_file
+                self._size += len(source_file.data)
+                self._evict_over_budget()
+        return source_file
+
+    def release(self, file_path: Path) -> None:
+        with self._lock:
+            pending = self._pending.get(file_path, 0) - 1
+            if pending > 0:
+                self._pending[file_path] = pending
+                return
+            self._pending.pop(file_path, None)
+            self._remove(file_path)
+
+    def invalidate(self, file_path: Path) -> None:
+        """Forget the cached contents, e.g. after the file was modified."""
+        with self._lock:
+            self._remove(file_path)
+
+    def _remove(self, file_path: Path) -> None:
+        source_file = self._files.pop(file_path, None)
+        if source_file is not None:
+            self._size -= len(source_file.data)
+
+    def _evict_over_budget(self) -> None:
+        while self._size > self._max_bytes and len(self._files) > 1:
+            _, source_file = self._files.popitem(last=False)
+            self._size -= len(source_file.data)
+
+
+def _translate_glob_segment(segment: str) -> str:
+    """
+    Regex for one path segment of a glob pattern, with the semantics of glob.glob: wildcards do not
+    cross directory separators and do not match a leading dot.
+    """
+    regex = "(?!\\.)" if segment[:1] in ("*", "?", "[") else ""
+    index = 0
+    while index < len(segment):
+        char = segment[index]
+        index += 1
+        if char == "*":
+            regex += "[^/]*"
+        elif char == "?":
+            regex += "[^/]"
+        elif char == "[":
+            end = segment.find("]", index + 1 if segment[index : index + 1] in ("!", "]") else index)
+            if end < 0:
+                regex += "\\["
+                continue
+            content = segment[index:end].replace("\\", "\\\\")
+            index = end + 1
+            if content.startswith("!"):
+                content = "^/" + content[1:]
+            regex += f"[{content}]"
+        else:
+            regex += re.escape(char)
+    return regex
+
+
+class ExcludeMatcher:
+    """
+    Matches paths excluded by glob patterns, as well as everything below an excluded directory.
+
+    All patterns are compiled into a single regex, so a check takes one match regardless of the number of patterns.
+    Relative patterns are resolved against `base_dir`, by default the current working directory.
+    """
+
+    def __init__(self, exclude_patterns: Iterable[str], base_dir: Optional[Path] = None) -> None:
+        base = (base_dir or Path.cwd()).absolute()
+        alternatives = []
+        for pattern in exclude_patterns:
+            absolute_pattern = os.path.normpath(base / pattern).replace(os.sep, "/")
+            segments = absolute_pattern.split("/")
+            alternatives.append("/".join(_translate_glob_segment(segment) if segment else "" for segment in segments))
+        self._regex = re.compile(f"(?:{'|'.join(alternatives)})(?:/.*)?") if alternatives else None
+
+    def __bool__(self) -> bool:
+        return self._regex is not None
+
+    def match(self, path: Path) -> bool:
+        if self._regex is None:
+            return False
+        return self._regex.fullmatch(os.path.abspath(path).replace(os.sep, "/")) is not None
+
+
+def walk_files(dir_path: Path, exclude: Optional[ExcludeMatcher] = None, log_skipped: bool = True) -> List[Path]:
+    """
+    List files in a directory tree in one pass, skipping excluded directories without entering them.
+
+    Like Path.rglob, symlinks to directories are not followed.
+
+    :param dir_path: root of the tree
+    :param exclude: paths to skip
+    :param log_skipped: log each skipped path
+    :return: sorted paths of files, relative to the same base as `dir_path`
+    """
+    file_paths: List[Path] = []
+    pending = [str(dir_path)]
+    while pending:
+        current_dir = pending.pop()
+        try:
+            with os.scandir(current_dir) as entries:
+                for entry in entries:
+                    if exclude and exclude.match(Path(entry.path)):
+                        if log_skipped:
+                            logger.info("Skipping %s", entry.path)
+                    elif entry.is_dir(follow_symlinks=False):
+                        pending.append(entry.path)
+                    elif entry.is_file():
+                        file_paths.append(Path(entry.path))
+        except OSError as e:
+            logger.debug("Unable to list %s: %s", current_dir, e)
+    return sorted(file_paths)
+
+
+class FileIndex:
+    """
+    Files of the project, walked once per run and shared by all checkers.
+
+    `exclude_patterns` common to all checkers prune the walk, checker specific exclusions are applied on the result.
+    """
+
+    def __init__(self, exclude_patterns: Iterable[str] = (), base_dir: Optional[Path] = None) -> None:
+        self._exclude = ExcludeMatcher(exclude_patterns, base_dir)
+        self._files: Dict[Path, List[Path]] = {}
+        self._lock = threading.Lock()
+
+    def get_files(self, dir_path: Path) -> List[Path]:
+        with self._lock:
+            if dir_path not in self._files:
+                self._files[dir_path] = walk_files(dir_path, self._exclude)
+            return self._files[dir_path]
+
+    def invalidate(self) -> None:
+        """Forget listed files, e.g. after files were created or removed."""
+        with self._lock:
+            self._files.clear()
@@ -0,0 +1,52 @@
+"""Query a local git repository"""
+
+import subprocess
+import sys
+from pathlib import Path
+from typing import List, Optional, Set
+
+from pwrforge.logger import get_logger
+
+logger = get_logger()
+
+
+def _run_git(repo_dir: Path, args: List[str]) -> str:
+    cmd = ["git", "-C", str(repo_dir), *args]
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+    except FileNotFoundError:
+        logger.error("git not installed or not added to PATH")
+        sys.exit(1)
+    except subprocess.CalledProcessError as e:
+        logger.error("Command `%s` failed: %s", " ".join(cmd), e.stderr.strip())
+        sys.exit(1)
+    return result.stdout
+
+
+def get_changed_files(repo_dir: Path, changed_since: Optional[str] = None, staged: bool = False) -> Set[Path]:
+    """
+    Get files added, copied, modified or renamed in a git repository.
+
+    :param repo_dir: any directory inside the repository
+    :param changed_since: compare the working tree with this ref, untracked files count as changed
+    :param staged: take only changes staged for the next commit
+    :return: resolved paths of the changed files which still exist
+    """
+    top_level = Path(_run_git(repo_dir, ["rev-parse", "--show-toplevel"]).strip())
+    diff_cmd = ["diff", "--name-only", "--diff-filter=ACMR", "-z"]
+    if staged:
+        diff_cmd.append("--cached")
+    if changed_since:
+        diff_cmd.extend([changed_since, "--"])
+    names = _run_git(top_level, diff_cmd).split("\0")
+    if not staged:
+        names.extend(_run_git(top_level, ["ls-files", "--others", "--exclude-standard", "-z"]).split("\0"))
+
+    changed_files = set()
+    for name in names:
+        if not name:
+            continue
+        file_path = (top_level / name).resolve()
+        if file_path.is_file():
+            changed_files.add(file_path)
+    return changed_files
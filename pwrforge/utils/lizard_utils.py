@@ -0,0 +1,53 @@
+"""Function complexity metrics computed in-process with the lizard library"""
+
+from typing import List, NamedTuple
+
+import lizard
+
+
+class FunctionMetrics(NamedTuple):
+    """Metrics of a single function, as reported by lizard."""
+
+    name: str
+    line: int
+    ccn: int
+    nloc: int
+    tokens: int
+    parameters: int
+    length: int
+
+
+def get_lizard_version() -> str:
+    return str(lizard.version)
+
+
+def is_lizard_source(file_name: str) -> bool:
+    """
+    :param file_name: name of the file
+    :return: True if lizard has a reader for the language of the file
+    """
+    return lizard.get_reader_for(file_name) is not None
+
+
+def analyze_source(file_name: str, content: str) -> List[FunctionMetrics]:
+    """
+    Compute metrics of every function in a source file. Module level function, so it can run in a process pool.
+
+    :param file_name: name of the file, its extension selects the language reader
+    :param content: source code
+    :return: metrics of the functions in the order of appearance
+    """
+    analyzer = lizard.FileAnalyzer(lizard.get_extensions([]))
+    file_info = analyzer.analyze_source_code(file_name, content)
+    return [
+        FunctionMetrics(
+            name=function.name,
+            line=function.start_line,
+            ccn=function.cyclomatic_complexity,
+            nloc=function.nloc,
+            tokens=function.token_count,
+            parameters=function.parameter_count,
+            length=function.length,
+        )
+        for function in file_info.function_list
+    ]
@@ -0,0 +1,112 @@
+"""Merge and apply source replacements exported by clang tools"""
+
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, NamedTuple
+
+import yaml
+
+from pwrforge.logger import get_logger
+
+logger = get_logger()
+
+
+class Replacement(NamedTuple):
+    file_path: Path
+    # Byte offset and length of the replaced range
+    offset: int
+    length: int
+    text: str
+
+    @property
+    def end(self) -> int:
+        return self.offset + self.length
+
+
+def load_replacements(fixes_file: Path) -> List[Replacement]:
+    """
+    Read replacements from a file written by `clang-tidy -export-fixes`, with resolved file paths.
+
+    Both the current format, with replacements in `DiagnosticMessage`, and the pre-clang-9 format,
+    with replacements directly in the diagnostic, are supported. Unreadable files are skipped.
+    """
+    try:
+        document = yaml.safe_load(fixes_file.read_text(encoding="utf-8"))
+    except (OSError, UnicodeDecodeError, yaml.YAMLError) as e:
+        logger.warning("Unable to read fixes from %s: %s", fixes_file, e)
+        return []
+    if not isinstance(document, dict):
+        return []
+
+    replacements = []
+    for diagnostic in document.get("Diagnostics") or []:
+        message = diagnostic.get("DiagnosticMessage") or diagnostic
+        # Relative paths are relative to the directory of the compilation database entry
+        build_dir = Path(diagnostic.get("BuildDirectory") or "")
+        for entry in message.get("Replacements") or []:
+            replacements.append(_parse_replacement(entry, build_dir))
+    return replacements
+
+
+def _parse_replacement(entry: Dict[str, Any], build_dir: Path) -> Replacement:
+    # Resolved, so fixes of a file spelled differently by translation units are merged together
+    return Replacement(
+        (build_dir / entry["FilePath"]).resolve(),
+        int(entry["Offset"]),
+        int(entry["Length"]),
+        entry.get("ReplacementText") or "",
+    )
+
+
+def merge_replacements(replacements: Iterable[Replacement]) -> Dict[Path, List[Replacement]]:
+    """
+    Group replacements by file, sorted by offset.
+
+    The same fix of a header is exported by every translation unit which includes it, so duplicates are dropped.
+    Replacements overlapping the preceding accepted one of the same file are dropped with a warning, so of
+    conflicting fixes the one with the lowest offset wins. Accepted replacements do not overlap, so checking
+    only the preceding one is enough.
+    """
+    per_file: Dict[Path, List[Replacement]] = {}
+    for replacement in dict.fromkeys(replacements):
+        per_file.setdefault(replacement.file_path, []).append(replacement)
+
+    merged = {}
+    for file_path, file_replacements in per_file.items():
+        accepted: List[Replacement] = []
+        for replacement in sorted(file_replacements, key=lambda replacement: (replacement.offset, replacement.length)):
+            if accepted and _overlaps(replacement, accepted[-1]):
+                logger.warning(
+                    "Skipping fix of %s at offset %d, it conflicts with the fix at offset %d",
+                    file_path,
+                    replacement.offset,
+                    accepted[-1].offset,
+                )
+                continue
+            accepted.append(replacement)
+        merged[file_path] = accepted
+    return merged
+
+
+def _overlaps(first: Replacement, second: Replacement) -> bool:
+    if first.offset == second.offset:
+        # Two insertions at the same place are ambiguous, an insertion before a removal is not
+        return first.length == second.length or (first.length > 0 and second.length > 0)
+    return first.offset < second.end and second.offset < first.end
+
+
+def apply_replacements(content: bytes, replacements: List[Replacement]) -> bytes:
+    """
+    Apply non-overlapping replacements, sorted by offset, to file contents.
+
+    :raises ValueError: if a replacement is out of the file
+    """
+    parts: List[bytes] = []
+    position = 0
+    for replacement in replacements:
+        if replacement.offset < position or replacement.end > len(content):
+            raise ValueError(f"replacement at offset {replacement.offset} is out of the file")
+        parts.append(content[position : replacement.offset])
+        parts.append(replacement.text.encode("utf-8"))
+        position = replacement.end
+    parts.append(content[position:])
+    return b"".join(parts)
@@ -0,0 +1,191 @@
+"""Machine-readable reports of check findings, written while the checks are running"""
+
+import abc
+import json
+import os
+import sys
+import threading
+from enum import Enum
+from pathlib import Path
+from typing import IO, Any, Dict, NamedTuple, Optional, Sequence
+
+from pwrforge import __version__
+
+
+class ReportFormat(Enum):
+    sarif = "sarif"
+    jsonl = "jsonl"
+
+
+SARIF_SCHEMA = "https://json.schemastore.org/sarif-2.1.0.json"
+SARIF_VERSION = "2.1.0"
+
+
+class Finding(NamedTuple):
+    """Single problem found by a checker."""
+
+    file: str
+    message: str
+    line: Optional[int] = None
+    column: Optional[int] = None
+    rule: Optional[str] = None
+    # SARIF result level: error, warning or note
+    level: str = "warning"
+
+
+class FindingsReporter(abc.ABC):
+    """
+    Writes findings as soon as a file or translation unit is checked, so the report never has to be kept in memory.
+
+    Methods may be called from checker worker threads.
+    """
+
+    def __init__(self, stream: IO[str], base_dir: Optional[Path] = None, close_stream: bool = False) -> None:
+        self._stream = stream
+        self._close_stream = close_stream
+        self._base_dir = (base_dir or Path.cwd()).absolute()
+        self._lock = threading.Lock()
+        self._timings: Dict[str, Dict[str, Any]] = {}
+
+    def get_relative_path(self, file: str) -> str:
+        """Path relative to the project root with forward slashes, absolute only for files outside of it."""
+        path = Path(file)
+        absolute_path = path if path.is_absolute() else self._base_dir / path
+        try:
+            return Path(os.path.normpath(absolute_path)).relative_to(self._base_dir).as_posix()
+        except ValueError:
+            return absolute_path.as_posix()
+
+    def file_checked(self, checker: str, findings: Sequence[Finding], duration: Optional[float]) -> None:
+        """
+        Report findings of one checked file or translation unit.
+
+        :param checker: name of the check
+        :param findings: problems found, may be empty
+        :param duration: wall time of checking the file in seconds, None if it is unknown
+        """
+        if not findings:
+            return
+        with self._lock:
+            for finding in findings:
+                self.write_finding(checker, finding, duration)
+            self._stream.flush()
+
+    def check_finished(self, checker: str, problems: int, duration: float) -> None:
+        with self._lock:
+            self._timings[checker] = {"problems": problems, "duration": round(duration, 6)}
+            self.write_check(checker, problems, duration)
+            self._stream.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            self.write_end()
+            self._stream.flush()
+            if self._close_stream:
+                self._stream.close()
+
+    def get_finding_data(self, checker: str, finding: Finding, duration: Optional[float]) -> Dict[str, Any]:
+        return {
+            "checker": checker,
+            "file": self.get_relative_path(finding.file) if finding.file else None,
+            "line": finding.line,
+            "column": finding.column,
+            "rule": finding.rule or checker,
+            "level": finding.level,
+            "message": finding.message,
+            "duration": round(duration, 6) if duration is not None else None,
+        }
+
+    @abc.abstractmethod
+    def write_finding(self, checker: str, finding: Finding, duration: Optional[float]) -> None:
+        pass
+
+    def write_check(self, checker: str, problems: int, duration: float) -> None:
+        pass
+
+    def write_end(self) -> None:
+        pass
+
+
+class JsonLinesReporter(FindingsReporter):
+    """One JSON document per line: a `finding` record for every finding and a `check` record when a check ends."""
+
+    def _write(self, data: Dict[str, Any]) -> None:
+        self._stream.write(json.dumps(data) + "\n")
+
+    def write_finding(self, checker: str, finding: Finding, duration: Optional[float]) -> None:
+        self._write({"type": "finding", **self.get_finding_data(checker, finding, duration)})
+
+    def write_check(self, checker: str, problems: int, duration: float) -> None:
+        self._write({"type": "check", "checker": checker, "problems": problems, "duration": round(duration, 6)})
+
+
+class SarifReporter(FindingsReporter):
+    """
+    SARIF 2.1.0 log with a single run. Results are appended to the open `results` array as they come,
+    check timings are written in the invocation properties when the report is closed.
+    """
+
+    def __init__(self, stream: IO[str], base_dir: Optional[Path] = None, close_stream: bool = False) -> None:
+        super().__init__(stream, base_dir, close_stream)
+        self._first_result = True
+        document = {
+            "$schema": SARIF_SCHEMA,
+            "version": SARIF_VERSION,
+            "runs": [
+                {
+                    "tool": {"driver": {"name": "pwrforge", "version": __version__}},
+                    "originalUriBaseIds": {"PROJECTROOT": {"uri": self._base_dir.as_uri() + "/"}},
+                    "results": [],
+                }
+            ],
+        }
+        # Results are streamed into the empty array, the rest of the document is written around them
+        prefix, self._suffix = json.dumps(document).split('"results": []')
+        self._stream.write(prefix + '"results": [\n')
+
+    def write_finding(self, checker: str, finding: Finding, duration: Optional[float]) -> None:
+        data = self.get_finding_data(checker, finding, duration)
+        region: Dict[str, int] = {}
+        if finding.line is not None:
+            region["startLine"] = finding.line
+        if finding.column is not None:
+            region["startColumn"] = finding.column
+        locations = []
+        if data["file"] is not None:
+            physical_location: Dict[str, Any] = {"artifactLocation": {"uri": data["file"]}}
+            if not Path(data["file"]).is_absolute():
+                physical_location["artifactLocation"]["uriBaseId"] = "PROJECTROOT"
+            if region:
+                physical_location["region"] = region
+            locations.append({"physicalLocation": physical_location})
+        result = {
+            "ruleId": data["rule"],
+            "level": finding.level,
+            "message": {"text": finding.message},
+            "locations": locations,
+            "properties": {"checker": checker, "duration": data["duration"]},
+        }
+        separator = "" if self._first_result else ",\n"
+        self._first_result = False
+        self._stream.write(separator + json.dumps(result))
+
+    def write_end(self) -> None:
+        invocation = {"executionSuccessful": True, "properties": {"checks": self._timings}}
+        self._stream.write(f'\n], "invocations": [{json.dumps(invocation)}]{self._suffix}\n')
+
+
+def create_reporter(
+    report_format: ReportFormat, output: Optional[Path] = None, base_dir: Optional[Path] = None
+) -> FindingsReporter:
+    """
+    :param report_format: format of the report
+    :param output: report file, standard output if not given
+    :param base_dir: directory to which file paths are relative in the report
+    """
+    if output:
+        stream: IO[str] = open(output, "w", encoding="utf-8")  # pylint: disable=consider-using-with
+    else:
+        stream = sys.stdout
+    reporter_class = SarifReporter if report_format == ReportFormat.sarif else JsonLinesReporter
+    return reporter_class(stream, base_dir, close_stream=output is not None)
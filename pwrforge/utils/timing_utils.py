@@ -0,0 +1,179 @@
+"""Wall time and CPU time of checks, per checker and per checked file"""
+
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional
+
+try:
+    import resource
+except ImportError:  # pragma: no cover, not available on Windows
+    resource = None  # type: ignore[assignment]
+
+
+def get_children_cpu_time() -> Optional[float]:
+    """
+    User and system CPU time of child processes which ended and were waited for, None if it cannot be measured.
+    """
+    if resource is None:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+class FileTiming(NamedTuple):
+    checker: str
+    file: str
+    duration: float
+
+
+class CheckerTiming(NamedTuple):
+    checker: str
+    # Wall time of the whole check
+    duration: float
+    # CPU time of child processes which ended during the check, None if it cannot be measured
+    children_cpu: Optional[float]
+    files: int
+    files_duration: float
+
+
+class CheckTimings:
+    """
+    Timings collected while checks run: wall time and child process CPU time of every checker
+    and wall time of every checked file or translation unit.
+
+    Child process CPU time is counted for the whole pwrforge process, so checkers running at the same time share
+    the CPU time of tools which ended while both of them were running. The total of the run is exact.
+
+    Methods may be called from checker worker threads.
+    """
+
+    def __init__(self, base_dir: Optional[Path] = None) -> None:
+        self._base_dir = (base_dir or Path.cwd()).absolute()
+        self._lock = threading.Lock()
+        self._checkers: Dict[str, Dict[str, Optional[float]]] = {}
+        self._files: Dict[str, Dict[str, float]] = {}
+        self._start = time.perf_counter()
+        self._start_children_cpu = get_children_cpu_time()
+
+    @contextmanager
+    def measure(self, checker: str) -> Iterator[None]:
+        """
+        Measure a whole check. Repeated checks of the same checker, e.g. in watch mode, are added up.
+        """
+        start = time.perf_counter()
+        start_children_cpu = get_children_cpu_time()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start
+            end_children_cpu = get_children_cpu_time()
+            children_cpu = (
+                end_children_cpu - start_children_cpu
+                if end_children_cpu is not None and start_children_cpu is not None
+                else None
+            )
+            with self._lock:
+                timing = self._checkers.setdefault(
+                    checker, {"duration": 0.0, "children_cpu": 0.0 if children_cpu is not None else None}
+                )
+                timing["duration"] = (timing["duration"] or 0.0) + duration
+                if children_cpu is not None and timing["children_cpu"] is not None:
+                    timing["children_cpu"] = (timing["children_cpu"] or 0.0) + children_cpu
+
+    def file_checked(self, checker: str, file_path: Path, duration: Optional[float]) -> None:
+        """
+        Record the wall time of checking a file or translation unit, nothing if it is unknown.
+        """
+        if duration is None:
+            return
+        file = self.get_relative_path(file_path)
+        with self._lock:
+            files = self._files.setdefault(checker, {})
+            files[file] = files.get(file, 0.0) + duration
+
+    def get_relative_path(self, file_path: Path) -> str:
+        absolute_path = file_path if file_path.is_absolute() else self._base_dir / file_path
+        try:
+            return absolute_path.relative_to(self._base_dir).as_posix()
+        except ValueError:
+            return absolute_path.as_posix()
+
+    def get_checker_timings(self) -> List[CheckerTiming]:
+        """
+        :return: timings of checkers, the slowest first
+        """
+        with self._lock:
+            timings = [
+                CheckerTiming(
+                    checker,
+                    timing["duration"] or 0.0,
+                    timing["children_cpu"],
+                    len(self._files.get(checker, {})),
+                    sum(self._files.get(checker, {}).values()),
+                )
+                for checker, timing in self._checkers.items()
+            ]
+        return sorted(timings, key=lambda timing: -timing.duration)
+
+    def get_slowest_files(self, count: Optional[int] = None) -> List[FileTiming]:
+        """
+        :param count: number of files, all if not given
+        :return: files and translation units which took longest to check, by any checker
+        """
+        with self._lock:
+            timings = [
+                FileTiming(checker, file, duration)
+                for checker, files in self._files.items()
+                for file, duration in files.items()
+            ]
+        return sorted(timings, key=lambda timing: (-timing.duration, timing.checker, timing.file))[:count]
+
+    def get_slowest_directories(self, count: Optional[int] = None) -> List[FileTiming]:
+        """
+        :param count: number of directories, all if not given
+        :return: directories with the longest total time of checking the files directly in them, by all checkers
+        """
+        durations: Dict[str, float] = {}
+        for timing in self.get_slowest_files():
+            directory = Path(timing.file).parent.as_posix()
+            durations[directory] = durations.get(directory, 0.0) + timing.duration
+        timings = [FileTiming("", directory, duration) for directory, duration in durations.items()]
+        return sorted(timings, key=lambda timing: (-timing.duration, timing.file))[:count]
+
+    def get_data(self) -> Dict[str, Any]:
+        """
+        All collected timings, in seconds.
+        """
+        end_children_cpu = get_children_cpu_time()
+        children_cpu = (
+            end_children_cpu - self._start_children_cpu
+            if end_children_cpu is not None and self._start_children_cpu is not None
+            else None
+        )
+        with self._lock:
+            files = {checker: dict(sorted(files.items())) for checker, files in self._files.items()}
+        return {
+            "time": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "duration": round(time.perf_counter() - self._start, 6),
+            "children_cpu": _round(children_cpu),
+            "checkers": {
+                timing.checker: {
+                    "duration": round(timing.duration, 6),
+                    "children_cpu": _round(timing.children_cpu),
+                    "files": timing.files,
+                    "files_duration": round(timing.files_duration, 6),
+                }
+                for timing in self.get_checker_timings()
+            },
+            "files": {
+                checker: {file: round(duration, 6) for file, duration in checker_files.items()}
+                for checker, checker_files in files.items()
+            },
+        }
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return round(value, 6) if value is not None else None
@@ -0,0 +1,226 @@
+"""Watch a directory tree for changed files"""
+
+import abc
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import Dict, FrozenSet, Iterator, NamedTuple, Optional, Set, Tuple
+
+from pwrforge.logger import get_logger
+from pwrforge.utils.file_utils import ExcludeMatcher, walk_files
+
+logger = get_logger()
+
+# Changes are collected until no event comes for this many seconds, so saving several files is one change
+WATCH_DEBOUNCE = 0.2
+POLLING_INTERVAL = 0.5
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+INOTIFY_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+INOTIFY_STRUCTURE_EVENTS = IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+INOTIFY_EVENT = struct.Struct("iIII")
+
+
+class FileChanges(NamedTuple):
+    # Absolute paths of modified, created and removed files
+    paths: FrozenSet[Path]
+    # Files or directories were created, removed or renamed
+    structure_changed: bool
+
+
+class FileWatcher(abc.ABC):
+    """
+    Reports files changed under a directory, skipping excluded paths.
+    """
+
+    def __init__(self, root: Path, exclude: Optional[ExcludeMatcher] = None) -> None:
+        self._root = root.absolute()
+        self._exclude = exclude
+
+    @abc.abstractmethod
+    def read_changes(self, timeout: Optional[float] = None) -> Optional[FileChanges]:
+        """
+        Wait for changes.
+
+        :param timeout: seconds to wait, wait until something changes if None
+        :return: changes, None if nothing changed before the timeout
+        """
+
+    def watch(self, debounce: float = WATCH_DEBOUNCE) -> Iterator[FileChanges]:
+        """
+        Yield changes, each after no further change came for `debounce` seconds.
+        """
+        while True:
+            changes = self.read_changes()
+            if changes is None:
+                continue
+            paths = set(changes.paths)
+            structure_changed = changes.structure_changed
+            while True:
+                more_changes = self.read_changes(debounce)
+                if more_changes is None:
+                    break
+                paths |= more_changes.paths
+                structure_changed = structure_changed or more_changes.structure_changed
+            yield FileChanges(frozenset(paths), structure_changed)
+
+    def list_files(self, dir_path: Path) -> Set[Path]:
+        return set(walk_files(dir_path, self._exclude, log_skipped=False))
+
+    def close(self) -> None:
+        pass
+
+
+class PollingWatcher(FileWatcher):
+    """
+    Compares modification times and sizes of all files every `interval` seconds.
+    """
+
+    def __init__(
+        self, root: Path, exclude: Optional[ExcludeMatcher] = None, interval: float = POLLING_INTERVAL
+    ) -> None:
+        super().__init__(root, exclude)
+        self._interval = interval
+        self._snapshot = self._take_snapshot()
+
+    def _take_snapshot(self) -> Dict[Path, Tuple[int, int]]:
+        snapshot = {}
+        for file_path in self.list_files(self._root):
+            try:
+                stat = file_path.stat()
+            except OSError:
+                continue
+            snapshot[file_path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def read_changes(self, timeout: Optional[float] = None) -> Optional[FileChanges]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            delay = self._interval if deadline is None else min(self._interval, deadline - time.monotonic())
+            time.sleep(max(delay, 0))
+            snapshot = self._take_snapshot()
+            previous, self._snapshot = self._snapshot, snapshot
+            paths = {file_path for file_path, state in snapshot.items() if previous.get(file_path) != state}
+            removed = previous.keys() - snapshot.keys()
+            if paths or removed:
+                added = snapshot.keys() - previous.keys()
+                return FileChanges(frozenset(paths | removed), bool(added or removed))
+            if deadline is not None and time.monotonic() >= deadline:
+                return None
+
+
+def _load_libc() -> ctypes.CDLL:
+    libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+    try:
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+    except AttributeError as e:
+        raise OSError("inotify is not supported by the C library") from e
+    return libc
+
+
+class InotifyWatcher(FileWatcher):
+    """
+    Linux inotify watches on every directory of the tree, new directories are watched as they appear.
+    """
+
+    def __init__(self, root: Path, exclude: Optional[ExcludeMatcher] = None) -> None:
+        super().__init__(root, exclude)
+        self._libc = _load_libc()
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        self._watches: Dict[int, Path] = {}
+        self._add_tree(self._root)
+
+    def _add_tree(self, dir_path: Path) -> None:
+        for current_dir, dir_names, _ in os.walk(dir_path):
+            dir_names[:] = [
+                name for name in dir_names if not (self._exclude and self._exclude.match(Path(current_dir, name)))
+            ]
+            watch_descriptor = self._libc.inotify_add_watch(self._fd, os.fsencode(current_dir), INOTIFY_MASK)
+            if watch_descriptor < 0:
+                logger.debug("Unable to watch %s: %s", current_dir, os.strerror(ctypes.get_errno()))
+                continue
+            self._watches[watch_descriptor] = Path(current_dir)
+
+    def read_changes(self, timeout: Optional[float] = None) -> Optional[FileChanges]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = None if deadline is None else max(deadline - time.monotonic(), 0)
+            ready, _, _ = select.select([self._fd], [], [], remaining)
+            if not ready:
+                return None
+            changes = self._read_events()
+            if changes.paths or changes.structure_changed:
+                return changes
+
+    def _read_events(self) -> FileChanges:
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            data = b""
+        paths: Set[Path] = set()
+        structure_changed = False
+        offset = 0
+        while offset < len(data):
+            watch_descriptor, mask, _, name_length = INOTIFY_EVENT.unpack_from(data, offset)
+            name = data[offset + INOTIFY_EVENT.size : offset + INOTIFY_EVENT.size + name_length].rstrip(b"\0")
+            offset += INOTIFY_EVENT.size + name_length
+
+            if mask & IN_Q_OVERFLOW:
+                logger.warning("Too many file system events, checking all files")
+                paths |= self.list_files(self._root)
+                structure_changed = True
+                continue
+            dir_path = self._watches.get(watch_descriptor)
+            if dir_path is None:
+                continue
+            if mask & IN_IGNORED:
+                del self._watches[watch_descriptor]
+                continue
+            path = dir_path / os.fsdecode(name)
+            if self._exclude and self._exclude.match(path):
+                continue
+            if mask & INOTIFY_STRUCTURE_EVENTS:
+                structure_changed = True
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    # Files may be written before the watch is added
+                    self._add_tree(path)
+                    paths |= self.list_files(path)
+                continue
+            paths.add(path)
+        return FileChanges(frozenset(paths), structure_changed)
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+
+def create_watcher(root: Path, exclude: Optional[ExcludeMatcher] = None, polling: bool = False) -> FileWatcher:
+    """
+    Watch files with inotify where it is available, otherwise poll them.
+
+    :param root: directory to watch
+    :param exclude: paths to skip
+    :param polling: poll even if inotify is available
+    """
+    if not polling and sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(root, exclude)
+        except OSError as e:
+            logger.info("Unable to use inotify (%s), polling for changes", e)
+    return PollingWatcher(root, exclude)
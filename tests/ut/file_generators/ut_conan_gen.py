@@ -0,0 +1,27 @@
+from pathlib import Path
+
+import pytest
+
+from pwrforge.file_generators.conan_gen import generate_conanprofile
+from tests.ut.utils import get_test_project_config
+
+COMPILER_LAUNCHER_CONF = (
+    'tools.cmake.cmaketoolchain:extra_variables={"CMAKE_C_COMPILER_LAUNCHER": "ccache", '
+    '"CMAKE_CXX_COMPILER_LAUNCHER": "ccache"}'
+)
+
+
+@pytest.mark.parametrize("cache_enabled", [True, False])
+def test_generate_conanprofile_compiler_launcher(cache_enabled: bool, tmp_path: Path) -> None:
+    config = get_test_project_config("multitarget")
+    config.project_root = tmp_path
+    config.project.cache.enabled = cache_enabled
+
+    generate_conanprofile(config)
+
+    for target in config.project.target:
+        if target.id == "esp32":
+            # ESP-IDF toolchain replaces the conan one, the launcher is set in CMakeLists.txt
+            continue
+        profile = Path(tmp_path, "config/conan/profiles", target.get_conan_profile_name("Debug")).read_text()
+        assert (COMPILER_LAUNCHER_CONF in profile) == cache_enabled
@@ -1,10 +1,11 @@
 from pathlib import Path
-from unittest.mock import MagicMock, mock_open
+from typing import List
+from unittest.mock import MagicMock
 
 import pytest
 from pytest_mock import MockerFixture
 
-from pwrforge.commands.check import CheckerFixer, find_files
+from pwrforge.commands.check_base import CheckerFixer, find_files
 
 
 @pytest.fixture
@@ -16,11 +17,13 @@ def mock_find_files(mocker: MockerFixture) -> MagicMock:
 
 
 @pytest.fixture
-def mock_file_contents(request: pytest.FixtureRequest, mocker: MockerFixture) -> MagicMock:
-    return mocker.patch(  # type: ignore[no-any-return]
-        f"{CheckerFixer.__module__}.open",
-        mock_open(read_data="\n".join(request.param)),
-    )
+def mock_source_files(request: pytest.FixtureRequest, mocker: MockerFixture) -> List[Path]:
+    """
+    Make checkers find `request.param` source files, the files are not created.
+    """
+    file_paths = [Path(f"src/{index}.cpp") for index in range(request.param)]
+    mocker.patch(f"{CheckerFixer.__module__}.{find_files.__name__}", return_value=file_paths)
+    return file_paths
 
 
 @pytest.fixture
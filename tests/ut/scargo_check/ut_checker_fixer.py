@@ -1,13 +1,33 @@
+import io
+import json
+import threading
+import time
 from pathlib import Path
-from typing import List, NamedTuple, Tuple, Type
+from typing import List, NamedTuple, Optional, Tuple, Type
 from unittest.mock import MagicMock
 
 import pytest
+from pytest_mock import MockerFixture
 
-from pwrforge.commands.check import CheckerFixer, CheckResult
-from pwrforge.config import CheckConfig, Config
+from pwrforge.commands.check import PragmaChecker, TodoChecker
+from pwrforge.commands.check_base import (
+    CheckerFixer,
+    CheckResult,
+    JobBudget,
+    find_files,
+    get_check_cache,
+)
+from pwrforge.commands.check_scheduler import CheckScheduler, watch_and_check
+from pwrforge.config import CheckConfig, ChecksConfig, Config, ConfigError
+from pwrforge.logger import get_logger
+from pwrforge.utils.file_utils import FileIndex, SourceCorpus, SourceFile
+from pwrforge.utils.report_utils import JsonLinesReporter
+from pwrforge.utils.timing_utils import CheckTimings
+from pwrforge.utils.watch_utils import FileChanges, FileWatcher
 from tests.ut.utils import get_log_data
 
+logger = get_logger()
+
 
 class CheckerClassParams(NamedTuple):
     name: str
@@ -81,6 +101,8 @@ class TestCheckerFixer:
         config: Config,
         mock_find_files: MagicMock,
     ) -> None:
+        Path("foo").mkdir()
+        Path("foo/bar.hpp").write_text("#pragma once\n")
         checker_class(config, fix_errors=fix_errors).check()
         assert get_log_data(caplog.records) == expected_log
 
@@ -107,3 +129,319 @@ class TestCheckerFixer:
             ("ERROR", "failing check fail!"),
         ]
         assert get_log_data(caplog.records) == expected
+
+
+class CheckerWithPerFileResult(CheckerFixer):
+    check_name = "per-file"
+
+    def check_file(self, file_path: Path) -> CheckResult:
+        problems = int(file_path.stem) % 3 == 0
+        if problems:
+            logger.warning("Problem in %s", file_path)
+        return CheckResult(int(problems))
+
+    def get_check_config(self) -> CheckConfig:
+        return CheckConfig()
+
+
+@pytest.mark.parametrize("mock_source_files", [50], indirect=True)
+@pytest.mark.parametrize("jobs", [2, 8])
+@pytest.mark.usefixtures("mock_source_files")
+def test_parallel_check_matches_serial(
+    jobs: int,
+    caplog: pytest.LogCaptureFixture,
+    config: Config,
+) -> None:
+    serial_result = CheckerWithPerFileResult(config).check()
+    serial_log = get_log_data(caplog.records)
+    caplog.clear()
+
+    parallel_result = CheckerWithPerFileResult(config, jobs=jobs).check()
+
+    assert parallel_result == serial_result == 17
+    assert get_log_data(caplog.records) == serial_log
+
+
+class ConcurrencyTrackingChecker(CheckerWithPerFileResult):
+    lock = threading.Lock()
+    running = 0
+    max_running = 0
+
+    def check_file(self, file_path: Path) -> CheckResult:
+        cls = ConcurrencyTrackingChecker
+        with cls.lock:
+            cls.running += 1
+            cls.max_running = max(cls.max_running, cls.running)
+        time.sleep(0.001)
+        with cls.lock:
+            cls.running -= 1
+        return super().check_file(file_path)
+
+
+class OtherConcurrencyTrackingChecker(ConcurrencyTrackingChecker):
+    check_name = "other"
+
+
+@pytest.mark.parametrize("mock_source_files", [30], indirect=True)
+@pytest.mark.usefixtures("mock_source_files")
+def test_scheduler_groups_output_and_shares_jobs(
+    caplog: pytest.LogCaptureFixture,
+    config: Config,
+) -> None:
+    serial_log = []
+    for checker_class in (ConcurrencyTrackingChecker, OtherConcurrencyTrackingChecker):
+        checker_class(config).check()
+        serial_log += get_log_data(caplog.records)
+        caplog.clear()
+    job_budget = JobBudget(3)
+    checkers = [
+        ConcurrencyTrackingChecker(config, jobs=3, job_budget=job_budget),
+        OtherConcurrencyTrackingChecker(config, jobs=3, job_budget=job_budget),
+    ]
+    ConcurrencyTrackingChecker.max_running = 0
+
+    scheduler = CheckScheduler(checkers, jobs=3)
+
+    assert scheduler.run() == [("per-file", 10), ("other", 10)]
+    assert get_log_data(caplog.records) == serial_log
+    assert ConcurrencyTrackingChecker.max_running <= 3
+    assert sorted(scheduler.durations) == ["other", "per-file"]
+
+
+def test_scheduler_starts_longest_checkers_first(config: Config) -> None:
+    checkers = [PragmaChecker(config), TodoChecker(config), CheckerWithPerFileResult(config)]
+
+    scheduler = CheckScheduler(checkers, jobs=2, timings={"pragma": 0.5, "todo": 3.0})
+
+    assert [checker.check_name for checker in scheduler.get_start_order()] == ["per-file", "todo", "pragma"]
+
+
+def test_job_budget_whole_project_share() -> None:
+    job_budget = JobBudget(8)
+
+    with job_budget.hold(8, whole_project=True) as whole_project_jobs:
+        with job_budget.hold(4) as file_jobs:
+            assert (whole_project_jobs, file_jobs) == (4, 4)
+
+
+class SlowChecker(CheckerWithPerFileResult):
+    check_name = "slow"
+    checked = 0
+
+    def check_file(self, file_path: Path) -> CheckResult:
+        SlowChecker.checked += 1
+        time.sleep(0.01)
+        return CheckResult(0)
+
+
+class PassingChecker(CheckerWithPerFileResult):
+    check_name = "passing"
+
+    def check_file(self, file_path: Path) -> CheckResult:
+        return CheckResult(0)
+
+
+@pytest.mark.parametrize("mock_source_files", [100], indirect=True)
+@pytest.mark.usefixtures("mock_source_files")
+def test_scheduler_stops_at_first_failing_tier(
+    caplog: pytest.LogCaptureFixture,
+    config: Config,
+) -> None:
+    cancel_event = threading.Event()
+    job_budget = JobBudget(2)
+    checkers = [
+        checker_class(config, jobs=2, job_budget=job_budget, cancel_event=cancel_event)
+        for checker_class in (PassingChecker, SlowChecker, CheckerWithPerFileResult, TodoChecker)
+    ]
+    SlowChecker.checked = 0
+    scheduler = CheckScheduler(checkers, jobs=2, timings={"slow": 1.0, "per-file": 0.1}, cancel_event=cancel_event)
+
+    problem_counts = scheduler.run_tiers([["passing"], ["slow", "per-file"]])
+
+    assert problem_counts == [("passing", 0), ("per-file", 34)]
+    assert SlowChecker.checked < 100
+    log_data = get_log_data(caplog.records)
+    assert ("INFO", "slow check cancelled") in log_data
+    assert ("INFO", "Stopped after the first failing tier, not checked: slow, todo") in log_data
+
+
+def test_scheduler_tiers(config: Config) -> None:
+    checkers = [PragmaChecker(config), TodoChecker(config), CheckerWithPerFileResult(config)]
+
+    tiers = CheckScheduler(checkers, jobs=1).get_tiers([["todo", "pragma"], ["clang-format"]])
+
+    assert [[checker.check_name for checker in tier] for tier in tiers] == [["pragma", "todo"], ["per-file"]]
+
+
+def test_check_tiers_reject_unknown_checks(config: Config) -> None:
+    check_config = config.check.dict(by_alias=True)
+
+    with pytest.raises(ConfigError, match="Unknown check 'lint' in check tiers"):
+        ChecksConfig.parse_obj({**check_config, "tiers": [["pragma"], ["lint"]]})
+
+
+class CacheableChecker(CheckerWithPerFileResult):
+    check_name = "cacheable"
+    cacheable = True
+
+
+@pytest.mark.parametrize("mock_source_files", [4], indirect=True)
+def test_cached_results_are_replayed(
+    caplog: pytest.LogCaptureFixture,
+    config: Config,
+    mocker: MockerFixture,
+    mock_source_files: List[Path],
+) -> None:
+    file_paths = mock_source_files
+    for file_path in file_paths:
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        file_path.write_text(f"int x{file_path.stem};")
+    cache = get_check_cache(config)
+
+    first_result = CacheableChecker(config, cache=cache).check()
+    first_log = get_log_data(caplog.records)
+    caplog.clear()
+
+    check_file_spy = mocker.spy(CacheableChecker, "check_file")
+    second_result = CacheableChecker(config, cache=cache).check()
+
+    assert first_result == second_result == 2
+    assert get_log_data(caplog.records) == first_log
+    assert check_file_spy.call_count == 0
+
+    file_paths[1].write_text("int changed;")
+    CacheableChecker(config, cache=cache).check()
+    assert check_file_spy.call_count == 1
+
+
+@pytest.mark.parametrize("mock_source_files", [3], indirect=True)
+def test_corpus_reads_each_file_once(config: Config, mocker: MockerFixture, mock_source_files: List[Path]) -> None:
+    file_paths = mock_source_files
+    for file_path in file_paths:
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        file_path.write_text("#pragma once\n// TODO: remove\n")
+    mocker.patch(f"{TodoChecker.__module__}.get_comment_lines", side_effect=AssertionError)
+    corpus = SourceCorpus(comment_lines_reader=lambda _, content: [(2, "// TODO: remove")])
+    source_file_mock = mocker.patch(f"{SourceCorpus.__module__}.SourceFile", wraps=SourceFile)
+
+    checker = TodoChecker(config, cache=get_check_cache(config), corpus=corpus)
+    corpus.register(checker.get_files())
+
+    assert checker.check() == 3
+    # One read serves both the cache key and the comments of a file
+    assert source_file_mock.call_count == len(file_paths)
+    assert len(corpus) == 0
+
+
+@pytest.mark.parametrize("mock_source_files", [6], indirect=True)
+def test_only_changed_files_are_checked(config: Config, mocker: MockerFixture, mock_source_files: List[Path]) -> None:
+    file_paths = mock_source_files
+    check_file_spy = mocker.spy(CheckerWithPerFileResult, "check_file")
+
+    changed_files = {file_paths[0].resolve(), file_paths[1].resolve()}
+    result = CheckerWithPerFileResult(config, changed_files=changed_files).check()
+
+    assert result == 1
+    assert [call.args[1] for call in check_file_spy.call_args_list] == file_paths[:2]
+
+
+def test_findings_are_reported_also_from_cache(config: Config, mocker: MockerFixture) -> None:
+    file_paths = [Path("src/a.h"), Path("src/b.h")]
+    file_paths[0].parent.mkdir(parents=True, exist_ok=True)
+    file_paths[0].write_text("#pragma once\n")
+    file_paths[1].write_text("int x;\n")
+    mocker.patch(f"{CheckerFixer.__module__}.{find_files.__name__}", return_value=file_paths)
+    cache = get_check_cache(config)
+
+    reports = []
+    for _ in range(2):
+        stream = io.StringIO()
+        PragmaChecker(config, cache=cache, reporter=JsonLinesReporter(stream, Path.cwd())).check()
+        reports.append([json.loads(line) for line in stream.getvalue().splitlines()])
+
+    for report in reports:
+        finding, check = report
+        assert (finding["type"], finding["checker"], finding["file"], finding["line"], finding["rule"]) == (
+            "finding",
+            "pragma",
+            "src/b.h",
+            1,
+            "pragma-once",
+        )
+        assert (check["type"], check["problems"]) == ("check", 1)
+
+
+@pytest.mark.parametrize("mock_source_files", [4], indirect=True)
+def test_checked_files_are_timed(config: Config, mock_source_files: List[Path]) -> None:
+    file_paths = mock_source_files
+    check_timings = CheckTimings(Path.cwd())
+
+    CheckerWithPerFileResult(config, jobs=2, check_timings=check_timings).check()
+
+    (checker_timing,) = check_timings.get_checker_timings()
+    assert (checker_timing.checker, checker_timing.files) == ("per-file", 4)
+    assert sorted(timing.file for timing in check_timings.get_slowest_files()) == [
+        file_path.as_posix() for file_path in file_paths
+    ]
+
+
+class FakeWatcher(FileWatcher):
+    def __init__(self, changes: List[FileChanges]) -> None:
+        super().__init__(Path("src"))
+        self._changes = changes
+        self.closed = False
+
+    def read_changes(self, timeout: Optional[float] = None) -> Optional[FileChanges]:
+        if timeout is not None:
+            return None
+        if not self._changes:
+            raise KeyboardInterrupt
+        return self._changes.pop(0)
+
+    def close(self) -> None:
+        self.closed = True
+
+
+def test_config_file_lookup_is_refreshed_when_files_change(config: Config) -> None:
+    Path("src/module").mkdir(parents=True)
+    checker = TodoChecker(config)
+    style_file_names = (".clang-format",)
+
+    assert checker.find_config_file(Path("src/module").absolute(), style_file_names) is None
+    Path("src/.clang-format").touch()
+    assert checker.find_config_file(Path("src/module").absolute(), style_file_names) is None
+
+    checker.set_changed_files({Path("src/.clang-format").absolute()})
+    assert (
+        checker.find_config_file(Path("src/module").absolute(), style_file_names)
+        == Path("src/.clang-format").absolute()
+    )
+
+
+def test_watch_checks_changed_files_with_affected_checkers(
+    config: Config, mocker: MockerFixture, caplog: pytest.LogCaptureFixture
+) -> None:
+    source_dir = Path("src").resolve()
+    source_dir.mkdir()
+    Path(source_dir, "main.cpp").write_text("int main() { return 0; }\n")
+    Path(source_dir, "main.h").write_text("int x;\n")
+    file_index = FileIndex(base_dir=Path.cwd())
+    checkers = [PragmaChecker(config, file_index=file_index), TodoChecker(config, file_index=file_index)]
+    pragma_check = mocker.spy(PragmaChecker, "check_file")
+    todo_check = mocker.spy(TodoChecker, "check_file")
+    watcher = FakeWatcher(
+        [
+            FileChanges(frozenset({source_dir / "main.cpp"}), False),
+            FileChanges(frozenset({source_dir / "removed.h"}), True),
+            FileChanges(frozenset({source_dir / "main.h"}), False),
+        ]
+    )
+
+    watch_and_check(config, checkers, file_index=file_index, watcher=watcher)
+
+    assert [call.args[1].name for call in pragma_check.call_args_list] == ["main.h"]
+    assert [call.args[1].name for call in todo_check.call_args_list] == ["main.cpp", "main.h"]
+    assert ("INFO", "1 files changed, running todo") in get_log_data(caplog.records)
+    assert ("INFO", "1 files changed, running pragma, todo") in get_log_data(caplog.records)
+    assert ("INFO", "Stopped watching") in get_log_data(caplog.records)
+    assert watcher.closed
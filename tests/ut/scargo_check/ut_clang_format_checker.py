@@ -1,10 +1,13 @@
+from pathlib import Path
 from typing import Tuple
 from unittest.mock import MagicMock
 
 import pytest
+from pytest_mock import MockerFixture
 from pytest_subprocess import FakeProcess
 
 from pwrforge.commands.check import ClangFormatChecker
+from pwrforge.commands.check_base import find_files
 from pwrforge.config import Config
 from tests.ut.utils import get_log_data
 
@@ -60,3 +63,87 @@ def test_check_clang_format_fix(config: Config, mock_find_files: MagicMock, fake
     result = ClangFormatChecker(config, fix_errors=True).check()
     assert result == 1
     assert fake_process.call_count(CLANG_FORMAT_FIX_COMMAND) == 1
+
+
+BATCH_FILES = [Path("src/a.cpp"), Path("src/b.cpp"), Path("src/c.cpp")]
+CLANG_FORMAT_BATCH_COMMAND = CLANG_FORMAT_COMMAND[:-1] + [str(file_path) for file_path in BATCH_FILES]
+CLANG_FORMAT_BATCH_OUTPUT = [
+    "src/a.cpp:1:4: error: code should be clang-formatted [-Wclang-format-violations]",
+    "int  main( ){return 0;}",
+    "   ^",
+    "src/c.cpp:1:4: error: code should be clang-formatted [-Wclang-format-violations]",
+    "int   c ;",
+    "   ^",
+]
+
+
+@pytest.fixture
+def mock_find_batch_files(mocker: MockerFixture) -> MagicMock:
+    return mocker.patch(f"{find_files.__module__}.{find_files.__name__}", return_value=BATCH_FILES)
+
+
+def test_check_clang_format_batch(
+    caplog: pytest.LogCaptureFixture,
+    config: Config,
+    mock_find_batch_files: MagicMock,
+    fake_process: FakeProcess,
+) -> None:
+    fake_process.register(CLANG_FORMAT_BATCH_COMMAND, stderr=CLANG_FORMAT_BATCH_OUTPUT, returncode=1)
+    result = ClangFormatChecker(config).check()
+    assert result == 2
+    assert fake_process.call_count(CLANG_FORMAT_BATCH_COMMAND) == 1
+    warnings = [msg for level, msg in get_log_data(caplog.records) if level == "WARNING"]
+    assert warnings == [
+        "clang-format found error in file src/a.cpp",
+        "clang-format found error in file src/c.cpp",
+    ]
+
+
+def test_check_clang_format_batch_verbose_output_per_file(
+    caplog: pytest.LogCaptureFixture,
+    config: Config,
+    mock_find_batch_files: MagicMock,
+    fake_process: FakeProcess,
+) -> None:
+    fake_process.register(CLANG_FORMAT_BATCH_COMMAND, stderr=CLANG_FORMAT_BATCH_OUTPUT, returncode=1)
+    ClangFormatChecker(config, verbose=True).check()
+    log_data = get_log_data(caplog.records)
+    assert ("INFO", "\n".join(CLANG_FORMAT_BATCH_OUTPUT[:3])) in log_data
+    assert ("INFO", "\n".join(CLANG_FORMAT_BATCH_OUTPUT[3:])) in log_data
+
+
+def test_check_clang_format_batch_falls_back_to_single_files(
+    config: Config,
+    mock_find_batch_files: MagicMock,
+    fake_process: FakeProcess,
+) -> None:
+    fake_process.register(CLANG_FORMAT_BATCH_COMMAND, stderr="clang-format crashed", returncode=1)
+    for file_path in BATCH_FILES:
+        fake_process.register(CLANG_FORMAT_COMMAND[:-1] + [str(file_path)], returncode=int(file_path == BATCH_FILES[1]))
+    result = ClangFormatChecker(config).check()
+    assert result == 1
+
+
+def test_check_clang_format_batch_fix(
+    config: Config,
+    mock_find_batch_files: MagicMock,
+    fake_process: FakeProcess,
+) -> None:
+    fake_process.register(CLANG_FORMAT_BATCH_COMMAND, stderr=CLANG_FORMAT_BATCH_OUTPUT, returncode=1)
+    fix_command = CLANG_FORMAT_FIX_COMMAND[:-1] + ["src/a.cpp", "src/c.cpp"]
+    fake_process.register(fix_command)
+    ClangFormatChecker(config, fix_errors=True).check()
+    assert fake_process.call_count(fix_command) == 1
+
+
+def test_check_clang_format_batch_chunks_per_job(
+    config: Config,
+    mock_find_batch_files: MagicMock,
+    fake_process: FakeProcess,
+) -> None:
+    for file_path in BATCH_FILES:
+        fake_process.register(CLANG_FORMAT_COMMAND[:-1] + [str(file_path)])
+    result = ClangFormatChecker(config, jobs=3).check()
+    assert result == 0
+    for file_path in BATCH_FILES:
+        assert fake_process.call_count(CLANG_FORMAT_COMMAND[:-1] + [str(file_path)]) == 1
@@ -1,21 +1,39 @@
+import io
+import json
 from pathlib import Path
-from typing import Tuple
+from typing import Callable, Dict, List, Tuple
 from unittest.mock import MagicMock
 
 import pytest
+import yaml
+from pytest_mock import MockerFixture
 from pytest_subprocess import FakeProcess
+from pytest_subprocess.fake_popen import FakePopen
 
-from pwrforge.commands.check import ClangTidyChecker
+from pwrforge.commands.check_base import get_check_cache
+from pwrforge.commands.check_clang_tidy import ClangTidyChecker
 from pwrforge.config import Config
 from pwrforge.utils.conan_utils import DEFAULT_PROFILES
+from pwrforge.utils.report_utils import JsonLinesReporter
 from tests.ut.utils import get_log_data
 
-CLANG_TIDY_COMMAND = ["clang-tidy", "foo/bar.hpp"]
+# The fake filesystem starts in "/", so this is the absolute path of src/bar.cpp in the test project
+TRANSLATION_UNIT = Path("/src/bar.cpp")
+CLANG_TIDY_COMMAND = ["clang-tidy", str(TRANSLATION_UNIT)]
 
 CLANG_TIDY_NORMAL_OUTPUT = "everything is tidy!"
 CLANG_TIDY_ERROR_OUTPUT = "error: something is not tidy!"
 
 
+def create_compilation_db(build_path: Path, files: List[Path]) -> None:
+    build_path.mkdir(parents=True, exist_ok=True)
+    entries = [
+        {"directory": str(Path().absolute()), "file": str(file_path), "command": f"g++ -c {file_path}"}
+        for file_path in files
+    ]
+    Path(build_path, "compile_commands.json").write_text(json.dumps(entries))
+
+
 @pytest.mark.parametrize("profile", DEFAULT_PROFILES)
 def test_check_clang_tidy_pass(
     profile: str,
@@ -25,9 +43,7 @@ def test_check_clang_tidy_pass(
     fake_process: FakeProcess,
 ) -> None:
     build_path = Path("build/x86", profile)
-    build_path.mkdir(parents=True)
-    compilation_db_path = Path(build_path, "compile_commands.json")
-    compilation_db_path.touch(exist_ok=True)
+    create_compilation_db(build_path, [TRANSLATION_UNIT])
 
     fake_process.register(CLANG_TIDY_COMMAND + ["-p", build_path], stdout=CLANG_TIDY_NORMAL_OUTPUT)
     result = ClangTidyChecker(config).check()
@@ -38,7 +54,7 @@ def test_check_clang_tidy_pass(
 @pytest.mark.parametrize(
     ["verbose", "expected_message"],
     [
-        (False, ("WARNING", "clang-tidy found error in file foo/bar.hpp")),
+        (False, ("WARNING", f"clang-tidy found error in file {TRANSLATION_UNIT}")),
         (True, ("INFO", CLANG_TIDY_ERROR_OUTPUT)),
     ],
 )
@@ -51,9 +67,7 @@ def test_check_clang_tidy_fail(
     fake_process: FakeProcess,
 ) -> None:
     build_path = Path("build/x86/Debug")
-    build_path.mkdir(parents=True)
-    compilation_db_path = Path(build_path, "compile_commands.json")
-    compilation_db_path.touch(exist_ok=True)
+    create_compilation_db(build_path, [TRANSLATION_UNIT])
     fake_process.register(
         CLANG_TIDY_COMMAND + ["-p", build_path],
         stdout=CLANG_TIDY_ERROR_OUTPUT,
@@ -64,6 +78,36 @@ def test_check_clang_tidy_fail(
     assert expected_message in get_log_data(caplog.records)
 
 
+def test_check_clang_tidy_translation_units_from_compilation_db(
+    caplog: pytest.LogCaptureFixture,
+    config: Config,
+    fake_process: FakeProcess,
+) -> None:
+    build_path = Path("build/x86/Debug")
+    translation_units = [Path("src/a.cpp"), Path("src/b.cpp"), Path("src/a.cpp"), Path("third_party/c.cpp")]
+    create_compilation_db(build_path, translation_units)
+    header_diagnostic = [
+        f"{Path('src/lib.h').absolute()}:3:1: error: header is not tidy [modernize-use-using]",
+        "typedef int foo;",
+        "^",
+    ]
+    for file_path in translation_units[:2]:
+        fake_process.register(
+            ["clang-tidy", str(file_path.absolute()), "-p", build_path],
+            stdout=header_diagnostic,
+            stderr="1 warning generated.",
+            returncode=1,
+        )
+
+    result = ClangTidyChecker(config, verbose=False, jobs=2).check()
+
+    assert result == 1
+    warnings = [msg for level, msg in get_log_data(caplog.records) if level == "WARNING"]
+    assert warnings == [f"clang-tidy found error in file {Path('src/lib.h').absolute()}"]
+    for file_path in translation_units[:2]:
+        assert fake_process.call_count(["clang-tidy", str(file_path.absolute()), "-p", build_path]) == 1
+
+
 @pytest.mark.parametrize(
     "build_path_str",
     ["build1", "build/InvalidBuildType", "build/Debug"],
@@ -85,3 +129,200 @@ def test_check_clang_tidy_fail_wrong_dirs(
     )
     with pytest.raises(SystemExit):
         ClangTidyChecker(config).check()
+
+
+def test_esp32_context_prepared_once_and_cached_on_disk(
+    config: Config,
+    fake_process: FakeProcess,
+    mocker: MockerFixture,
+) -> None:
+    config.project.target_id = "esp32"
+    build_path = Path("build/esp32/Debug")
+    build_path.mkdir(parents=True)
+    Path(build_path, "compile_commands.json").write_text('[{"command": "gcc -mlongcalls -c main.c"}]')
+    gcc_path = Path("/opt/xtensa/bin/xtensa-esp32-elf-gcc")
+    gcc_path.parent.mkdir(parents=True)
+    gcc_path.touch()
+    gcc_include = Path("/opt/xtensa/lib/gcc/include")
+    gcc_include.mkdir(parents=True)
+    mocker.patch(f"{ClangTidyChecker.__module__}.shutil.which", return_value=str(gcc_path))
+    gcc_commands = [
+        [str(gcc_path), "-print-file-name=include"],
+        [str(gcc_path), "-print-file-name=include-fixed"],
+        [str(gcc_path), "--print-sysroot"],
+    ]
+    fake_process.register(gcc_commands[0], stdout=str(gcc_include))
+    fake_process.register(gcc_commands[1], stdout="")
+    fake_process.register(gcc_commands[2], stdout="")
+
+    for _ in range(2):
+        checker = ClangTidyChecker(config)
+        checker.prepare()
+        assert checker.esp32_context is not None
+        assert checker.esp32_context.include_dirs == [gcc_include]
+
+    for gcc_command in gcc_commands:
+        assert fake_process.call_count(gcc_command) == 1
+    stripped_db = Path(build_path, "compilation_db_for_check", "compile_commands.json").read_text()
+    assert "-mlongcalls" not in stripped_db
+
+
+def test_check_clang_tidy_translation_unit_cache(
+    config: Config,
+    fake_process: FakeProcess,
+) -> None:
+    build_path = Path("build/x86/Debug")
+    build_path.mkdir(parents=True)
+    Path(build_path, "compile_commands.json").write_text(
+        json.dumps([{"directory": "/", "file": "src/a.cpp", "command": "g++ -Iinc -MD -c src/a.cpp -o a.o"}])
+    )
+    preprocess_command = ["g++", "-Iinc", "src/a.cpp", "-E"]
+    clang_tidy_command = ["clang-tidy", "/src/a.cpp", "-p", build_path]
+    fake_process.keep_last_process(True)
+    fake_process.register(["clang-tidy", "--version"], stdout="LLVM version 17.0.6")
+    fake_process.register(preprocess_command, stdout="int a;")
+    fake_process.register(clang_tidy_command, stdout=CLANG_TIDY_NORMAL_OUTPUT)
+    cache = get_check_cache(config)
+
+    assert ClangTidyChecker(config, cache=cache).check() == 0
+    assert ClangTidyChecker(config, cache=cache).check() == 0
+    assert fake_process.call_count(preprocess_command) == 2
+    assert fake_process.call_count(clang_tidy_command) == 1
+
+
+def test_check_clang_tidy_only_translation_units_affected_by_changes(
+    config: Config,
+    fake_process: FakeProcess,
+) -> None:
+    build_path = Path("build/x86/Debug")
+    build_path.mkdir(parents=True)
+    sources = {name: Path("src", name) for name in ("a.cpp", "b.cpp", "c.cpp", "d.cpp")}
+    for file_path in [*sources.values(), Path("src/lib.h")]:
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        file_path.write_text("")
+    directory = str(Path().absolute())
+    entries = [
+        {"directory": directory, "file": "src/a.cpp", "command": "g++ -MD -MF build/a.d -c src/a.cpp"},
+        {"directory": directory, "file": "src/b.cpp", "command": "g++ -c src/b.cpp"},
+        {"directory": directory, "file": "src/c.cpp", "command": "g++ -c src/c.cpp"},
+        {"directory": directory, "file": "src/d.cpp", "command": "g++ -c src/d.cpp"},
+    ]
+    Path(build_path, "compile_commands.json").write_text(json.dumps(entries))
+    Path("build/a.d").write_text("build/a.o: src/a.cpp \\\n  src/lib.h\n")
+    fake_process.register(["g++", "src/b.cpp", "-M"], stdout="b.o: src/b.cpp src/other.h\n")
+    fake_process.register(["g++", "src/d.cpp", "-M"], returncode=1)
+    for name in ("a.cpp", "c.cpp", "d.cpp"):
+        fake_process.register(["clang-tidy", str(sources[name].absolute()), "-p", build_path])
+
+    changed_files = {Path("src/lib.h").resolve(), sources["c.cpp"].resolve()}
+    result = ClangTidyChecker(config, changed_files=changed_files).check()
+
+    assert result == 0
+    assert fake_process.call_count(["clang-tidy", str(sources["b.cpp"].absolute()), "-p", build_path]) == 0
+    for name in ("a.cpp", "c.cpp", "d.cpp"):
+        assert fake_process.call_count(["clang-tidy", str(sources[name].absolute()), "-p", build_path]) == 1
+
+
+def test_check_clang_tidy_findings_are_reported(config: Config, fake_process: FakeProcess) -> None:
+    build_path = Path("build/x86/Debug")
+    create_compilation_db(build_path, [TRANSLATION_UNIT])
+    fake_process.register(
+        CLANG_TIDY_COMMAND + ["-p", build_path],
+        stdout=[
+            f"{TRANSLATION_UNIT}:3:1: warning: use 'using' instead of 'typedef' [modernize-use-using]",
+            "typedef int foo;",
+            "^",
+            f"{TRANSLATION_UNIT}:3:1: note: previous declaration is here",
+        ],
+        returncode=1,
+    )
+    stream = io.StringIO()
+
+    ClangTidyChecker(config, reporter=JsonLinesReporter(stream, Path("/"))).check()
+
+    finding, check = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert {key: finding[key] for key in ("checker", "file", "line", "column", "rule", "level", "message")} == {
+        "checker": "clang-tidy",
+        "file": "src/bar.cpp",
+        "line": 3,
+        "column": 1,
+        "rule": "modernize-use-using",
+        "level": "warning",
+        "message": "use 'using' instead of 'typedef'",
+    }
+    assert finding["duration"] >= 0
+    assert (check["checker"], check["problems"]) == ("clang-tidy", 1)
+
+
+def export_fixes(fixes: Dict[str, List[Tuple[str, int, int, str]]]) -> Callable[[FakePopen], None]:
+    """
+    Fake `clang-tidy -export-fixes`, writing the replacements given for the translation unit.
+    """
+
+    def callback(process: FakePopen) -> None:
+        translation_unit = str(process.args[1])
+        fixes_file = next(arg for arg in process.args if str(arg).startswith("-export-fixes="))
+        diagnostics = [
+            {
+                "DiagnosticName": "modernize",
+                "DiagnosticMessage": {
+                    "Message": "not modern",
+                    "FilePath": file_path,
+                    "FileOffset": offset,
+                    "Replacements": [
+                        {"FilePath": file_path, "Offset": offset, "Length": length, "ReplacementText": text}
+                    ],
+                },
+            }
+            for file_path, offset, length, text in fixes[translation_unit]
+        ]
+        document = {"MainSourceFile": translation_unit, "Diagnostics": diagnostics}
+        Path(str(fixes_file).split("=", 1)[1]).write_text(yaml.safe_dump(document))
+
+    return callback
+
+
+def test_fix_clang_tidy_merges_exported_fixes(
+    config: Config, fake_process: FakeProcess, caplog: pytest.LogCaptureFixture
+) -> None:
+    build_path = Path("build/x86/Debug")
+    create_compilation_db(build_path, [Path("src/a.cpp"), Path("src/b.cpp")])
+    Path("src").mkdir()
+    Path("src/lib.h").write_text("typedef int foo;\n")
+    Path("src/a.cpp").write_text('#include "lib.h"\nint *a = NULL;\n')
+    Path("src/b.cpp").write_text('#include "lib.h"\n')
+    Path("/usr/include").mkdir(parents=True)
+    Path("/usr/include/sys.h").write_text("typedef int bar;\n")
+    header_fix = ("/src/lib.h", 0, 16, "using foo = int;")
+    fixes = {
+        "/src/a.cpp": [header_fix, ("/src/a.cpp", 26, 4, "nullptr"), ("/usr/include/sys.h", 0, 16, "using bar = int;")],
+        "/src/b.cpp": [header_fix],
+    }
+    for translation_unit in fixes:
+        fake_process.register(
+            ["clang-tidy", translation_unit, "-p", build_path, fake_process.any()], callback=export_fixes(fixes)
+        )
+
+    assert ClangTidyChecker(config, fix_errors=True, jobs=2).fix_translation_units() == 2
+
+    assert Path("src/lib.h").read_text() == "using foo = int;\n"
+    assert Path("src/a.cpp").read_text() == '#include "lib.h"\nint *a = nullptr;\n'
+    assert Path("/usr/include/sys.h").read_text() == "typedef int bar;\n"
+    log_data = get_log_data(caplog.records)
+    assert ("INFO", "Skipping clang-tidy fixes of /usr/include/sys.h") in log_data
+    assert ("INFO", "Finished clang-tidy fix. Fixed problems in 2 files.") in log_data
+
+
+def test_fix_clang_tidy_without_fixes(
+    config: Config, fake_process: FakeProcess, caplog: pytest.LogCaptureFixture
+) -> None:
+    build_path = Path("build/x86/Debug")
+    create_compilation_db(build_path, [TRANSLATION_UNIT])
+    fake_process.register(
+        CLANG_TIDY_COMMAND + ["-p", build_path, fake_process.any()],
+        stderr="fatal error: 'lib.h' not found",
+        returncode=1,
+    )
+
+    assert ClangTidyChecker(config, fix_errors=True).fix_translation_units() == 0
+    assert ("WARNING", f"clang-tidy failed on {TRANSLATION_UNIT}") in get_log_data(caplog.records)
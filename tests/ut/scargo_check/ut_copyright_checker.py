@@ -180,3 +180,19 @@ def test_check_copyright_fix_with_fix_description(
     test_config.fix.copyright.description = "// COPYRIGHT DESC"
     CopyrightChecker(test_config, fix_errors=True).check()
     assert test_on_tempfile.read_text().splitlines() == expected_lines
+
+
+@pytest.mark.parametrize(
+    "test_on_tempfile, expected_result",
+    [
+        (["/*", *[" * License text" for _ in range(10)], " * Copyright", " */", "int main(void);"], 0),
+        (["int main(void);", "// Copyright"], 1),
+    ],
+    ids=["header_longer_than_window", "after_code"],
+    indirect=["test_on_tempfile"],
+)
+def test_check_copyright_in_header_prefix(test_on_tempfile: Path, expected_result: int) -> None:
+    test_config = get_test_project_config()
+    test_config.check.header_window = 16
+
+    assert CopyrightChecker(test_config).check() == expected_result
@@ -1,33 +1,43 @@
+from pathlib import Path
+from typing import List
+
 import pytest
 from pytest_subprocess import FakeProcess
 
-from pwrforge.commands.check import CppcheckChecker
+from pwrforge.commands.check_analyzers import CppcheckChecker
+from pwrforge.commands.check_base import get_check_cache
 from pwrforge.config import Config
+from pwrforge.global_values import PWRFORGE_CPPCHECK_BUILD_DIR
 from tests.ut.utils import get_log_data, log_contains
 
-CPPCHECK_COMMAND = [
-    "cppcheck",
-    "--enable=all",
-    "--inline-suppr",
-    "--language=c++",
-    "--std=c++17",
-]
+
+def get_cppcheck_command(config: Config, jobs: int = 1) -> List[str]:
+    return [
+        "cppcheck",
+        "--enable=all",
+        "--inline-suppr",
+        f"--cppcheck-build-dir={config.project_root / PWRFORGE_CPPCHECK_BUILD_DIR}",
+        "-j",
+        str(jobs),
+    ]
 
 
 def test_cppcheck_checker_pass(config: Config, fake_process: FakeProcess, caplog: pytest.LogCaptureFixture) -> None:
-    fake_process.register(CPPCHECK_COMMAND)
+    command = get_cppcheck_command(config) + ["--language=c++", "--std=c++17"]
+    fake_process.register(command)
 
     result = CppcheckChecker(config=config).check()
 
     assert result == 0
-    assert fake_process.call_count(CPPCHECK_COMMAND) == 1
+    assert fake_process.call_count(command) == 1
+    assert Path(config.project_root, PWRFORGE_CPPCHECK_BUILD_DIR).is_dir()
 
     expected_messages = ["Starting cppcheck check...", "Finished cppcheck check."]
     assert log_contains(get_log_data(caplog.records), expected_messages)
 
 
 def test_cppcheck_checker_fail(config: Config, fake_process: FakeProcess, caplog: pytest.LogCaptureFixture) -> None:
-    fake_process.register(CPPCHECK_COMMAND, returncode=1)
+    fake_process.register(get_cppcheck_command(config) + ["--language=c++", "--std=c++17"], returncode=1)
 
     result = CppcheckChecker(config=config).check()
     assert result == 0
@@ -36,3 +46,70 @@ def test_cppcheck_checker_fail(config: Config, fake_process: FakeProcess, caplog
         "cppcheck check failed!",
     ]
     assert log_contains(get_log_data(caplog.records), expected_messages)
+
+
+def test_cppcheck_checker_issues(config: Config, fake_process: FakeProcess, caplog: pytest.LogCaptureFixture) -> None:
+    config.check.cppcheck.jobs = 4
+    stderr = [
+        "src/main.cpp:3:5: style: Variable 'x' is assigned a value that is never used. [unreadVariable]",
+        "nofile:0:0: information: Active checkers: 106/592 [checkersReport]",
+        "src/util.cpp:10:1: warning: Member variable is not initialized. [uninitMemberVar]",
+    ]
+    fake_process.register(
+        get_cppcheck_command(config, jobs=4) + ["--language=c++", "--std=c++17"], stderr="\n".join(stderr)
+    )
+
+    result = CppcheckChecker(config=config, jobs=2).check()
+
+    assert result == 2
+    assert log_contains(
+        get_log_data(caplog.records),
+        [
+            "src/main.cpp:3: style: Variable 'x' is assigned a value that is never used. [unreadVariable]",
+            "src/util.cpp:10: warning: Member variable is not initialized. [uninitMemberVar]",
+            "cppcheck check fail!",
+        ],
+    )
+
+
+def test_cppcheck_checker_compilation_database(config: Config, fake_process: FakeProcess) -> None:
+    config.check.cppcheck.directories = ["src/"]
+    build_path = config.project_root / config.project.default_target.get_profile_build_dir("Debug")
+    build_path.mkdir(parents=True)
+    Path(build_path, "compile_commands.json").write_text("[]")
+    command = get_cppcheck_command(config, jobs=3) + [
+        f"--project={build_path / 'compile_commands.json'}",
+        f"--file-filter={Path('src').resolve()}/*",
+    ]
+    fake_process.register(command)
+
+    assert CppcheckChecker(config=config, jobs=3).check() == 0
+    assert fake_process.call_count(command) == 1
+
+
+def test_cppcheck_checker_compilation_database_changed_sources(config: Config, fake_process: FakeProcess) -> None:
+    build_path = config.project_root / config.project.default_target.get_profile_build_dir("Debug")
+    build_path.mkdir(parents=True)
+    Path(build_path, "compile_commands.json").write_text("[]")
+    changed_file = Path("src/main.cpp").resolve()
+    command = get_cppcheck_command(config) + [
+        f"--project={build_path / 'compile_commands.json'}",
+        f"--file-filter={changed_file}",
+    ]
+    fake_process.register(command)
+
+    assert CppcheckChecker(config=config, changed_files={changed_file}).check() == 0
+    assert fake_process.call_count(command) == 1
+
+
+def test_cppcheck_checker_runs_with_cache(config: Config, fake_process: FakeProcess) -> None:
+    # Incremental analysis is left to the cppcheck build dir, a whole run is never replayed
+    config.check.cppcheck.directories = ["src/"]
+    command = get_cppcheck_command(config) + ["--language=c++", "--std=c++17", "src/"]
+    fake_process.keep_last_process(True)
+    fake_process.register(command)
+    cache = get_check_cache(config)
+
+    CppcheckChecker(config=config, cache=cache).check()
+    CppcheckChecker(config=config, cache=cache).check()
+    assert fake_process.call_count(command) == 2
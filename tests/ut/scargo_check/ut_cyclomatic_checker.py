@@ -1,20 +1,42 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
 import pytest
-from pytest_subprocess import FakeProcess
+from pytest_mock import MockerFixture
 
-from pwrforge.commands.check import CyclomaticChecker
+from pwrforge.commands import check_analyzers
+from pwrforge.commands.check_analyzers import CyclomaticChecker
+from pwrforge.commands.check_base import get_check_cache
 from pwrforge.config import Config
+from pwrforge.global_values import (
+    PWRFORGE_CYCLOMATIC_HISTORY_FILE,
+    PWRFORGE_CYCLOMATIC_METRICS_FILE,
+)
 from tests.ut.utils import get_log_data, log_contains
 
-LIZARD_COMMAND = ["lizard", "src", "-C", "25", "-w"]
+SIMPLE_SOURCE = "int main() { return 0; }\n"
+COMPLEX_SOURCE = """
+int sign(int value, int zero)
+{
+    if (value > 0) {
+        return 1;
+    }
+    if (value < 0) {
+        return -1;
+    }
+    return zero;
+}
+"""
 
 
-def test_cyclomatic_checker_pass(config: Config, fake_process: FakeProcess, caplog: pytest.LogCaptureFixture) -> None:
-    fake_process.register(LIZARD_COMMAND)
+def test_cyclomatic_checker_pass(config: Config, caplog: pytest.LogCaptureFixture) -> None:
+    Path("src").mkdir()
+    Path("src/main.cpp").write_text(SIMPLE_SOURCE)
 
     result = CyclomaticChecker(config=config).check()
     assert result == 0
 
-    assert fake_process.call_count(LIZARD_COMMAND) == 1
     expected_messages = [
         "Starting cyclomatic check...",
         "Finished cyclomatic check with 0 issues.",
@@ -22,14 +44,96 @@ def test_cyclomatic_checker_pass(config: Config, fake_process: FakeProcess, capl
     assert log_contains(get_log_data(caplog.records), expected_messages)
 
 
-def test_cyclomatic_checker_exclude(
-    config: Config, fake_process: FakeProcess, caplog: pytest.LogCaptureFixture
+@pytest.mark.parametrize(["option", "value"], [("ccn", 2), ("length", 8), ("arguments", 1)])
+def test_cyclomatic_checker_thresholds(
+    option: str, value: int, config: Config, caplog: pytest.LogCaptureFixture
 ) -> None:
-    config.check.cyclomatic.exclude = ["foo/*"]
-    command_with_exclude = LIZARD_COMMAND + ["-x", "foo/*"]
-    fake_process.register(command_with_exclude)
+    setattr(config.check.cyclomatic, option, value)
+    Path("src").mkdir()
+    Path("src/sign.cpp").write_text(COMPLEX_SOURCE)
+
+    result = CyclomaticChecker(config=config).check()
+    assert result == 1
+
+    assert log_contains(
+        get_log_data(caplog.records),
+        ["src/sign.cpp:2: warning: sign has 10 NLOC, 3 CCN, 36 token, 2 PARAM, 10 length"],
+    )
+
+
+def test_cyclomatic_checker_exclude(config: Config) -> None:
+    config.check.cyclomatic.ccn = 1
+    config.check.cyclomatic.exclude = ["src/foo/*"]
+    Path("src/foo").mkdir(parents=True)
+    Path("src/foo/sign.cpp").write_text(COMPLEX_SOURCE)
 
     result = CyclomaticChecker(config=config).check()
     assert result == 0
 
-    assert fake_process.call_count(command_with_exclude) == 1
+
+def test_cyclomatic_checker_files_of_lizard_languages(config: Config) -> None:
+    config.check.cyclomatic.ccn = 2
+    Path("src").mkdir()
+    Path("src/sign.cc").write_text(COMPLEX_SOURCE)
+    Path("src/sign.cxx").write_text(COMPLEX_SOURCE)
+    Path("src/notes.txt").write_text(COMPLEX_SOURCE)
+
+    checker = CyclomaticChecker(config=config)
+
+    assert checker.get_files() == [Path("src/sign.cc"), Path("src/sign.cxx")]
+    assert checker.check() == 2
+
+
+def test_cyclomatic_checker_metrics_cache(config: Config, mocker: MockerFixture) -> None:
+    config.check.cyclomatic.ccn = 2
+    analyze_source = mocker.patch.object(check_analyzers, "analyze_source", wraps=check_analyzers.analyze_source)
+    Path("src").mkdir()
+    Path("src/main.cpp").write_text(SIMPLE_SOURCE)
+    source_file = Path("src/sign.cpp")
+    source_file.write_text(COMPLEX_SOURCE)
+    cache = get_check_cache(config)
+
+    assert CyclomaticChecker(config=config, cache=cache).check() == 1
+    assert analyze_source.call_count == 2
+    # Thresholds are applied to stored metrics, changing them does not require analysing files again
+    config.check.cyclomatic.ccn = 3
+    assert CyclomaticChecker(config=config, cache=cache).check() == 0
+    assert analyze_source.call_count == 2
+
+    source_file.write_text(SIMPLE_SOURCE)
+    CyclomaticChecker(config=config, cache=cache).check()
+    assert analyze_source.call_count == 3
+    assert analyze_source.call_args.args[0] == "src/sign.cpp"
+
+    CyclomaticChecker(config=config).check()
+    assert analyze_source.call_count == 5
+
+
+def test_cyclomatic_checker_metrics_history(config: Config) -> None:
+    Path("src").mkdir()
+    Path("src/main.cpp").write_text(SIMPLE_SOURCE)
+    Path("src/sign.cpp").write_text(COMPLEX_SOURCE)
+
+    CyclomaticChecker(config=config).check()
+    CyclomaticChecker(config=config, changed_files={Path("src/main.cpp").resolve()}).check()
+
+    metrics = json.loads(Path(PWRFORGE_CYCLOMATIC_METRICS_FILE).read_text())
+    assert sorted(metrics["files"]) == ["src/main.cpp", "src/sign.cpp"]
+    history = [json.loads(line) for line in Path(PWRFORGE_CYCLOMATIC_HISTORY_FILE).read_text().splitlines()]
+    assert len(history) == 1
+    assert history[0]["files"] == 2
+    assert history[0]["functions"] == 2
+    assert history[0]["ccn"] == 4
+    assert history[0]["hotspots"][0] == {"file": "src/sign.cpp", "function": "sign", "line": 2, "ccn": 3}
+
+
+def test_cyclomatic_checker_process_pool(config: Config, mocker: MockerFixture) -> None:
+    # Worker processes do not see the fake filesystem, but sources are passed to them, so threads do the same job
+    executor = mocker.patch.object(check_analyzers, "ProcessPoolExecutor", wraps=ThreadPoolExecutor)
+    config.check.cyclomatic.ccn = 2
+    Path("src").mkdir()
+    for index in range(4):
+        Path(f"src/sign{index}.cpp").write_text(COMPLEX_SOURCE)
+
+    assert CyclomaticChecker(config=config, jobs=2).check() == 4
+    executor.assert_called_once_with(max_workers=2)
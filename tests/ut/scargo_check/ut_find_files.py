@@ -1,60 +1,91 @@
 from pathlib import Path
-from unittest.mock import MagicMock
 
 import pytest
+from pyfakefs.fake_filesystem import FakeFilesystem
 from pytest_mock import MockerFixture
 
-from pwrforge.commands.check import find_files
+from pwrforge.commands.check_base import find_files
+from pwrforge.utils import file_utils
+from pwrforge.utils.file_utils import ExcludeMatcher, FileIndex
 from tests.ut.utils import get_log_data
 
+PROJECT_FILES = [
+    "src/main.cpp",
+    "src/main.h",
+    "src/notes.txt",
+    "src/bsp/board.c",
+    "src/bsp/board.h",
+    "src/bsp2/extra.hpp",
+    "src/drivers/uart/generated/regs.h",
+    "src/drivers/uart/uart.cpp",
+]
 
-@pytest.mark.parametrize("mock_path_is_file", [True], indirect=True)
-def test_find_files(
-    mock_path_rglob: MagicMock,
-    mock_path_is_file: MagicMock,
-    caplog: pytest.LogCaptureFixture,
-) -> None:
-    result = find_files(Path(), glob_patterns=["*.hpp"], exclude_patterns=[])
-    assert list(result) == [Path("foo/bar.hpp")]
-    assert caplog.records == []
 
-
-@pytest.mark.parametrize("mock_path_is_file", [False], indirect=True)
-def test_find_files__exclude_non_files(
-    mock_path_rglob: MagicMock,
-    mock_path_is_file: MagicMock,
-    caplog: pytest.LogCaptureFixture,
-) -> None:
-    result = find_files(Path(), glob_patterns=["*.hpp"], exclude_patterns=[])
-    assert list(result) == []
+@pytest.fixture
+def project(fs: FakeFilesystem) -> Path:
+    for file_name in PROJECT_FILES:
+        fs.create_file(Path("/project", file_name))
+    fs.create_dir("/project/src/empty.h")
+    fs.cwd = "/project"
+    return Path("/project")
+
+
+def test_find_files(project: Path, caplog: pytest.LogCaptureFixture) -> None:
+    result = find_files(Path("src"), glob_patterns=["*.h", "*.hpp"], exclude_patterns=[])
+    assert result == [
+        Path("src/bsp/board.h"),
+        Path("src/bsp2/extra.hpp"),
+        Path("src/drivers/uart/generated/regs.h"),
+        Path("src/main.h"),
+    ]
     assert caplog.records == []
 
 
-@pytest.mark.parametrize("mock_path_is_file", [True], indirect=True)
-def test_find_files__exclude_patterns(
-    mock_path_rglob: MagicMock,
-    mock_path_is_file: MagicMock,
-    mock_glob_glob: MagicMock,
-    caplog: pytest.LogCaptureFixture,
+def test_find_files__exclude_patterns_prune_directories(
+    project: Path, caplog: pytest.LogCaptureFixture, mocker: MockerFixture
 ) -> None:
-    result = find_files(Path(), glob_patterns=["*.hpp"], exclude_patterns=["foo/*"])
-    assert list(result) == []
-    assert get_log_data(caplog.records) == [("INFO", "Skipping foo/bar.hpp")]
-
-
-# Fixtures
-
-
-@pytest.fixture
-def mock_path_rglob(mocker: MockerFixture) -> MagicMock:
-    return mocker.patch.object(Path, "rglob", return_value=[Path("foo/bar.hpp")])
-
-
-@pytest.fixture
-def mock_path_is_file(request: pytest.FixtureRequest, mocker: MockerFixture) -> MagicMock:
-    return mocker.patch.object(Path, "is_file", return_value=request.param)
-
-
-@pytest.fixture
-def mock_glob_glob(mocker: MockerFixture) -> MagicMock:
-    return mocker.patch(f"{find_files.__module__}.glob.glob", return_value=["foo/bar.hpp"])
+    scandir_spy = mocker.spy(file_utils.os, "scandir")
+
+    result = find_files(Path("src"), glob_patterns=["*.h", "*.c"], exclude_patterns=["src/bsp", "src/*/*/generated"])
+
+    assert result == [Path("src/main.h")]
+    assert get_log_data(caplog.records) == [
+        ("INFO", "Skipping src/bsp"),
+        ("INFO", "Skipping src/drivers/uart/generated"),
+    ]
+    visited = {str(call.args[0]) for call in scandir_spy.call_args_list}
+    assert visited == {"src", "src/bsp2", "src/drivers", "src/drivers/uart", "src/empty.h"}
+
+
+def test_find_files__shared_index(project: Path, caplog: pytest.LogCaptureFixture, mocker: MockerFixture) -> None:
+    walk_files_spy = mocker.spy(file_utils, "walk_files")
+    file_index = FileIndex(["src/bsp"], project)
+
+    headers = find_files(Path("src"), ["*.h"], ["src/bsp", "src/drivers"], file_index)
+    sources = find_files(Path("src"), ["*.c", "*.cpp"], ["src/bsp"], file_index)
+
+    assert headers == [Path("src/main.h")]
+    assert sources == [Path("src/drivers/uart/uart.cpp"), Path("src/main.cpp")]
+    assert walk_files_spy.call_count == 1
+    assert ("INFO", "Skipping src/drivers/uart/generated/regs.h") in get_log_data(caplog.records)
+
+
+@pytest.mark.parametrize(
+    ["pattern", "path", "excluded"],
+    [
+        ("src/bsp", "src/bsp", True),
+        ("src/bsp", "src/bsp/board.c", True),
+        ("src/bsp", "src/bsp2/extra.hpp", False),
+        ("src/bsp/", "src/bsp/board.c", True),
+        ("src/*.c", "src/main.c", True),
+        ("src/*.c", "src/bsp/board.c", False),
+        ("src/*", "src/.hidden", False),
+        ("src/[ab]sp", "src/bsp/board.c", True),
+        ("src/[!b]sp", "src/bsp/board.c", False),
+        ("/project/src/main.cpp", "src/main.cpp", True),
+        ("./src/../src/main.cpp", "/project/src/main.cpp", True),
+    ],
+)
+def test_exclude_matcher(pattern: str, path: str, excluded: bool) -> None:
+    matcher = ExcludeMatcher([pattern], Path("/project"))
+    assert matcher.match(Path("/project", path)) is excluded
@@ -0,0 +1,140 @@
+from collections import Counter
+from pathlib import Path
+from typing import List
+from unittest.mock import MagicMock
+
+import pytest
+from pytest_mock import MockerFixture
+from pytest_subprocess import FakeProcess
+
+from pwrforge.commands import fix
+from pwrforge.commands.check import ClangFormatChecker, CopyrightChecker, PragmaChecker
+from pwrforge.commands.check_base import get_check_cache
+from pwrforge.commands.fix import FixPipeline
+from pwrforge.config import Config
+from tests.ut.utils import get_log_data
+
+COPYRIGHT = "//\n// Copyright\n//\n"
+
+
+CLANG_FORMAT_DRY_RUN_COMMAND = ["/usr/bin/clang-format", "--style=file", "--dry-run", "-Werror"]
+CLANG_FORMAT_FIX_COMMAND = ["/usr/bin/clang-format", "-style=file", "-i"]
+
+
+def get_dry_run_output(file_path: str) -> str:
+    return f"{file_path}:1:4: error: code should be clang-formatted [-Wclang-format-violations]"
+
+
+def get_clang_format_stdin_command(file_path: str) -> List[str]:
+    return ["/usr/bin/clang-format", "-style=file", f"--assume-filename={file_path}"]
+
+
+@pytest.fixture
+def write_spy(mocker: MockerFixture) -> MagicMock:
+    return mocker.patch.object(fix, "write_file_atomically", wraps=fix.write_file_atomically)
+
+
+@pytest.fixture
+def sources() -> Path:
+    source_dir = Path("src")
+    source_dir.mkdir()
+    Path(source_dir, "a.h").write_text("int  a;\n")
+    Path(source_dir, "b.cpp").write_text(f"{COPYRIGHT}int b;\n")
+    return source_dir
+
+
+def test_fix_pipeline_writes_each_file_once(
+    config: Config, fake_process: FakeProcess, write_spy: MagicMock, sources: Path, caplog: pytest.LogCaptureFixture
+) -> None:
+    fake_process.register(get_clang_format_stdin_command("src/a.h"), stdout=f"{COPYRIGHT}#pragma once\n\nint a;\n")
+    fake_process.register(
+        [*CLANG_FORMAT_DRY_RUN_COMMAND, "src/b.cpp"], stdout=get_dry_run_output("src/b.cpp"), returncode=1
+    )
+    fake_process.register([*CLANG_FORMAT_FIX_COMMAND, "src/b.cpp"])
+    fixers = [
+        ClangFormatChecker(config, fix_errors=True),
+        PragmaChecker(config, fix_errors=True),
+        CopyrightChecker(config, fix_errors=True),
+    ]
+
+    results = FixPipeline(fixers).run()
+
+    assert [(result.file_path, result.fixed_by) for result in results] == [
+        (Path("src/a.h"), ("pragma", "copyright", "clang-format")),
+        (Path("src/b.cpp"), ("clang-format",)),
+    ]
+    assert Path(sources, "a.h").read_text() == f"{COPYRIGHT}#pragma once\n\nint a;\n"
+    # Formatter gets the contents fixed by the other fixers, only unchanged files are formatted on disk
+    assert Counter(call.args[0] for call in write_spy.call_args_list) == {Path("src/a.h"): 1}
+    assert list(fake_process.calls) == [
+        get_clang_format_stdin_command("src/a.h"),
+        [*CLANG_FORMAT_DRY_RUN_COMMAND, "src/b.cpp"],
+        [*CLANG_FORMAT_FIX_COMMAND, "src/b.cpp"],
+    ]
+    assert ("INFO", "Fixed src/a.h (pragma, copyright, clang-format)") in get_log_data(caplog.records)
+    assert ("INFO", "Fixed src/b.cpp (clang-format)") in get_log_data(caplog.records)
+    assert ("INFO", "Finished clang-format fix. Fixed problems in 2 files.") in get_log_data(caplog.records)
+
+
+def test_fix_pipeline_unchanged_files_are_not_written(
+    config: Config, fake_process: FakeProcess, write_spy: MagicMock, sources: Path
+) -> None:
+    Path(sources, "a.h").write_text(f"{COPYRIGHT}#pragma once\nint a;\n")
+    fake_process.register([*CLANG_FORMAT_DRY_RUN_COMMAND, "src/a.h", "src/b.cpp"])
+    fixers = [
+        PragmaChecker(config, fix_errors=True),
+        CopyrightChecker(config, fix_errors=True),
+        ClangFormatChecker(config, fix_errors=True),
+    ]
+
+    assert FixPipeline(fixers, jobs=2).run() == []
+    assert write_spy.call_count == 0
+    assert len(fake_process.calls) == 1
+
+
+def test_fix_pipeline_skips_formatted_files(config: Config, fake_process: FakeProcess, sources: Path) -> None:
+    fake_process.keep_last_process(True)
+    fake_process.register(["/usr/bin/clang-format", "--version"], stdout="clang-format version 14.0.0")
+    fake_process.register(
+        [*CLANG_FORMAT_DRY_RUN_COMMAND, "src/a.h", "src/b.cpp"], stdout=get_dry_run_output("src/a.h"), returncode=1
+    )
+    fake_process.register([*CLANG_FORMAT_FIX_COMMAND, "src/a.h"])
+    fake_process.register(get_clang_format_stdin_command("src/a.h"), stdout=f"{COPYRIGHT}#pragma once\n\nint a;\n")
+    cache = get_check_cache(config)
+
+    FixPipeline([ClangFormatChecker(config, fix_errors=True, cache=cache)]).run()
+    FixPipeline([ClangFormatChecker(config, fix_errors=True, cache=cache)]).run()
+
+    assert fake_process.call_count([*CLANG_FORMAT_DRY_RUN_COMMAND, "src/a.h", "src/b.cpp"]) == 1
+    assert fake_process.call_count([*CLANG_FORMAT_FIX_COMMAND, "src/a.h"]) == 1
+
+    # Files formatted in memory are stored as formatted too
+    Path(sources, "a.h").write_text("int  a;\n")
+    fixers = [
+        PragmaChecker(config, fix_errors=True, cache=cache),
+        CopyrightChecker(config, fix_errors=True, cache=cache),
+        ClangFormatChecker(config, fix_errors=True, cache=cache),
+    ]
+    FixPipeline(fixers).run()
+    FixPipeline([ClangFormatChecker(config, fix_errors=True, cache=cache)]).run()
+
+    assert fake_process.call_count(get_clang_format_stdin_command("src/a.h")) == 1
+    assert fake_process.call_count([*CLANG_FORMAT_DRY_RUN_COMMAND, fake_process.any()]) == 1
+
+
+def test_fix_pipeline_formatter_failure_keeps_fixes(
+    config: Config, fake_process: FakeProcess, write_spy: MagicMock, sources: Path, caplog: pytest.LogCaptureFixture
+) -> None:
+    fake_process.register(get_clang_format_stdin_command("src/a.h"), stderr="invalid style", returncode=1)
+    fake_process.register([*CLANG_FORMAT_DRY_RUN_COMMAND, "src/b.cpp"])
+    fixers = [
+        PragmaChecker(config, fix_errors=True),
+        CopyrightChecker(config, fix_errors=True),
+        ClangFormatChecker(config, fix_errors=True),
+    ]
+
+    FixPipeline(fixers).run()
+
+    assert Path(sources, "a.h").read_text() == f"{COPYRIGHT}#pragma once\n\nint  a;\n"
+    assert write_spy.call_count == 1
+    assert ("ERROR", "clang-format failed on src/a.h: invalid style") in get_log_data(caplog.records)
@@ -1,4 +1,6 @@
-from unittest.mock import MagicMock, call
+from pathlib import Path
+from typing import List
+from unittest.mock import MagicMock
 
 import pytest
 
@@ -15,49 +17,62 @@ FILE_CONTENTS_WITH_PRAGMA = [
     "int main(void);",
 ]
 
+FILE_CONTENTS_WITH_PRAGMA_AFTER_CODE = [
+    "int main(void);",
+    "#pragma once",
+]
+
+FILE_CONTENTS_WITH_LONG_HEADER = [
+    "/*",
+    *[f" * License line {index}" for index in range(20)],
+    " */",
+    "#pragma once",
+    "int main(void);",
+]
+
+
+def write_header(lines: List[str]) -> Path:
+    file_path = Path("foo/bar.hpp")
+    file_path.parent.mkdir(exist_ok=True)
+    file_path.write_text("\n".join(lines))
+    return file_path
+
 
-@pytest.mark.parametrize(
-    "mock_file_contents",
-    [FILE_CONTENTS_WITH_PRAGMA],
-    indirect=True,
-)
 def test_check_pragma_pass(
-    mock_file_contents: MagicMock,
     caplog: pytest.LogCaptureFixture,
     config: Config,
     mock_find_files: MagicMock,
 ) -> None:
+    write_header(FILE_CONTENTS_WITH_PRAGMA)
     result = PragmaChecker(config).check()
     assert result == 0
-    assert ("WARNING", "Missing pragma in foo/bar.hpp") not in get_log_data(caplog.records)
+    assert ("WARNING", "Missing '#pragma once' in foo/bar.hpp") not in get_log_data(caplog.records)
 
 
-@pytest.mark.parametrize(
-    "mock_file_contents",
-    [FILE_CONTENTS_WITHOUT_PRAGMA],
-    indirect=True,
-)
+@pytest.mark.parametrize("file_contents", [FILE_CONTENTS_WITHOUT_PRAGMA, FILE_CONTENTS_WITH_PRAGMA_AFTER_CODE])
 def test_check_pragma_fail(
-    mock_file_contents: MagicMock,
+    file_contents: List[str],
     caplog: pytest.LogCaptureFixture,
     config: Config,
     mock_find_files: MagicMock,
 ) -> None:
+    write_header(file_contents)
     result = PragmaChecker(config).check()
     assert result == 1
     assert ("WARNING", "Missing '#pragma once' in foo/bar.hpp") in get_log_data(caplog.records)
 
 
-@pytest.mark.parametrize(
-    ["mock_file_contents"],
-    [(FILE_CONTENTS_WITHOUT_PRAGMA,)],
-    indirect=True,
-)
-def test_check_pragma_fix(mock_file_contents: MagicMock, config: Config, mock_find_files: MagicMock) -> None:
+def test_check_pragma_after_header_longer_than_window(config: Config, mock_find_files: MagicMock) -> None:
+    file_path = write_header(FILE_CONTENTS_WITH_LONG_HEADER)
+    config.check.header_window = 16
+
+    assert PragmaChecker(config).check() == 0
+    assert PragmaChecker(config, fix_errors=True).check() == 0
+    assert file_path.read_text().count("#pragma once") == 1
+
+
+def test_check_pragma_fix(config: Config, mock_find_files: MagicMock) -> None:
+    file_path = write_header(FILE_CONTENTS_WITHOUT_PRAGMA)
     result = PragmaChecker(config, fix_errors=True).check()
     assert result == 1
-    assert mock_file_contents().write.mock_calls == [
-        call("#pragma once\n"),
-        call("\n"),
-        call("int main(void);"),
-    ]
+    assert file_path.read_text() == "#pragma once\n\nint main(void);"
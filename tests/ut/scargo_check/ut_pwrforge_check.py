@@ -1,3 +1,5 @@
+import json
+from pathlib import Path
 from typing import Dict
 from unittest.mock import MagicMock
 
@@ -5,8 +7,15 @@ import pytest
 from pytest_mock import MockerFixture
 
 from pwrforge.commands import check
-from pwrforge.commands.check import pwrforge_check
+from pwrforge.commands.check import CheckOptions, pwrforge_check
 from pwrforge.config import Config
+from pwrforge.global_values import (
+    PWRFORGE_CHECK_TIMINGS_FILE,
+    PWRFORGE_CHECK_TIMINGS_HISTORY_FILE,
+    PWRFORGE_CHECK_TIMINGS_REPORT_FILE,
+)
+from pwrforge.utils.report_utils import ReportFormat
+from tests.ut.utils import get_log_data
 
 CHECKERS = [
     check.PragmaChecker,
@@ -18,6 +27,8 @@ CHECKERS = [
     check.CppcheckChecker,
 ]
 
+CHECK_OPTIONS = ["clang_format", "clang_tidy", "copy_right", "cppcheck", "cyclomatic", "todo", "pragma"]
+
 
 @pytest.fixture
 def mock_checkers(mocker: MockerFixture) -> Dict[str, MagicMock]:
@@ -27,6 +38,7 @@ def mock_checkers(mocker: MockerFixture) -> Dict[str, MagicMock]:
     }
     for name, checker in checkers.items():
         checker.check_name = name
+        checker().check_name = name
         checker().check.return_value = 0
     return checkers
 
@@ -107,3 +119,73 @@ def test_pwrforge_check_default(
     assert mock_checkers["cyclomatic"]().check.call_count == 1
     assert mock_checkers["pragma"]().check.call_count == 1
     assert mock_checkers["todo"]().check.call_count == 1
+
+
+def test_pwrforge_check_plan_from_previous_timings(
+    mock_checkers: Dict[str, MagicMock],
+    mock_prepare_config: MagicMock,
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    options = dict.fromkeys(CHECK_OPTIONS[:-1], False)
+    pwrforge_check(**options, pragma=True, verbose=False)
+
+    timings = json.loads(Path(PWRFORGE_CHECK_TIMINGS_FILE).read_text())
+    assert list(timings["checkers"]) == ["pragma"]
+
+    caplog.clear()
+    pwrforge_check(**options, pragma=True, verbose=False, options=CheckOptions(jobs=4, plan=True))
+
+    assert mock_checkers["pragma"]().check.call_count == 1
+    log_data = get_log_data(caplog.records)
+    assert log_data[0] == ("INFO", "Check plan, 4 jobs shared by checkers running at the same time:")
+    assert log_data[1][1].startswith("  pragma")
+
+
+def test_pwrforge_check_plan_closes_report(
+    mock_checkers: Dict[str, MagicMock],
+    mock_prepare_config: MagicMock,
+) -> None:
+    report = Path("report.sarif")
+    options = dict.fromkeys(CHECK_OPTIONS[:-1], False)
+
+    pwrforge_check(
+        **options,
+        pragma=True,
+        verbose=False,
+        options=CheckOptions(plan=True, report_format=ReportFormat.sarif, output=report),
+    )
+
+    assert mock_checkers["pragma"]().check.call_count == 0
+    assert json.loads(report.read_text())["runs"][0]["results"] == []
+
+
+def test_pwrforge_check_fail_fast(
+    mock_checkers: Dict[str, MagicMock],
+    mock_prepare_config: MagicMock,
+) -> None:
+    mock_checkers["copyright"]().check.return_value = 1
+
+    with pytest.raises(SystemExit):
+        pwrforge_check(**dict.fromkeys(CHECK_OPTIONS, False), verbose=False, options=CheckOptions(fail_fast=True))
+
+    for check_name in ("pragma", "copyright", "todo"):
+        assert mock_checkers[check_name]().check.call_count == 1
+    for check_name in ("clang-format", "clang-tidy", "cppcheck", "cyclomatic"):
+        assert mock_checkers[check_name]().check.call_count == 0
+
+
+def test_pwrforge_check_timings(
+    mock_checkers: Dict[str, MagicMock],
+    mock_prepare_config: MagicMock,
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    options = dict.fromkeys(CHECK_OPTIONS[:-2], False)
+    for _ in range(2):
+        pwrforge_check(**options, todo=True, pragma=False, verbose=False, options=CheckOptions(timings=True))
+
+    report = json.loads(Path(PWRFORGE_CHECK_TIMINGS_REPORT_FILE).read_text())
+    assert {"time", "duration", "children_cpu", "checkers", "files"} <= set(report)
+    history = Path(PWRFORGE_CHECK_TIMINGS_HISTORY_FILE).read_text().splitlines()
+    assert len(history) == 2
+    assert "files" not in json.loads(history[-1])
+    assert ("INFO", "Check timings:") in get_log_data(caplog.records)
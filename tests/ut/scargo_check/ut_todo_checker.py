@@ -5,7 +5,7 @@ from pytest_mock import MockerFixture
 
 from pwrforge.commands.check import TodoChecker
 from pwrforge.config import Config
-from pwrforge.utils.clang_utils import get_comment_lines
+from pwrforge.utils.comment_utils import get_comment_lines
 from tests.ut.utils import get_log_data
 
 COMMENT_LINES_WITHOUT_TODO = [
@@ -0,0 +1,79 @@
+import os
+from pathlib import Path
+
+from pytest_mock import MockerFixture
+
+from pwrforge.utils.artifact_utils import find_artifacts, sync_artifacts, sync_file
+
+BUILD_TREE_FILES = [
+    "bin/firmware.elf",
+    "bin/firmware",
+    "lib/libfoo.a",
+    "firmware.map",
+    "compile_commands.json",
+    "bootloader/bootloader.bin",
+    "CMakeFiles/3.28.0/CMakeDetermineCompilerABI_C.bin",
+    "src/CMakeFiles/firmware.dir/main.cpp.o",
+    "src/main.cpp.o",
+    "Makefile",
+]
+
+
+def create_build_tree(build_tree: Path) -> None:
+    for file in BUILD_TREE_FILES:
+        Path(build_tree, file).parent.mkdir(parents=True, exist_ok=True)
+        Path(build_tree, file).write_text(file)
+
+
+def test_find_artifacts(tmp_path: Path) -> None:
+    create_build_tree(tmp_path)
+    assert find_artifacts(tmp_path) == [
+        Path("bin/firmware"),
+        Path("bin/firmware.elf"),
+        Path("bootloader/bootloader.bin"),
+        Path("compile_commands.json"),
+        Path("firmware.map"),
+        Path("lib/libfoo.a"),
+    ]
+
+
+def test_sync_artifacts(tmp_path: Path) -> None:
+    build_tree = tmp_path / "build" / "Debug"
+    create_build_tree(build_tree)
+
+    assert sync_artifacts(build_tree, tmp_path) == {"linked": 6}
+    assert Path(tmp_path, "bin/firmware.elf").read_text() == "bin/firmware.elf"
+    assert not Path(tmp_path, "src").exists()
+    assert not Path(tmp_path, "Makefile").exists()
+
+    assert sync_artifacts(build_tree, tmp_path) == {"unchanged": 6}
+
+    # The linker replaces its output instead of writing into it
+    Path(build_tree, "bin/firmware.elf").unlink()
+    Path(build_tree, "bin/firmware.elf").write_text("new firmware")
+    assert sync_artifacts(build_tree, tmp_path) == {"linked": 1, "unchanged": 5}
+    assert Path(tmp_path, "bin/firmware.elf").read_text() == "new firmware"
+
+
+def test_sync_file_keeps_destination_with_same_content(tmp_path: Path) -> None:
+    src = tmp_path / "src.bin"
+    dst = tmp_path / "dst.bin"
+    src.write_text("content")
+    dst.write_text("content")
+    os.utime(dst, ns=(0, 0))
+
+    assert sync_file(src, dst) == "unchanged"
+    assert dst.stat().st_mtime_ns == 0
+
+
+def test_sync_file_copies_when_link_fails(tmp_path: Path, mocker: MockerFixture) -> None:
+    src = tmp_path / "src.bin"
+    dst = tmp_path / "out" / "dst.bin"
+    src.write_text("content")
+    mocker.patch("os.link", side_effect=OSError("cross-device link"))
+    mocker.patch("pwrforge.utils.artifact_utils._reflink", return_value=False)
+
+    assert sync_file(src, dst) == "copied"
+    assert dst.read_text() == "content"
+    assert dst.stat().st_mtime_ns == src.stat().st_mtime_ns
+    assert not list(dst.parent.glob(".*"))
@@ -0,0 +1,63 @@
+from pathlib import Path
+
+import pytest
+from pytest_subprocess import FakeProcess
+
+from pwrforge.config import Config
+from pwrforge.utils.ccache_utils import (
+    CompilerCacheStats,
+    read_compiler_cache_stats,
+    report_compiler_cache_stats,
+)
+from tests.ut.utils import get_log_data, get_test_project_config
+
+PRINT_STATS_BEFORE = (
+    b"stats_updated_timestamp\t1700000000\ndirect_cache_hit\t10\npreprocessed_cache_hit\t2\ncache_miss\t5\n"
+)
+PRINT_STATS_AFTER = (
+    b"stats_updated_timestamp\t1700000100\ndirect_cache_hit\t40\npreprocessed_cache_hit\t3\ncache_miss\t6\n"
+)
+
+
+@pytest.fixture
+def config(tmp_path: Path) -> Config:
+    config = get_test_project_config()
+    config.project_root = tmp_path
+    config.project.cache.enabled = True
+    return config
+
+
+def test_read_compiler_cache_stats(config: Config, fp: FakeProcess) -> None:
+    fp.register(["ccache", "--print-stats"], stdout=PRINT_STATS_BEFORE)
+    assert read_compiler_cache_stats(config) == CompilerCacheStats(hits=12, misses=5)
+
+
+def test_read_compiler_cache_stats_disabled(config: Config, fp: FakeProcess) -> None:
+    config.project.cache.enabled = False
+    assert read_compiler_cache_stats(config) is None
+    config.project.cache.enabled = True
+    config.project.cache.launcher = "sccache"
+    assert read_compiler_cache_stats(config) is None
+    assert not fp.calls
+
+
+def test_report_compiler_cache_stats(config: Config, fp: FakeProcess, caplog: pytest.LogCaptureFixture) -> None:
+    fp.register(["ccache", "--print-stats"], stdout=PRINT_STATS_BEFORE)
+    fp.register(["ccache", "--print-stats"], stdout=PRINT_STATS_AFTER)
+
+    with pytest.raises(SystemExit):
+        with report_compiler_cache_stats(config):
+            raise SystemExit(1)
+
+    assert ("INFO", "Compiler cache: 31 hits, 1 misses (96.9% hit rate)") in get_log_data(caplog.records)
+
+
+def test_report_compiler_cache_stats_ccache_missing(
+    config: Config, fp: FakeProcess, caplog: pytest.LogCaptureFixture
+) -> None:
+    fp.register(["ccache", "--print-stats"], returncode=1)
+
+    with report_compiler_cache_stats(config):
+        pass
+
+    assert not [message for _, message in get_log_data(caplog.records) if message.startswith("Compiler cache")]
@@ -0,0 +1,55 @@
+from pathlib import Path
+
+import pytest
+
+from pwrforge.utils.clang_utils import get_comment_lines_libclang
+from pwrforge.utils.comment_utils import get_comment_lines
+from tests.ut.conftest import TEST_DATA_PATH
+
+SOURCE_SUFFIXES = (".c", ".cpp", ".h", ".hpp")
+
+TRICKY_SOURCE = r"""const char* a = "not // a comment /* either */";
+auto r = R"xy(raw // still )" not */ )xy";  // real 1
+char c = '"'; // real 2
+int n = 1'000'000; // real 3
+/* block
+   spanning */ int x;
+// continued \
+   line
+#define X "esc \" // no"
+#if 0
+// inside if 0
+#endif
+auto w = u8"x//y" L'/' U"/*";
+int fooR = 1; auto s = fooR"//"; // real 4
+"""
+
+
+@pytest.mark.parametrize(
+    "file_path",
+    [path for path in sorted(TEST_DATA_PATH.rglob("*")) if path.suffix in SOURCE_SUFFIXES],
+    ids=lambda path: str(path.relative_to(TEST_DATA_PATH)),
+)
+def test_comment_lines_match_libclang(file_path: Path) -> None:
+    assert list(get_comment_lines(file_path)) == list(get_comment_lines_libclang(file_path))
+
+
+def test_literals_and_continuations_match_libclang() -> None:
+    file_path = Path("tricky.cpp")
+    expected = [
+        (2, "// real 1"),
+        (3, "// real 2"),
+        (4, "// real 3"),
+        (5, "/* block"),
+        (6, "   spanning */"),
+        (7, "// continued \\"),
+        (8, "   line"),
+        (11, "// inside if 0"),
+        (14, "// real 4"),
+    ]
+    assert list(get_comment_lines(file_path, TRICKY_SOURCE)) == expected
+    assert list(get_comment_lines_libclang(file_path, TRICKY_SOURCE)) == expected
+
+
+def test_header_name_is_not_a_comment() -> None:
+    assert not list(get_comment_lines(Path("include.cpp"), "#include <dir//file.h>\n"))
@@ -4,6 +4,7 @@ from pathlib import Path
 from unittest.mock import patch
 
 import pytest
+from pytest_mock import MockerFixture
 from pytest_subprocess import FakeProcess
 from pytest_subprocess.fake_popen import FakePopen
 
@@ -11,6 +12,7 @@ from pwrforge.config import Config
 from pwrforge.utils.conan_utils import (
     conan_add_remote,
     conan_remote_login,
+    conan_setup,
     conan_source,
 )
 from tests.ut.ut_pwrforge_publish import (
@@ -161,3 +163,55 @@ def test_conan_source_fails(config: Config, caplog: pytest.LogCaptureFixture, fp
 
     # ASSERT
     assert "Unable to source" in caplog.text
+
+
+def register_conan_setup_cmds(fp: FakeProcess, source_returncode: int = 0) -> None:
+    fp.register(["conan", "profile", "list"], stdout=b"default\n")
+    fp.register(["conan", "remote", "list-users"])
+    fp.register(["conan", "remote", "add", REMOTE_REPO_NAME_1, EXAMPLE_URL])
+    fp.register(["conan", "remote", "add", REMOTE_REPO_NAME_2, EXAMPLE_URL])
+    fp.register(["conan", "source", "."], returncode=source_returncode)
+
+
+def test_conan_setup_runs_only_changed_steps(
+    config: Config, fp: FakeProcess, tmp_path: Path, mocker: MockerFixture
+) -> None:
+    config.project_root = tmp_path
+    mocker.patch.dict(os.environ, {"CONAN_HOME": str(tmp_path / "conan-home")})
+    Path(tmp_path, "conanfile.py").write_text("conanfile")
+
+    register_conan_setup_cmds(fp)
+    conan_setup(config)
+    assert len(fp.calls) == 5
+
+    # Nothing changed
+    conan_setup(config)
+    assert len(fp.calls) == 5
+
+    # Remote URL changed
+    config.conan.repo[REMOTE_REPO_NAME_2] = "https://example.com/other"
+    fp.register(["conan", "remote", "list-users"])
+    fp.register(["conan", "remote", "add", REMOTE_REPO_NAME_1, EXAMPLE_URL])
+    fp.register(["conan", "remote", "add", REMOTE_REPO_NAME_2, "https://example.com/other"])
+    conan_setup(config)
+    assert len(fp.calls) == 8
+
+    # Conanfile changed
+    Path(tmp_path, "conanfile.py").write_text("changed conanfile")
+    fp.register(["conan", "source", "."])
+    conan_setup(config)
+    assert list(fp.calls)[8:] == [["conan", "source", "."]]
+
+
+def test_conan_setup_retries_failed_step(
+    config: Config, fp: FakeProcess, tmp_path: Path, mocker: MockerFixture
+) -> None:
+    config.project_root = tmp_path
+    mocker.patch.dict(os.environ, {"CONAN_HOME": str(tmp_path / "conan-home")})
+
+    register_conan_setup_cmds(fp, source_returncode=1)
+    conan_setup(config)
+    fp.register(["conan", "source", "."])
+    conan_setup(config)
+
+    assert list(fp.calls)[5:] == [["conan", "source", "."]]
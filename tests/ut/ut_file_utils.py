@@ -0,0 +1,28 @@
+from pathlib import Path
+
+import pytest
+
+from pwrforge.utils.file_utils import get_header_prefix_end, read_header_prefix
+
+HEADER = "﻿// File\n/*\n * License\n */\n#ifndef FOO_H\n#define FOO_H \\\n    1\n#pragma once\n"
+
+
+def test_header_prefix_ends_at_first_declaration() -> None:
+    content = HEADER + "int foo(void); // not in the header\n#pragma once\n"
+
+    assert content[: get_header_prefix_end(content)] == HEADER
+
+
+@pytest.mark.parametrize("window", [1, 3, 16, 8192])
+def test_read_header_prefix_longer_than_window(tmp_path: Path, window: int) -> None:
+    file_path = tmp_path / "foo.h"
+    file_path.write_text(HEADER + "int foo(void);\n" + "int bar;\n" * 1000, encoding="utf-8")
+
+    assert read_header_prefix(file_path, window) == HEADER
+
+
+def test_read_header_prefix_of_comment_only_file(tmp_path: Path) -> None:
+    file_path = tmp_path / "foo.h"
+    file_path.write_text("/* unterminated comment\n", encoding="utf-8")
+
+    assert read_header_prefix(file_path, 4) == "/* unterminated comment\n"
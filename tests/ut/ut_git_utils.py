@@ -0,0 +1,48 @@
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from pwrforge.utils.git_utils import get_changed_files
+
+
+def git(repo_dir: Path, *args: str) -> None:
+    subprocess.run(["git", "-C", str(repo_dir), *args], check=True, capture_output=True)
+
+
+@pytest.fixture
+def repo_dir(tmp_path: Path) -> Path:
+    git(tmp_path, "init", "-q")
+    git(tmp_path, "config", "user.email", "test@example.com")
+    git(tmp_path, "config", "user.name", "test")
+    for name in ("modified.cpp", "staged.h", "deleted.cpp", "unchanged.cpp"):
+        Path(tmp_path, "src", name).parent.mkdir(exist_ok=True)
+        Path(tmp_path, "src", name).write_text("int x;\n")
+    git(tmp_path, "add", ".")
+    git(tmp_path, "commit", "-q", "-m", "initial")
+
+    Path(tmp_path, "src/modified.cpp").write_text("int y;\n")
+    Path(tmp_path, "src/staged.h").write_text("int y;\n")
+    git(tmp_path, "add", "src/staged.h")
+    Path(tmp_path, "src/deleted.cpp").unlink()
+    Path(tmp_path, "src/untracked.cpp").write_text("int z;\n")
+    return tmp_path.resolve()
+
+
+def test_get_files_changed_since_ref(repo_dir: Path) -> None:
+    changed_files = get_changed_files(repo_dir / "src", changed_since="HEAD")
+    assert changed_files == {
+        repo_dir / "src/modified.cpp",
+        repo_dir / "src/staged.h",
+        repo_dir / "src/untracked.cpp",
+    }
+
+
+def test_get_staged_files(repo_dir: Path) -> None:
+    assert get_changed_files(repo_dir, staged=True) == {repo_dir / "src/staged.h"}
+
+
+def test_get_changed_files_unknown_ref(repo_dir: Path) -> None:
+    with pytest.raises(SystemExit) as error:
+        get_changed_files(repo_dir, changed_since="no-such-ref")
+    assert error.value.code == 1
@@ -1,5 +1,6 @@
 import os
 from pathlib import Path
+from typing import Optional
 from unittest.mock import MagicMock
 
 import pytest
@@ -26,10 +27,10 @@ def register_build_cmds(
     profile: str,
     build_dir: Path,
     build_fails: bool = False,
+    build_jobs: Optional[int] = None,
 ) -> None:
     profile_name = f"{target.id}_{profile}"
     profile_path = f"./config/conan/profiles/{profile_name}"
-    copy_dir_path = Path(build_dir, "build", profile)
     fp.register(
         [
             "conan",
@@ -44,10 +45,18 @@ def register_build_cmds(
         ]
     )
     fp.register(
-        ["conan", "build", ".", "-pr", profile_path, "-of", build_dir],
+        [
+            "conan",
+            "build",
+            ".",
+            "-pr",
+            profile_path,
+            "-of",
+            build_dir,
+            *(["-c", f"tools.build:jobs={build_jobs}"] if build_jobs is not None else []),
+        ],
         returncode=int(build_fails),
     )
-    fp.register(["cp", "-r", "-f", f"{copy_dir_path}/*", "."])
 
 
 @pytest.mark.parametrize("profile", DEFAULT_PROFILES)
@@ -66,6 +75,20 @@ def test_pwrforge_build_dir_exist(
     assert build_dir.is_dir()
 
 
+def test_pwrforge_build_single_target_jobs(fp: FakeProcess, fs: FakeFilesystem, mock_prepare_config: MagicMock) -> None:
+    profile = "Debug"
+    config = mock_prepare_config.return_value
+    target = config.project.default_target
+    build_dir = Path(target.get_profile_build_dir(profile))
+    Path("CMakeLists.txt").touch()
+
+    register_common_commands(fp)
+    register_build_cmds(fp, target, profile, build_dir, build_jobs=3)
+
+    pwrforge_build(profile, None, jobs=3)
+    assert build_dir.is_dir()
+
+
 def test_pwrforge_build_no_cmake(
     fp: FakeProcess,
     fs: FakeFilesystem,
@@ -101,6 +124,57 @@ def test_pwrforge_build_fails(
     assert ("ERROR", "pwrforge build target x86 failed") in log_data
 
 
+def test_pwrforge_build_skips_unchanged_conan_install(
+    fp: FakeProcess,
+    fs: FakeFilesystem,
+    mock_prepare_config: MagicMock,
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    profile = "Debug"
+    config = mock_prepare_config.return_value
+    target = config.project.default_target
+    build_dir = Path(target.get_profile_build_dir(profile))
+    Path("CMakeLists.txt").touch()
+    Path("conanfile.py").write_text("conanfile")
+    toolchain_file = Path(build_dir, "build", profile, "generators", "conan_toolchain.cmake")
+    toolchain_file.parent.mkdir(parents=True)
+    toolchain_file.touch()
+
+    register_common_commands(fp)
+    register_build_cmds(fp, target, profile, build_dir)
+    pwrforge_build(profile, None)
+    assert fp.call_count(["conan", "install", fp.any()]) == 1
+
+    # Nothing changed, the install is skipped
+    register_common_commands(fp)
+    register_build_cmds(fp, target, profile, build_dir)
+    pwrforge_build(profile, None)
+    assert fp.call_count(["conan", "install", fp.any()]) == 1
+    assert ("INFO", f"Conan dependencies in {build_dir} are up to date, skipping install") in get_log_data(
+        caplog.records
+    )
+
+    # Forced install
+    register_common_commands(fp)
+    register_build_cmds(fp, target, profile, build_dir)
+    pwrforge_build(profile, None, force_install=True)
+    assert fp.call_count(["conan", "install", fp.any()]) == 2
+
+    # Changed conanfile
+    register_common_commands(fp)
+    register_build_cmds(fp, target, profile, build_dir)
+    Path("conanfile.py").write_text("changed conanfile")
+    pwrforge_build(profile, None)
+    assert fp.call_count(["conan", "install", fp.any()]) == 3
+
+    # Removed toolchain file
+    register_common_commands(fp)
+    register_build_cmds(fp, target, profile, build_dir)
+    toolchain_file.unlink()
+    pwrforge_build(profile, None)
+    assert fp.call_count(["conan", "install", fp.any()]) == 4
+
+
 def test_pwrforge_build_all_targets(
     fp: FakeProcess,
     mock_prepare_multitarget_config: MagicMock,
@@ -115,11 +189,45 @@ def test_pwrforge_build_all_targets(
     for target in config.project.target:
         build_dir = Path.cwd() / target.get_profile_build_dir(profile)
         build_dirs.append(build_dir)
-        register_build_cmds(fp, target, profile, build_dir)
+        register_build_cmds(fp, target, profile, build_dir, build_jobs=2)
 
-    pwrforge_build(profile, None, all_targets=True)
+    pwrforge_build(profile, None, all_targets=True, jobs=8)
     for build_dir in build_dirs:
         assert build_dir.is_dir()
+    log_data = get_log_data(caplog.records)
+    assert ("INFO", "Building 4 targets and profiles, 4 at the same time with 2 compile jobs each") in log_data
+    assert ("INFO", "Build summary:") in log_data
+
+
+def test_pwrforge_build_all_targets_and_profiles_one_fails(
+    fp: FakeProcess,
+    mock_prepare_multitarget_config: MagicMock,
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    config = mock_prepare_multitarget_config.return_value
+    Path("CMakeLists.txt").touch()
+    profiles = ["Debug", "Release"]
+
+    register_common_commands(fp)
+    for target in config.project.target:
+        for profile in profiles:
+            build_dir = Path.cwd() / target.get_profile_build_dir(profile)
+            build_fails = (target.id, profile) == ("stm32", "Release")
+            register_build_cmds(fp, target, profile, build_dir, build_fails=build_fails, build_jobs=1)
+
+    with pytest.raises(SystemExit):
+        pwrforge_build(profiles, None, all_targets=True, jobs=4)
+
+    log_data = get_log_data(caplog.records)
+    assert ("ERROR", "[stm32/Release] pwrforge build target stm32 failed") in log_data
+    assert ("ERROR", "1 of 8 builds failed") in log_data
+    summary_start = log_data.index(("INFO", "Build summary:")) + 1
+    summary = [tuple(message.split()[:2]) for _, message in log_data[summary_start : summary_start + 8]]
+    assert summary == [
+        (f"{target.id}/{profile}", "failed" if f"{target.id}/{profile}" == "stm32/Release" else "succeeded")
+        for target in config.project.target
+        for profile in profiles
+    ]
 
 
 @pytest.fixture
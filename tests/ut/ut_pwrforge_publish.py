@@ -123,6 +123,7 @@ def test_upload_package_fail(
     config: Config,
     caplog: LogCaptureFixture,
     fp: FakeProcess,
+    fs: FakeFilesystem,
 ) -> None:
     # ARRANGE
     project_name = config.project.name
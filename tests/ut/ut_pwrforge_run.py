@@ -63,7 +63,6 @@ def test_pwrforge_run_with_build(
         ]
     )
     fp.register(["conan", "build", ".", "-pr", profile_path, "-of", build_path])
-    fp.register(["cp", "-r", "-f", "build/x86/Debug/build/Debug/*", "."])
     pwrforge_run(bin_path, profile="Debug", params=[], prebuild=True, force_native=True)
 
     assert fp_bin.calls[0].returncode == 0
@@ -0,0 +1,107 @@
+from pathlib import Path
+
+import pytest
+
+from pwrforge.utils.replacement_utils import (
+    Replacement,
+    apply_replacements,
+    load_replacements,
+    merge_replacements,
+)
+from tests.ut.utils import get_log_data
+
+SOURCE = Path("/src/a.cpp")
+
+
+def test_load_replacements(tmp_path: Path) -> None:
+    fixes_file = tmp_path / "fixes.yaml"
+    fixes_file.write_text(
+        """---
+MainSourceFile: /src/a.cpp
+Diagnostics:
+  - DiagnosticName: modernize-use-nullptr
+    DiagnosticMessage:
+      Message: use nullptr
+      FilePath: a.cpp
+      FileOffset: 9
+      Replacements:
+        - FilePath: a.cpp
+          Offset: 9
+          Length: 4
+          ReplacementText: nullptr
+    BuildDirectory: /src
+  - DiagnosticName: readability-braces-around-statements
+    Replacements:
+      - FilePath: /src/b.cpp
+        Offset: 12
+        Length: 0
+        ReplacementText: ''
+  - DiagnosticName: modernize-use-nullptr
+    DiagnosticMessage:
+      Message: use nullptr
+      Replacements:
+        - FilePath: ../src/./a.cpp
+          Offset: 30
+          Length: 1
+          ReplacementText: nullptr
+    BuildDirectory: /src
+...
+"""
+    )
+
+    assert load_replacements(fixes_file) == [
+        Replacement(SOURCE, 9, 4, "nullptr"),
+        Replacement(Path("/src/b.cpp"), 12, 0, ""),
+        # Different spellings of one file are resolved to the same path
+        Replacement(SOURCE, 30, 1, "nullptr"),
+    ]
+
+
+def test_load_replacements_invalid_file(tmp_path: Path, caplog: pytest.LogCaptureFixture) -> None:
+    fixes_file = tmp_path / "fixes.yaml"
+    fixes_file.write_text("Diagnostics: [")
+
+    assert load_replacements(fixes_file) == []
+    assert get_log_data(caplog.records)[0][0] == "WARNING"
+
+
+def test_merge_replacements_drops_duplicates_and_conflicts(caplog: pytest.LogCaptureFixture) -> None:
+    replacements = [
+        Replacement(SOURCE, 20, 4, "nullptr"),
+        Replacement(SOURCE, 3, 2, "x"),
+        Replacement(SOURCE, 0, 7, "using"),
+        Replacement(SOURCE, 20, 4, "nullptr"),
+        Replacement(SOURCE, 22, 1, "0"),
+        Replacement(SOURCE, 20, 0, "/*"),
+        Replacement(SOURCE, 20, 0, "//"),
+    ]
+
+    merged = merge_replacements(replacements)
+
+    assert merged == {
+        SOURCE: [
+            Replacement(SOURCE, 0, 7, "using"),
+            Replacement(SOURCE, 20, 0, "/*"),
+            Replacement(SOURCE, 20, 4, "nullptr"),
+        ]
+    }
+    assert get_log_data(caplog.records) == [
+        ("WARNING", f"Skipping fix of {SOURCE} at offset 3, it conflicts with the fix at offset 0"),
+        ("WARNING", f"Skipping fix of {SOURCE} at offset 20, it conflicts with the fix at offset 20"),
+        ("WARNING", f"Skipping fix of {SOURCE} at offset 22, it conflicts with the fix at offset 20"),
+    ]
+
+
+def test_apply_replacements() -> None:
+    content = "int *a = NULL; // ż\nint *b = NULL;\n".encode()
+    replacements = [
+        Replacement(SOURCE, 9, 4, "nullptr"),
+        Replacement(SOURCE, 30, 4, "nullptr"),
+    ]
+
+    assert apply_replacements(content, replacements) == "int *a = nullptr; // ż\nint *b = nullptr;\n".encode()
+
+
+def test_apply_replacements_out_of_file() -> None:
+    with pytest.raises(ValueError):
+        apply_replacements(b"int a;\n", [Replacement(SOURCE, 4, 10, "")])
@@ -0,0 +1,73 @@
+import io
+import json
+from pathlib import Path
+
+from pwrforge.utils.report_utils import (
+    Finding,
+    JsonLinesReporter,
+    ReportFormat,
+    SarifReporter,
+    create_reporter,
+)
+
+PROJECT_ROOT = Path("/project")
+FINDINGS = [
+    Finding("/project/src/main.cpp", "Found TODO", line=3, rule="todo"),
+    Finding("src/lib.h", "use 'using' instead of 'typedef'", 1, 9, "modernize-use-using", "error"),
+]
+
+
+def test_jsonl_findings_are_written_immediately() -> None:
+    stream = io.StringIO()
+    reporter = JsonLinesReporter(stream, PROJECT_ROOT)
+
+    reporter.file_checked("todo", FINDINGS[:1], 0.25)
+    first_line = json.loads(stream.getvalue())
+    reporter.file_checked("clang-tidy", [], 1.0)
+    reporter.file_checked("clang-tidy", FINDINGS[1:], None)
+    reporter.check_finished("clang-tidy", 1, 2.5)
+
+    assert first_line == {
+        "type": "finding",
+        "checker": "todo",
+        "file": "src/main.cpp",
+        "line": 3,
+        "column": None,
+        "rule": "todo",
+        "level": "warning",
+        "message": "Found TODO",
+        "duration": 0.25,
+    }
+    records = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert [record["type"] for record in records] == ["finding", "finding", "check"]
+    assert records[1]["file"] == "src/lib.h"
+    assert records[2] == {"type": "check", "checker": "clang-tidy", "problems": 1, "duration": 2.5}
+
+
+def test_sarif_report_is_valid_after_close() -> None:
+    stream = io.StringIO()
+    reporter = SarifReporter(stream, PROJECT_ROOT)
+    reporter.file_checked("todo", FINDINGS[:1], 0.25)
+    reporter.file_checked("clang-tidy", FINDINGS[1:], 0.5)
+    reporter.check_finished("todo", 1, 1.0)
+    reporter.close()
+
+    sarif = json.loads(stream.getvalue())
+    run = sarif["runs"][0]
+    assert sarif["version"] == "2.1.0"
+    assert run["tool"]["driver"]["name"] == "pwrforge"
+    assert run["originalUriBaseIds"]["PROJECTROOT"]["uri"] == "file:///project/"
+    assert [result["ruleId"] for result in run["results"]] == ["todo", "modernize-use-using"]
+    assert run["results"][1]["level"] == "error"
+    assert run["results"][1]["locations"][0]["physicalLocation"] == {
+        "artifactLocation": {"uri": "src/lib.h", "uriBaseId": "PROJECTROOT"},
+        "region": {"startLine": 1, "startColumn": 9},
+    }
+    assert run["invocations"][0]["properties"]["checks"] == {"todo": {"problems": 1, "duration": 1.0}}
+
+
+def test_sarif_report_without_findings(tmp_path: Path) -> None:
+    output = tmp_path / "report.sarif"
+    reporter = create_reporter(ReportFormat.sarif, output, tmp_path)
+    reporter.close()
+    assert json.loads(output.read_text())["runs"][0]["results"] == []
@@ -0,0 +1,44 @@
+import subprocess
+import sys
+from pathlib import Path
+
+from pwrforge.utils.timing_utils import CheckTimings, FileTiming
+
+PROJECT_ROOT = Path("/project")
+
+
+def test_file_timings_are_summed_and_sorted() -> None:
+    timings = CheckTimings(PROJECT_ROOT)
+    timings.file_checked("clang-tidy", Path("/project/src/main.cpp"), 2.0)
+    timings.file_checked("todo", Path("src/main.cpp"), 0.5)
+    timings.file_checked("todo", Path("src/vendor/lib.c"), 1.0)
+    timings.file_checked("todo", Path("src/vendor/lib.c"), 1.5)
+    timings.file_checked("todo", Path("src/cached.c"), None)
+
+    assert timings.get_slowest_files(2) == [
+        FileTiming("todo", "src/vendor/lib.c", 2.5),
+        FileTiming("clang-tidy", "src/main.cpp", 2.0),
+    ]
+    assert timings.get_slowest_directories() == [
+        FileTiming("", "src", 2.5),
+        FileTiming("", "src/vendor", 2.5),
+    ]
+
+
+def test_checker_timings_include_child_processes() -> None:
+    timings = CheckTimings(PROJECT_ROOT)
+    with timings.measure("cppcheck"):
+        subprocess.run([sys.executable, "-c", "sum(range(2_000_000))"], check=True)
+    with timings.measure("todo"):
+        timings.file_checked("todo", Path("src/main.cpp"), 0.25)
+
+    checker_timings = {timing.checker: timing for timing in timings.get_checker_timings()}
+    assert checker_timings["cppcheck"].children_cpu is not None
+    assert checker_timings["cppcheck"].children_cpu > 0
+    assert checker_timings["cppcheck"].duration > checker_timings["todo"].duration
+    assert (checker_timings["todo"].files, checker_timings["todo"].files_duration) == (1, 0.25)
+
+    data = timings.get_data()
+    assert list(data["checkers"]) == ["cppcheck", "todo"]
+    assert data["files"] == {"todo": {"src/main.cpp": 0.25}}
+    assert data["children_cpu"] >= data["checkers"]["cppcheck"]["children_cpu"]
@@ -0,0 +1,84 @@
+import sys
+from pathlib import Path
+from typing import Callable, Iterator
+
+import pytest
+
+from pwrforge.utils.file_utils import ExcludeMatcher
+from pwrforge.utils.watch_utils import (
+    FileChanges,
+    FileWatcher,
+    InotifyWatcher,
+    PollingWatcher,
+    create_watcher,
+)
+
+WatcherFactory = Callable[[Path, ExcludeMatcher], FileWatcher]
+
+WATCHERS = [pytest.param(lambda root, exclude: PollingWatcher(root, exclude, interval=0.05), id="polling")]
+if sys.platform.startswith("linux"):
+    WATCHERS.append(pytest.param(InotifyWatcher, id="inotify"))
+
+
+@pytest.fixture
+def source_dir(tmp_path: Path) -> Path:
+    (tmp_path / "src" / "generated").mkdir(parents=True)
+    (tmp_path / "src" / "main.cpp").write_text("int main() { return 0; }\n")
+    (tmp_path / "src" / "generated" / "regs.h").write_text("#pragma once\n")
+    return tmp_path / "src"
+
+
+@pytest.fixture(params=WATCHERS)
+def watcher(request: pytest.FixtureRequest, source_dir: Path) -> Iterator[FileWatcher]:
+    file_watcher = request.param(source_dir, ExcludeMatcher(["src/generated"], source_dir.parent))
+    yield file_watcher
+    file_watcher.close()
+
+
+def test_watcher_no_changes(watcher: FileWatcher) -> None:
+    assert watcher.read_changes(0.1) is None
+
+
+def test_watcher_modified_file(watcher: FileWatcher, source_dir: Path) -> None:
+    (source_dir / "main.cpp").write_text("int main() { return 1; }\n")
+
+    changes = watcher.read_changes(2)
+
+    assert changes is not None
+    assert changes.paths == {source_dir / "main.cpp"}
+
+
+def test_watcher_new_directory(watcher: FileWatcher, source_dir: Path) -> None:
+    (source_dir / "bsp").mkdir()
+    (source_dir / "bsp" / "board.c").write_text("void board_init(void) {}\n")
+
+    changes = next(watcher.watch(debounce=0.2))
+
+    assert changes == FileChanges(frozenset({source_dir / "bsp" / "board.c"}), True)
+
+
+def test_watcher_removed_file(watcher: FileWatcher, source_dir: Path) -> None:
+    (source_dir / "main.cpp").unlink()
+
+    changes = watcher.read_changes(2)
+
+    assert changes == FileChanges(frozenset({source_dir / "main.cpp"}), True)
+
+
+def test_watcher_excluded_file(watcher: FileWatcher, source_dir: Path) -> None:
+    (source_dir / "generated" / "regs.h").write_text("#pragma once\n#define REG 1\n")
+
+    assert watcher.read_changes(0.3) is None
+
+
+def test_watch_debounces_changes(watcher: FileWatcher, source_dir: Path) -> None:
+    (source_dir / "main.cpp").write_text("int main() { return 1; }\n")
+    (source_dir / "main.h").write_text("#pragma once\n")
+
+    changes = next(watcher.watch(debounce=0.3))
+
+    assert changes.paths == {source_dir / "main.cpp", source_dir / "main.h"}
+
+
+def test_create_watcher_polling(source_dir: Path) -> None:
+    assert isinstance(create_watcher(source_dir, polling=True), PollingWatcher)